@@ -0,0 +1,488 @@
+"""
+性能基准测试 (离线运行)
+覆盖逐个计算、批量计算、参数扫描、预计算表查询、界面各阶段 (明细表、图表 spec、CSV)、
+无界面驱动的整页重跑以及导入/启动耗时。结果保存为 JSON，可与基线比较并标出退化项。
+
+用法:
+    python bench.py run -o bench_baseline.json         # 记录基线
+    python bench.py run -o bench_new.json --only batch  # 只跑名称含 batch 的用例
+    python bench.py run --full                          # 批量/扫描扩展到 10^7 组参数
+    python bench.py compare bench_baseline.json bench_new.json --threshold 0.2
+    python bench.py check                               # 预算检查 (CI 使用)，超出预算返回非零
+
+每个用例记录 seconds (越小越好，比较时使用) 以及辅助指标 (如 rows_per_s)。
+"""
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_THRESHOLD = 0.2
+BATCH_SIZES = (10**3, 10**4, 10**5, 10**6)
+SWEEP_SIZES = (10**5, 10**6)
+FULL_BATCH_SIZES = BATCH_SIZES + (10**7,)
+FULL_SWEEP_SIZES = SWEEP_SIZES + (10**7,)
+SEED = 20240601
+
+# 典型参数 (界面默认值) 与批量随机参数的取值范围
+DEFAULT_PARAMS = (25.0, 20.0, 3.0, 5.0, 5.0, 4, 1.15)
+
+# 预算：check 子命令只运行这些用例所在的组，超出即视为退化，不依赖基线文件。
+# 值为秒数 (绝对预算) 或 (参照用例, 倍数)；参照用例在同一次运行中测量，与机器快慢无关
+BUDGETS = {
+    'import.tent_core': 0.030,
+    # 规则引擎逐条解释执行，比手写公式慢几倍；预算防止再退化到原先的 8 倍左右
+    'scalar.core.float': ('scalar.reference.core', 5.0),
+    'scalar.accessory': ('scalar.reference.accessory', 4.5),
+    # 增量重算必须明显快于重新构造并计算全部输出
+    'scalar.core.update': ('scalar.core.float', 0.75),
+}
+# tent_core 导入后不允许出现的重量级依赖
+HEAVY_MODULES = ('streamlit', 'pandas', 'altair', 'numpy')
+
+
+def _timeit(func, repeat=5, number=1):
+    """运行 repeat 轮、每轮 number 次，返回每次调用耗时的中位数 (秒)"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) / number)
+    return statistics.median(samples)
+
+
+def _timeit_interleaved(funcs, repeat=5, number=1):
+    """同 _timeit，但多个函数逐轮交替运行，返回各自的中位数 (秒)"""
+    samples = [[] for _ in funcs]
+    for _ in range(repeat):
+        for func, out in zip(funcs, samples):
+            started = time.perf_counter()
+            for _ in range(number):
+                func()
+            out.append((time.perf_counter() - started) / number)
+    return [statistics.median(s) for s in samples]
+
+
+def _random_columns(n, seed=SEED):
+    """n 组随机构造参数 (固定种子，结果可复现)"""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    return {
+        'length': rng.integers(5, 200, n) * 0.5,
+        'width': rng.integers(10, 100, n) * 0.5,
+        'side_height': rng.choice([2.5, 3.0, 3.5, 4.0, 5.0], n),
+        'unit_length': rng.choice([3.0, 5.0], n),
+        'gable_unit_length': rng.choice([3.0, 5.0], n),
+        'holes_per_base': rng.choice([4, 6, 8], n),
+        'roof_pitch_factor': rng.choice([1.1, 1.15, 1.2], n),
+    }
+
+
+# --- 参照实现 / Reference implementations ---
+# 公式引擎之前的手写计算器 (结构与原代码相同，结果与规则集一致)，作为标量路径的速度基线
+
+class _ReferenceCore:
+    def __init__(self, length, width, side_height, unit_length, gable_unit_length, holes_per_base, roof_pitch_factor):
+        self.length = float(length)
+        self.width = float(width)
+        self.side_height = float(side_height)
+        self.unit_length = float(unit_length)
+        self.gable_unit_length = float(gable_unit_length)
+        self.holes_per_base = int(holes_per_base)
+        self.roof_pitch_factor = float(roof_pitch_factor)
+        self.num_units = 0
+        if self.unit_length > 0:
+            self.num_units = int(self.length / self.unit_length)
+        self.area = self.length * self.width
+        self.perimeter = (self.length + self.width) * 2
+
+    def calculate_all(self):
+        results = {}
+        results['upright_support'] = (self.num_units + 1) * 2
+        gable_bays = 0
+        if self.gable_unit_length > 0:
+            gable_bays = int(self.width / self.gable_unit_length)
+        results['gable_post'] = max(0, (gable_bays - 1) * 2)
+        results['has_mid_post'] = (gable_bays % 2 == 0) and (gable_bays > 0)
+        results['roof_beam'] = self.num_units + 1
+        results['ridge_conn'] = self.num_units + 1
+        results['eave_conn'] = (self.num_units + 1) * 2
+        results['bearing_count'] = results['upright_support'] + results['gable_post']
+        results['main_comp_total'] = results['upright_support'] + results['gable_post'] + results['roof_beam']
+        results['expansion_screw'] = results['bearing_count'] * self.holes_per_base
+        results['drilling_steel'] = results['bearing_count'] * self.holes_per_base
+        results['roof_canvas'] = round(self.area * self.roof_pitch_factor, 2)
+        results['roof_liner'] = results['roof_canvas']
+        results['glass_wall_m'] = round(self.perimeter, 2)
+        results['glass_wall_sqm'] = round(self.perimeter * self.side_height, 2)
+        results['roof_cover'] = round(results['roof_canvas'] + results['roof_liner'] + results['glass_wall_sqm'], 2)
+        results['basic_lighting'] = max(0, (self.num_units - 1) * 2)
+        results['roof_stretcher'] = self.num_units * 2
+        return results
+
+
+class _ReferenceAccessory:
+    def __init__(self, length=25, width=20, side_height=3, unit_length=5):
+        self.length = length
+        self.width = width
+        self.side_height = side_height
+        self.unit_length = unit_length
+        self.triangle_angle_ratio = 1.05
+
+    def calculate_values(self):
+        return {
+            'roof_canvas': self._roof_canvas(),
+            'roof_liner': self._roof_canvas(),
+            'side_canvas': self._side_canvas(),
+            'side_liner': self._side_canvas(),
+            'lighting': int((self.length / self.unit_length - 1) * 2),
+            'anchoring': int((self.length / self.unit_length + 1) * 2 + 6 * 2),
+            'flooring': round(self.length * self.width, 2),
+            'glass_wall': round(2 * self.length * self.side_height, 2),
+        }
+
+    def _roof_canvas(self):
+        return round(self.length * self.width * self.triangle_angle_ratio, 2)
+
+    def _side_canvas(self):
+        return round(2 * (self.length + self.width) * self.side_height, 2)
+
+
+# --- 用例 / Cases ---
+# 每个用例产出 (名称, 指标字典)
+
+def bench_scalar(opts):
+    from tent_core import AccessoryCalculator, TentCalculator
+
+    number = 2000
+    # 参照实现与对应用例交替计时，两者受同样的机器波动影响，预算检查比较的倍数才稳定；
+    # 增量重算与完整计算一起计时
+    calc = TentCalculator(*DEFAULT_PARAMS)
+    heights = iter([3.0, 3.5] * (number * 8 + 1))
+    groups = {
+        'core': {'scalar.reference.core': lambda: _ReferenceCore(*DEFAULT_PARAMS).calculate_all(),
+                 'scalar.core.float': lambda: TentCalculator(*DEFAULT_PARAMS).calculate_all(),
+                 'scalar.core.update': lambda: calc.update(side_height=next(heights))},
+        'accessory': {'scalar.reference.accessory': lambda: _ReferenceAccessory(25, 20, 3, 5).calculate_values(),
+                      'scalar.accessory': lambda: AccessoryCalculator(25, 20, 3, 5).calculate_values()},
+    }
+    for cases in groups.values():
+        for case, seconds in zip(cases, _timeit_interleaved(tuple(cases.values()), repeat=15, number=number)):
+            yield case, {'seconds': seconds, 'calls_per_s': 1 / seconds}
+    seconds = _timeit(lambda: TentCalculator(*DEFAULT_PARAMS, arithmetic='exact').calculate_all(), number=number)
+    yield 'scalar.core.exact', {'seconds': seconds, 'calls_per_s': 1 / seconds}
+
+
+def bench_batch(opts):
+    from tent_core import AccessoryCalculator, TentCalculator
+
+    for n in opts.batch_sizes:
+        cols = _random_columns(n)
+        repeat = 5 if n <= 10**5 else 1
+        for arithmetic in ('float', 'exact'):
+            seconds = _timeit(lambda: TentCalculator.calculate_batch(cols, arithmetic), repeat=repeat)
+            yield f'batch.core.{arithmetic}.{n:.0e}', {'seconds': seconds, 'rows_per_s': n / seconds}
+        acc = {k: cols[k] for k in ('length', 'width', 'side_height', 'unit_length')}
+        seconds = _timeit(lambda: AccessoryCalculator.calculate_batch(acc), repeat=repeat)
+        yield f'batch.accessory.{n:.0e}', {'seconds': seconds, 'rows_per_s': n / seconds}
+
+
+def bench_sweep(opts):
+    import tent_sweep
+
+    for n in opts.sweep_sizes:
+        # length × width × 其余候选值，凑出约 n 个网格点
+        rest = {'side_height': [3.0, 4.0], 'unit_length': [3.0, 5.0], 'gable_unit_length': [3.0, 5.0],
+                'holes_per_base': [4, 6], 'roof_pitch_factor': [1.1, 1.15, 1.2]}
+        side = max(1, int((n / 48) ** 0.5))
+        grid = tent_sweep.ParamGrid(length=(10.0, 10.0 + (side - 1) * 0.1, 0.1),
+                                    width=(10.0, 10.0 + (side - 1) * 0.1, 0.1), **rest)
+        started = time.perf_counter()
+        front = tent_sweep.run(grid, workers=opts.workers)
+        seconds = time.perf_counter() - started
+        yield f'sweep.pareto.{n:.0e}', {'seconds': seconds, 'points': grid.size,
+                                         'points_per_s': grid.size / seconds,
+                                         'front': len(front['grid_index'])}
+
+
+def bench_catalog(opts):
+    import tent_catalog
+
+    path = os.path.join(opts.workdir, 'bench_catalog.npy')
+    started = time.perf_counter()
+    rows = tent_catalog.build(path)
+    yield 'catalog.build', {'seconds': time.perf_counter() - started, 'rows': rows}
+    catalog = tent_catalog.Catalog(path)
+    rng = random.Random(SEED)
+    axes = catalog.meta['axes']
+    queries = []
+    for _ in range(1000):
+        unit = rng.choice(axes['unit_length'])
+        queries.append((rng.choice(axes['units']) * unit, rng.choice(axes['width']), rng.choice(axes['side_height']),
+                        unit, rng.choice(axes['gable_unit_length']), 4, rng.choice(axes['roof_pitch_factor'])))
+    seconds = _timeit(lambda: [catalog.lookup(*q) for q in queries]) / len(queries)
+    yield 'catalog.lookup', {'seconds': seconds, 'calls_per_s': 1 / seconds}
+    del catalog
+    for p in (path, os.path.splitext(path)[0] + '.json'):
+        os.remove(p)
+
+
+def bench_view(opts):
+    """界面数据各阶段: 明细表、两张 Altair 图表的 spec 生成、CSV 与裁剪清单编码 (每次都新建视图，不走缓存)"""
+    import altair as alt
+    import pandas as pd
+
+    import web_app
+
+    calc, res = web_app._calculate(DEFAULT_PARAMS)
+    new = lambda: web_app._View(pd, alt, '中文', DEFAULT_PARAMS, calc, res)
+    stages = {
+        'table': lambda: new().table(),
+        'area_chart': lambda: new().area_chart().to_dict(),
+        'count_chart': lambda: new().count_chart().to_dict(),
+        'csv': lambda: new().csv(),
+        'cutting_csv': lambda: new().cutting_csv(),
+    }
+    for name, func in stages.items():
+        func()   # 预热 (首次调用含 Altair schema 加载)
+        seconds = _timeit(func, repeat=5, number=20)
+        yield f'view.{name}', {'seconds': seconds}
+
+
+def bench_app(opts):
+    """用 Streamlit 的 AppTest 无界面驱动整页重跑，同时收集 tent_metrics 的分阶段耗时"""
+    from streamlit.testing.v1 import AppTest
+
+    import tent_cache
+    import tent_metrics
+
+    # 关闭结果缓存，让每次重跑都走完整计算与渲染路径
+    saved_env = os.environ.get('TENT_CACHE_SIZE')
+    saved = {name: cache.maxsize for name, cache in tent_cache._registry.items()}
+    was_enabled = tent_metrics.enabled()
+    os.environ['TENT_CACHE_SIZE'] = '0'
+    for cache in tent_cache._registry.values():
+        cache.resize(0)
+    tent_metrics.enable()
+    tent_metrics.reset()
+    try:
+        started = time.perf_counter()
+        at = AppTest.from_file(os.path.join(HERE, 'web_app.py'), default_timeout=120).run()
+        yield 'app.first_run', {'seconds': time.perf_counter() - started}
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+
+        samples = []
+        for i in range(opts.reruns):
+            at.number_input(key='length').set_value(20.0 + i % 30)
+            started = time.perf_counter()
+            at.run()
+            samples.append(time.perf_counter() - started)
+        samples.sort()
+        yield 'app.rerun', {'seconds': statistics.median(samples), 'p95': samples[int(0.95 * (len(samples) - 1))]}
+        for name, summary in tent_metrics.snapshot().items():
+            if summary.get('p50') is not None and name != 'rerun':
+                yield f'app.stage.{name}', {'seconds': summary['p50'] / 1000, 'p95': summary['p95'] / 1000}
+    finally:
+        tent_metrics.enable(was_enabled)
+        if saved_env is None:
+            os.environ.pop('TENT_CACHE_SIZE', None)
+        else:
+            os.environ['TENT_CACHE_SIZE'] = saved_env
+        default = int(saved_env) if saved_env else tent_cache.DEFAULT_MAXSIZE
+        for name, cache in tent_cache._registry.items():
+            cache.resize(saved.get(name, default))
+
+
+def measure_import_ms(module, repeat=5):
+    """
+    在全新解释器中测量导入耗时 (毫秒)，取多次中的最小值以排除抖动。
+    同时返回导入后加载了的重量级依赖。
+    """
+    code = (
+        "import sys, time, json\n"
+        "t = time.perf_counter()\n"
+        f"import {module}\n"
+        "ms = (time.perf_counter() - t) * 1000\n"
+        f"print(json.dumps([ms, [m for m in {HEAVY_MODULES!r} if m in sys.modules]]))\n"
+    )
+    best, heavy = float('inf'), []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', code], cwd=HERE, check=True,
+                             capture_output=True, text=True).stdout
+        ms, heavy = json.loads(out)
+        best = min(best, ms)
+    return best, heavy
+
+
+def bench_import(opts):
+    for module in ('tent_core', 'web_app', 'streamlit, pandas, altair'):
+        ms, heavy = measure_import_ms(module, repeat=3 if module != 'tent_core' else 5)
+        name = 'ui_libs' if ',' in module else module
+        metrics = {'seconds': ms / 1000}
+        if module == 'tent_core':
+            metrics['heavy_modules'] = heavy
+        yield f'import.{name}', metrics
+
+
+CASES = {
+    'scalar': bench_scalar,
+    'batch': bench_batch,
+    'sweep': bench_sweep,
+    'catalog': bench_catalog,
+    'view': bench_view,
+    'app': bench_app,
+    'import': bench_import,
+}
+
+
+def _environment():
+    import numpy as np
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run(opts):
+    """执行所选用例，返回 {'environment': ..., 'results': {用例: 指标}}"""
+    results = {}
+    for group, func in CASES.items():
+        if opts.only and not any(fnmatch.fnmatch(group, p) or p in group for p in opts.only):
+            continue
+        for name, metrics in func(opts):
+            results[name] = {k: round(v, 9) if isinstance(v, float) else v for k, v in metrics.items()}
+            print(f"{name:<32}{_fmt(metrics['seconds']):>12}", file=sys.stderr)
+    return {'environment': _environment(), 'results': results}
+
+
+def _fmt(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.2f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    比较两次结果的 seconds
+    :return: [(用例, 基线秒数, 当前秒数, 变化比例, 是否退化)]，只含两边都有的用例
+    """
+    rows = []
+    for name, base in baseline['results'].items():
+        cur = current['results'].get(name)
+        if cur is None:
+            continue
+        change = cur['seconds'] / base['seconds'] - 1 if base['seconds'] else 0.0
+        rows.append((name, base['seconds'], cur['seconds'], change, change > threshold))
+    return rows
+
+
+def check_budgets(results, budgets=BUDGETS):
+    """
+    检查绝对预算
+    :return: [(用例, 预算秒数, 实测秒数或 None, 问题说明或 None)]
+    """
+    rows = []
+    for name, budget in budgets.items():
+        metrics = results.get(name)
+        if isinstance(budget, tuple):
+            reference, ratio = budget
+            budget = results[reference]['seconds'] * ratio if reference in results else None
+        if metrics is None or budget is None:
+            rows.append((name, budget, None, 'missing'))
+            continue
+        problem = None
+        if metrics['seconds'] > budget:
+            problem = 'over budget'
+        elif metrics.get('heavy_modules'):
+            problem = 'imports ' + ', '.join(metrics['heavy_modules'])
+        rows.append((name, budget, metrics['seconds'], problem))
+    return rows
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="篷房计算性能基准 / Tent calculator benchmarks")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_run = sub.add_parser('run', help="运行基准并输出 JSON")
+    p_run.add_argument('-o', '--output', help="结果文件，默认输出到标准输出")
+    p_run.add_argument('--only', action='append', help=f"只运行指定用例组 (可重复): {', '.join(CASES)}")
+    p_run.add_argument('--full', action='store_true', help="批量与扫描扩展到 10^7 组参数")
+    p_run.add_argument('--reruns', type=int, default=20, help="AppTest 重跑次数")
+    p_run.add_argument('--workers', type=int, default=1, help="扫描进程数 (默认 1，便于横向比较)")
+
+    sub.add_parser('check', help="只运行有预算的用例组，超出预算返回非零 (供 CI 使用)")
+
+    p_cmp = sub.add_parser('compare', help="与基线比较，超过阈值的退化项返回非零")
+    p_cmp.add_argument('baseline')
+    p_cmp.add_argument('current')
+    p_cmp.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                       help="允许的变慢比例，默认 0.2 (20%%)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'run':
+        args.batch_sizes = FULL_BATCH_SIZES if args.full else BATCH_SIZES
+        args.sweep_sizes = FULL_SWEEP_SIZES if args.full else SWEEP_SIZES
+        args.workdir = os.path.dirname(os.path.abspath(args.output)) if args.output else HERE
+        report = json.dumps(run(args), ensure_ascii=False, indent=1)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(report + '\n')
+        else:
+            print(report)
+        return 0
+
+    if args.command == 'check':
+        args.only = sorted({name.split('.')[0] for name in BUDGETS})
+        args.batch_sizes, args.sweep_sizes, args.workdir, args.workers = BATCH_SIZES, SWEEP_SIZES, HERE, 1
+        failures = 0
+        print(f"{'case':<32}{'budget':>12}{'measured':>12}")
+        for name, budget, seconds, problem in check_budgets(run(args)['results']):
+            failures += problem is not None
+            flag = f'  ❌ {problem}' if problem else ''
+            measured = _fmt(seconds) if seconds is not None else '-'
+            limit = _fmt(budget) if budget is not None else '-'
+            print(f"{name:<32}{limit:>12}{measured:>12}{flag}")
+        print(f"\n{failures} budget violation(s)")
+        return 1 if failures else 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+    regressions = 0
+    print(f"{'case':<32}{'baseline':>12}{'current':>12}{'change':>9}")
+    for name, base, cur, change, regressed in compare(baseline, current, args.threshold):
+        regressions += regressed
+        flag = '  ❌ regression' if regressed else ''
+        print(f"{name:<32}{_fmt(base):>12}{_fmt(cur):>12}{change:>+9.1%}{flag}")
+    print(f"\n{regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
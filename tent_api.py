@@ -0,0 +1,798 @@
+"""
+本机 HTTP/JSON 计算与报价接口 (asyncio，无第三方依赖)
+供 ERP 与网店程序化调用，不必抓取 Streamlit 界面。
+
+接口:
+    GET  /health                      运行状态、连接数、合并请求数与缓存命中
+    GET  /v1/fields?lang=en           结果字段的本地化名称与单位
+    GET  /v1/calculate?length=20&width=10&lang=zh
+    POST /v1/calculate                请求体为一个规格 JSON 对象
+    POST /v1/bulk?lang=en             请求体为规格数组 (或 {"specs": [...]})，
+                                      以 NDJSON 分块流式返回，每行一个结果，按输入顺序
+
+规格字段同 tent_project.py (length, width 必填，其余取界面默认值)。lang 为 zh / en 时
+附带按 TRANSLATIONS 翻译的明细行；存在价格表 (见 tent_pricing.py) 时附带报价。
+
+单个请求: 先查进程级缓存；未命中的规格在同一轮事件循环内攒成一批计算，
+    并发的相同规格合并为一次计算 (共享同一个 Future)。
+批量请求: 按块交给进程池 (解析、计算与 JSON 编码都在工作进程内)，事件循环只负责收发；
+    进程池中排队的块数有上限，客户端读得慢时 (写缓冲区未排空) 不再提交新块。
+连接: HTTP/1.1 长连接，空闲超时与每连接请求数上限；并发连接数、请求头与请求体大小、
+    单次批量规格数都有上限，超出时分别返回 503 / 431 / 413。
+
+用法:
+    python tent_api.py serve --port 8765 --workers 4
+    python tent_api.py load --connections 32 --requests 200     # 在本机启动服务并压测
+    python tent_api.py load --url 127.0.0.1:8765 --json api_load.json
+"""
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import deque
+from urllib.parse import parse_qsl, urlsplit
+
+from tent_cache import DEFAULT_MAXSIZE, shared_cache
+from tent_core import BATCH_INPUTS, TRANSLATIONS
+from tent_project import BOM_FIELDS, SPEC_CACHE_FACTOR, bom_label, parse_params
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+LANGUAGES = {'zh': '中文', 'en': 'English'}
+# 连接与请求限制
+MAX_CONNECTIONS = 256
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 8 * 1024 * 1024
+MAX_BULK_SPECS = 100000
+KEEPALIVE_TIMEOUT = 15.0
+KEEPALIVE_MAX_REQUESTS = 1000
+REQUEST_TIMEOUT = 30.0
+# 批量请求的块大小；每个请求最多预先提交几块，整个进程池中最多排队几块 (每个工作进程)
+BULK_CHUNK_SIZE = 2048
+BULK_PREFETCH = 2
+PENDING_CHUNKS_PER_WORKER = 2
+# 一轮攒到的单个请求不超过该数时直接在事件循环内计算 (查表/标量计算只需几微秒)，否则交给进程池
+INLINE_MAX_SPECS = 64
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           408: 'Request Timeout', 411: 'Length Required', 413: 'Payload Too Large',
+           431: 'Request Header Fields Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class HttpError(Exception):
+    """以 JSON {"error": ...} 返回给客户端的错误"""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+# --- 结果格式 / Result payloads ---
+# 单个请求在事件循环内、批量请求在工作进程内使用同一套函数
+
+def _check_lang(lang):
+    if lang is not None and (not isinstance(lang, str) or lang not in LANGUAGES):
+        raise HttpError(400, f"lang must be one of {', '.join(LANGUAGES)}, got {lang!r}")
+    return lang
+
+
+# 逐项明细只列数量；has_mid_post 对单个规格是布尔标志 (仍在 results 中)，不是带单位的物料
+LINE_FIELDS = tuple((name, unit) for name, unit in BOM_FIELDS if name != 'has_mid_post')
+
+
+@functools.lru_cache(maxsize=None)
+def _labels(lang):
+    t = TRANSLATIONS[LANGUAGES[lang]]
+    return tuple((name, bom_label(t, name), t[unit]) for name, unit in LINE_FIELDS)
+
+
+def field_labels(lang):
+    """结果字段的本地化名称与单位: [{item, label, unit}]"""
+    return [{'item': name, 'label': label, 'unit': unit} for name, label, unit in _labels(lang)]
+
+
+def payload(spec, row, lang=None, quote=None):
+    """
+    一个规格的响应对象
+    :param spec: 规范化参数元组 (同 tent_project.spec_key)
+    :param row: {字段: 值}，calculate_all 的输出加 num_units / area / perimeter
+    :param lang: 'zh' / 'en'，给出时附带按 TRANSLATIONS 翻译的 lines 明细
+    :param quote: 报价 {'currency', 'total', ...}
+    """
+    out = {'spec': dict(zip(BATCH_INPUTS, spec)), 'results': dict(row)}
+    if lang is not None:
+        out['lines'] = [{'item': name, 'label': label, 'value': row[name], 'unit': unit}
+                        for name, label, unit in _labels(lang)]
+    if quote is not None:
+        out['quote'] = quote
+    return out
+
+
+def _quote_single(prices, spec, row):
+    quote = prices.quote(row, spec[BATCH_INPUTS.index('unit_length')])
+    lines = [{'item': name, 'quantity': qty, 'unit': unit, 'unit_price': price, 'amount': amount}
+             for name, (qty, unit, price, amount) in quote.lines.items()]
+    return {'currency': quote.currency, 'total': quote.total, 'lines': lines}
+
+
+def compute_rows(specs):
+    """
+    批量计算一组不重复的规格 (进程池任务)
+    :return: 与 specs 对齐的 {字段: Python 标量} 列表
+    """
+    from tent_core import TentCalculator
+
+    results = TentCalculator.calculate_batch({k: [s[i] for s in specs] for i, k in enumerate(BATCH_INPUTS)})
+    columns = {k: v.tolist() for k, v in results.items()}
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+def bulk_chunk(start, records, lang=None):
+    """
+    批量请求中的一块 (进程池任务): 校验、去重计算、报价并编码为 NDJSON
+    :param start: 本块第一条在整个请求中的序号
+    :return: UTF-8 编码的若干行；无效规格的行为 {"index", "error"}
+    """
+    from tent_pricing import default_price_list
+
+    specs = []
+    lines = [None] * len(records)
+    for i, record in enumerate(records):
+        try:
+            if not isinstance(record, dict):
+                raise ValueError("expected a JSON object")
+            specs.append((i, parse_params(record)))
+        except ValueError as e:
+            lines[i] = {'index': start + i, 'error': str(e)}
+
+    unique = list(dict.fromkeys(spec for _, spec in specs))
+    rows = dict(zip(unique, compute_rows(unique))) if unique else {}
+    totals = {}
+    prices = default_price_list()
+    if prices is not None and unique:
+        import numpy as np
+
+        quantities = {k: np.array([rows[s][k] for s in unique], dtype=float) for k in prices.components}
+        unit_length = np.array([s[BATCH_INPUTS.index('unit_length')] for s in unique])
+        totals = dict(zip(unique, prices.price(quantities, unit_length)['total'].tolist()))
+
+    # 每个不重复的规格只编码一次，各行只在前面加上自己的序号
+    encoded = {}
+    for spec in unique:
+        quote = {'currency': prices.currency, 'total': totals[spec]} if spec in totals else None
+        try:
+            encoded[spec] = json.dumps(payload(spec, rows[spec], lang, quote), ensure_ascii=False,
+                                       allow_nan=False)[1:]
+        except ValueError as e:
+            encoded[spec] = e
+    for i, spec in specs:
+        if isinstance(encoded[spec], ValueError):
+            lines[i] = {'index': start + i, 'error': f"result is not valid JSON: {encoded[spec]}"}
+        else:
+            lines[i] = f'{{"index": {start + i}, {encoded[spec]}'
+    for i, line in enumerate(lines):
+        if isinstance(line, dict):
+            lines[i] = json.dumps(line, ensure_ascii=False)
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _warm():
+    # 工作进程预先导入计算模块并载入价格表，首个批量请求不必等待
+    from tent_pricing import default_price_list
+
+    default_price_list()
+    compute_rows([(10.0, 10.0, 3.0, 5.0, 5.0, 4, 1.15)])
+
+
+# --- 计算服务 / Calculation service ---
+
+class QuoteService:
+    """缓存、合并并发相同规格、调度进程池的计算服务 (只在事件循环线程中使用)"""
+
+    def __init__(self, workers=None, inline_max=INLINE_MAX_SPECS):
+        """
+        :param workers: 进程数，默认 CPU 核数；0 表示不用进程池 (批量块在线程中计算)
+        :param inline_max: 一轮攒到的单个请求不超过该数时在事件循环内计算
+        """
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.inline_max = inline_max
+        size = int(os.environ.get('TENT_CACHE_SIZE', DEFAULT_MAXSIZE))
+        self.cache = shared_cache('tent_api.specs', maxsize=size * SPEC_CACHE_FACTOR)
+        self.stats = {'requests': 0, 'specs': 0, 'coalesced': 0, 'computed': 0, 'bulk_chunks': 0}
+        self._pool = None
+        self._slots = None
+        self._inflight = {}
+        self._pending = []
+        self._flush_handle = None
+        self._tasks = set()
+
+    async def start(self):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        from tent_catalog import default_catalog
+        from tent_pricing import default_price_list
+
+        loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(max(1, self.workers) * PENDING_CHUNKS_PER_WORKER)
+        default_catalog()
+        default_price_list()
+        if self.workers > 0:
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+            await asyncio.gather(*(loop.run_in_executor(self._pool, _warm) for _ in range(self.workers)))
+
+    async def close(self):
+        if self._pool is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._pool.shutdown)
+            self._pool = None
+
+    async def _run(self, func, *args):
+        """在进程池 (workers=0 时为线程池) 中运行，排队的任务数受 _slots 限制"""
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, func, *args)
+
+    async def calculate(self, spec):
+        """单个规格的结果字典；并发的相同规格只计算一次"""
+        self.stats['specs'] += 1
+        row = self.cache.get(spec)
+        if row is not None:
+            return row
+        future = self._inflight.get(spec)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._inflight[spec] = loop.create_future()
+            self._pending.append(spec)
+            if self._flush_handle is None:
+                self._flush_handle = loop.call_soon(self._flush)
+        else:
+            self.stats['coalesced'] += 1
+        # shield: 一个客户端断开 (处理协程被取消) 不影响等待同一结果的其他请求
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        specs, self._pending, self._flush_handle = self._pending, [], None
+        if len(specs) <= self.inline_max or self._pool is None:
+            from tent_catalog import calculate, default_catalog
+
+            catalog = default_catalog()
+            for spec in specs:
+                try:
+                    self._resolve(spec, row=calculate(*spec, catalog=catalog))
+                except Exception as e:
+                    # 任何失败都要结束 future，否则之后同一规格的请求会一直等待
+                    self._resolve(spec, error=e)
+        else:
+            task = asyncio.ensure_future(self._flush_pooled(specs))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _flush_pooled(self, specs):
+        try:
+            rows = await self._run(compute_rows, specs)
+        except Exception as e:
+            for spec in specs:
+                self._resolve(spec, error=e)
+        else:
+            for spec, row in zip(specs, rows):
+                self._resolve(spec, row=row)
+
+    def _resolve(self, spec, row=None, error=None):
+        future = self._inflight.pop(spec)
+        if error is not None:
+            future.set_exception(error)
+            return
+        self.stats['computed'] += 1
+        self.cache.put(spec, row)
+        future.set_result(row)
+
+    async def bulk(self, records, lang=None, chunk_size=BULK_CHUNK_SIZE):
+        """
+        批量计算，按输入顺序逐块产出 NDJSON 字节串
+        每个请求最多同时提交 BULK_PREFETCH 块；调用方在写出上一块后才取下一块，客户端读得慢时自然暂停
+        """
+        pending = deque()
+        starts = iter(range(0, len(records), chunk_size))
+        try:
+            while True:
+                while len(pending) < BULK_PREFETCH:
+                    start = next(starts, None)
+                    if start is None:
+                        break
+                    chunk = records[start:start + chunk_size]
+                    pending.append(asyncio.ensure_future(self._run(bulk_chunk, start, chunk, lang)))
+                if not pending:
+                    return
+                data = await pending.popleft()
+                self.stats['bulk_chunks'] += 1
+                yield data
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def health(self):
+        return dict(self.stats, workers=self.workers, inflight=len(self._inflight), cache=self.cache.stats())
+
+
+# --- HTTP 服务 / HTTP server ---
+
+def _head(status, headers):
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+class Request:
+    __slots__ = ('method', 'path', 'query', 'version', 'headers', 'body')
+
+    def __init__(self, method, target, version, headers):
+        url = urlsplit(target)
+        self.method = method
+        self.path = url.path
+        self.query = dict(parse_qsl(url.query))
+        self.version = version
+        self.headers = headers
+        self.body = b''
+
+    def json(self):
+        try:
+            return json.loads(self.body)
+        except ValueError as e:
+            raise HttpError(400, f"invalid JSON body: {e}") from None
+
+
+def _parse_head(data):
+    try:
+        lines = data.decode('latin-1').split('\r\n')
+        method, target, version = lines[0].split(' ')
+    except ValueError:
+        raise HttpError(400, "malformed request line") from None
+    if not version.startswith('HTTP/1.'):
+        raise HttpError(400, f"unsupported protocol {version!r}")
+    headers = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(':')
+        if not sep:
+            raise HttpError(400, "malformed header line")
+        headers[name.strip().lower()] = value.strip()
+    return Request(method, target, version, headers)
+
+
+class Server:
+    """asyncio HTTP/1.1 服务: 长连接、连接数上限与超时，路由到 QuoteService"""
+
+    def __init__(self, service, host=DEFAULT_HOST, port=DEFAULT_PORT, max_connections=MAX_CONNECTIONS):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.connections = 0
+        self.rejected = 0
+        self._server = None
+        self._routes = {
+            '/health': (('GET',), self._health),
+            '/v1/fields': (('GET',), self._fields),
+            '/v1/calculate': (('GET', 'POST'), self._calculate),
+            '/v1/bulk': (('POST',), self._bulk),
+        }
+
+    async def start(self):
+        await self.service.start()
+        self._server = await asyncio.start_server(self._connection, self.host, self.port, limit=MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.service.close()
+
+    async def _connection(self, reader, writer):
+        if self.connections >= self.max_connections:
+            self.rejected += 1
+            await self._send_error(writer, HttpError(503, "too many connections", {'Retry-After': '1'}), False)
+            writer.close()
+            return
+        self.connections += 1
+        try:
+            served = 0
+            while served < KEEPALIVE_MAX_REQUESTS:
+                try:
+                    request = await self._read(reader, KEEPALIVE_TIMEOUT if served else REQUEST_TIMEOUT)
+                except HttpError as e:
+                    await self._send_error(writer, e, False)
+                    break
+                if request is None:
+                    break
+                served += 1
+                keep_alive = self._keep_alive(request) and served < KEEPALIVE_MAX_REQUESTS
+                try:
+                    await self._dispatch(request, writer, keep_alive)
+                except HttpError as e:
+                    await self._send_error(writer, e, keep_alive)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    # 处理函数中的意外错误: 返回 500 并关闭连接，而不是让连接处理协程异常退出
+                    await self._send_error(writer, HttpError(500, f"{type(e).__name__}: {e}"), False)
+                    break
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def _read(self, reader, idle_timeout):
+        """读取一个请求；连接在请求之间关闭或空闲超时返回 None"""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), idle_timeout)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+            return None
+        except asyncio.LimitOverrunError:
+            raise HttpError(431, f"request head exceeds {MAX_HEADER_BYTES} bytes") from None
+        request = _parse_head(head)
+        if 'transfer-encoding' in request.headers:
+            raise HttpError(411, "chunked request bodies are not supported, send Content-Length")
+        try:
+            length = int(request.headers.get('content-length', 0))
+        except ValueError:
+            raise HttpError(400, "invalid Content-Length") from None
+        if length < 0:
+            raise HttpError(400, "invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, f"request body exceeds {MAX_BODY_BYTES} bytes")
+        if length:
+            try:
+                request.body = await asyncio.wait_for(reader.readexactly(length), REQUEST_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise HttpError(408, "timed out reading request body") from None
+        return request
+
+    @staticmethod
+    def _keep_alive(request):
+        connection = request.headers.get('connection', '').lower()
+        if request.version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+    @staticmethod
+    def _connection_headers(keep_alive):
+        if keep_alive:
+            return {'Connection': 'keep-alive',
+                    'Keep-Alive': f"timeout={int(KEEPALIVE_TIMEOUT)}, max={KEEPALIVE_MAX_REQUESTS}"}
+        return {'Connection': 'close'}
+
+    async def _dispatch(self, request, writer, keep_alive):
+        self.service.stats['requests'] += 1
+        route = self._routes.get(request.path)
+        if route is None:
+            raise HttpError(404, f"no such endpoint {request.path!r}")
+        methods, handler = route
+        if request.method not in methods:
+            raise HttpError(405, f"use {' or '.join(methods)}", {'Allow': ', '.join(methods)})
+        await handler(request, writer, keep_alive)
+
+    async def _send_json(self, writer, status, obj, keep_alive, headers=None):
+        try:
+            body = json.dumps(obj, ensure_ascii=False, allow_nan=False).encode('utf-8')
+        except ValueError as e:
+            # NaN / Infinity 不是合法 JSON；参数校验应已拦下，这里兜底按请求错误处理
+            raise HttpError(400, f"result is not valid JSON: {e}") from None
+        head = {'Content-Type': 'application/json; charset=utf-8', 'Content-Length': str(len(body))}
+        head.update(self._connection_headers(keep_alive))
+        head.update(headers or {})
+        writer.write(_head(status, head) + body)
+        await writer.drain()
+
+    async def _send_error(self, writer, error, keep_alive):
+        try:
+            await self._send_json(writer, error.status, {'error': str(error)}, keep_alive, error.headers)
+        except ConnectionError:
+            pass
+
+    # --- 路由 / Routes ---
+
+    async def _health(self, request, writer, keep_alive):
+        status = dict(status='ok', connections=self.connections, rejected=self.rejected, **self.service.health())
+        await self._send_json(writer, 200, status, keep_alive)
+
+    async def _fields(self, request, writer, keep_alive):
+        lang = _check_lang(request.query.get('lang', 'zh'))
+        await self._send_json(writer, 200, field_labels(lang), keep_alive)
+
+    async def _calculate(self, request, writer, keep_alive):
+        from tent_pricing import default_price_list
+
+        record = dict(request.query)
+        if request.method == 'POST':
+            record = request.json()
+            if not isinstance(record, dict):
+                raise HttpError(400, "expected a JSON object")
+        lang = _check_lang(request.query.get('lang') or record.pop('lang', None))
+        try:
+            spec = parse_params(record)
+            row = await self.service.calculate(spec)
+        except (ValueError, ArithmeticError) as e:
+            raise HttpError(400, str(e)) from None
+        prices = default_price_list()
+        quote = _quote_single(prices, spec, row) if prices is not None else None
+        await self._send_json(writer, 200, payload(spec, row, lang, quote), keep_alive)
+
+    async def _bulk(self, request, writer, keep_alive):
+        body = request.json()
+        lang = request.query.get('lang')
+        if isinstance(body, dict):
+            lang = lang or body.get('lang')
+            body = body.get('specs')
+        if not isinstance(body, list):
+            raise HttpError(400, 'expected a JSON array of specs or {"specs": [...]}')
+        if len(body) > MAX_BULK_SPECS:
+            raise HttpError(413, f"at most {MAX_BULK_SPECS} specs per request, got {len(body)}")
+        _check_lang(lang)
+
+        head = {'Content-Type': 'application/x-ndjson; charset=utf-8', 'Transfer-Encoding': 'chunked'}
+        head.update(self._connection_headers(keep_alive))
+        writer.write(_head(200, head))
+        try:
+            async with contextlib.aclosing(self.service.bulk(body, lang)) as chunks:
+                async for data in chunks:
+                    writer.write(b'%x\r\n%s\r\n' % (len(data), data))
+                    # 背压: 客户端没读走之前不取下一块 (也就不再向进程池提交)
+                    await writer.drain()
+        except ConnectionError:
+            raise
+        except Exception as e:
+            # 响应头已发出，只能在流中报告错误并关闭连接
+            data = (json.dumps({'error': f"{type(e).__name__}: {e}"}) + '\n').encode('utf-8')
+            writer.write(b'%x\r\n%s\r\n0\r\n\r\n' % (len(data), data))
+            await writer.drain()
+            raise ConnectionError("bulk request failed") from e
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, max_connections=MAX_CONNECTIONS):
+    server = Server(QuoteService(workers), host, port, max_connections)
+    try:
+        await server.start()
+        # 负载测试通过这一行得知实际端口 (--port 0 时由系统分配)
+        print(f"listening on http://{server.host}:{server.port} ({server.service.workers} workers)", flush=True)
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+# --- 负载测试 / Load test ---
+
+class Client:
+    """最小的 HTTP/1.1 长连接客户端 (只用于负载测试)，服务端关闭连接后自动重连"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._reader = self._writer = None
+
+    async def request(self, method, path, body=None):
+        """:return: (状态码, 响应体字节串)"""
+        data = b'' if body is None else json.dumps(body).encode('utf-8')
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n\r\n").encode('latin-1')
+        for attempt in (0, 1):
+            if self._writer is None:
+                self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                self._writer.write(head + data)
+                await self._writer.drain()
+                return await self._response()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # 服务端在两次请求之间关闭了长连接，重连后重试一次
+                self.close()
+                if attempt:
+                    raise
+
+    async def _response(self):
+        reader = self._reader
+        head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+        status = int(head[0].split(' ')[1])
+        headers = {}
+        for line in head[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if headers.get('transfer-encoding') == 'chunked':
+            parts = []
+            while True:
+                size = int((await reader.readuntil(b'\r\n'))[:-2], 16)
+                if not size:
+                    await reader.readuntil(b'\r\n')
+                    break
+                parts.append((await reader.readexactly(size + 2))[:-2])
+            body = b''.join(parts)
+        else:
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+        if headers.get('connection') == 'close':
+            self.close()
+        return status, body
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+
+def _random_spec(rng, distinct):
+    # distinct 个不同尺寸: 数值越小，并发的相同规格越多 (测试合并与缓存)
+    i = rng.randrange(distinct)
+    return {'length': 10 + 5 * (i % 20), 'width': 6 + 2 * (i // 20 % 20), 'side_height': 3 + i // 400 % 3}
+
+
+async def _load_user(host, port, rng, requests, bulk_every, bulk_size, distinct, lang, samples, errors):
+    client = Client(host, port)
+    try:
+        for n in range(requests):
+            bulk = bulk_every and n % bulk_every == bulk_every - 1
+            started = time.perf_counter()
+            if bulk:
+                specs = [_random_spec(rng, distinct * 100) for _ in range(bulk_size)]
+                status, body = await client.request('POST', f"/v1/bulk?lang={lang}", specs)
+                ok = status == 200 and body.count(b'\n') == bulk_size
+            else:
+                spec = _random_spec(rng, distinct)
+                query = '&'.join(f"{k}={v}" for k, v in spec.items())
+                status, body = await client.request('GET', f"/v1/calculate?{query}&lang={lang}")
+                ok = status == 200
+            samples.append(('bulk' if bulk else 'single', time.perf_counter() - started))
+            if not ok:
+                errors.append(f"{'bulk' if bulk else 'single'} request returned {status}: {body[:200]!r}")
+    except (OSError, asyncio.IncompleteReadError) as e:
+        errors.append(repr(e))
+    finally:
+        client.close()
+
+
+async def run_load(host, port, connections, requests, bulk_every=20, bulk_size=1000, distinct=50,
+                   lang='en', seed=0):
+    """
+    connections 个长连接并发发送请求 (每 bulk_every 个请求中有一个批量请求)
+    :return: {'samples': [(类型, 秒)], 'errors': [...], 'wall': 秒, 'health': 服务端状态}
+    """
+    samples, errors = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _load_user(host, port, random.Random(seed + i), requests, bulk_every, bulk_size, distinct, lang,
+                   samples, errors)
+        for i in range(connections)
+    ))
+    wall = time.perf_counter() - started
+    client = Client(host, port)
+    try:
+        _, body = await client.request('GET', '/health')
+    finally:
+        client.close()
+    return {'samples': samples, 'errors': errors, 'wall': wall, 'health': json.loads(body)}
+
+
+def summarize_load(result, bulk_size):
+    """按请求类型汇总延迟分位数 (毫秒)、吞吐量与服务端合并/缓存统计"""
+    from tent_load import PERCENTILES, percentile
+
+    wall = result['wall']
+    summary = {'requests': len(result['samples']), 'wall_s': round(wall, 2),
+               'throughput': round(len(result['samples']) / wall, 1) if wall else None, 'kinds': {}}
+    for kind in ('single', 'bulk'):
+        values = sorted(s for k, s in result['samples'] if k == kind)
+        if not values:
+            continue
+        stats = {'count': len(values)}
+        for p in PERCENTILES:
+            stats[f'p{p}_ms'] = round(percentile(values, p) * 1000, 1)
+        if kind == 'bulk':
+            stats['rows_per_s'] = round(len(values) * bulk_size / wall)
+        summary['kinds'][kind] = stats
+    health = result['health']
+    summary.update(coalesced=health['coalesced'], computed=health['computed'],
+                   cache_hit_rate=health['cache']['hit_rate'], rejected=health['rejected'],
+                   errors=result['errors'])
+    return summary
+
+
+def _start_server(workers):
+    """在子进程中启动服务 (端口由系统分配)，返回 (进程, 端口)"""
+    args = [sys.executable, os.path.abspath(__file__), 'serve', '--port', '0']
+    if workers is not None:
+        args += ['--workers', str(workers)]
+    child = subprocess.Popen(args, stdout=subprocess.PIPE, text=True)
+    line = child.stdout.readline()
+    if not line.startswith('listening on'):
+        child.kill()
+        raise RuntimeError(f"server failed to start: {line!r}")
+    return child, int(line.split()[2].rsplit(':', 1)[1])
+
+
+# --- 命令行 / Command line ---
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="篷房计算 HTTP/JSON 接口 / Tent quoting API")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('serve', help="启动服务")
+    p.add_argument('--host', default=DEFAULT_HOST)
+    p.add_argument('--port', type=int, default=DEFAULT_PORT, help="0 表示由系统分配")
+    p.add_argument('--workers', type=int, help="批量计算的进程数 (默认 CPU 核数，0 = 不用进程池)")
+    p.add_argument('--max-connections', type=int, default=MAX_CONNECTIONS)
+
+    p = sub.add_parser('load', help="本机负载测试")
+    p.add_argument('--url', help="已运行的服务 host:port，缺省时在子进程中启动一个")
+    p.add_argument('--workers', type=int, help="自动启动的服务的进程数")
+    p.add_argument('--connections', type=int, default=32, help="并发长连接数")
+    p.add_argument('--requests', type=int, default=200, help="每个连接发送的请求数")
+    p.add_argument('--bulk-every', type=int, default=20, help="每 N 个请求中有一个批量请求 (0 = 只发单个请求)")
+    p.add_argument('--bulk-size', type=int, default=1000, help="每个批量请求的规格数")
+    p.add_argument('--distinct', type=int, default=50, help="单个请求使用的不同规格数")
+    p.add_argument('--lang', choices=LANGUAGES, default='en')
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--json', help="把结果另存为 JSON 文件")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'serve':
+        try:
+            asyncio.run(serve(args.host, args.port, args.workers, args.max_connections))
+        except KeyboardInterrupt:
+            pass
+        except OSError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    if args.connections < 1 or args.requests < 1:
+        print("--connections and --requests must be >= 1", file=sys.stderr)
+        return 2
+    child = None
+    if args.url:
+        host, _, port = args.url.rpartition(':')
+        port = int(port)
+    else:
+        child, port = _start_server(args.workers)
+        host = DEFAULT_HOST
+    try:
+        result = asyncio.run(run_load(host, port, args.connections, args.requests, args.bulk_every,
+                                      args.bulk_size, args.distinct, args.lang, args.seed))
+    finally:
+        if child is not None:
+            child.terminate()
+            child.wait()
+    summary = summarize_load(result, args.bulk_size)
+
+    print(f"{summary['requests']} requests over {args.connections} connections in {summary['wall_s']}s "
+          f"({summary['throughput']} req/s)")
+    print(f"{'kind':<8}{'count':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'rows/s':>10}")
+    for kind, stats in summary['kinds'].items():
+        print(f"{kind:<8}{stats['count']:>8}{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}"
+              f"{stats.get('rows_per_s', '-'):>10}")
+    print(f"coalesced {summary['coalesced']}, computed {summary['computed']}, "
+          f"cache hit rate {summary['cache_hit_rate']:.1%}, rejected {summary['rejected']}")
+    for e in summary['errors'][:5]:
+        print(e, file=sys.stderr)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=1)
+    return 1 if summary['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+进程级 LRU 缓存 (无第三方依赖)
+Streamlit 每次重跑都会重新执行 web_app.py，模块级变量随之重建；
+放在独立模块中的缓存实例则由所有会话、所有重跑共享。
+"""
+import os
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAXSIZE = 256
+
+
+class LRUCache:
+    """线程安全的有界 LRU 缓存，带命中/未命中计数"""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        """
+        :param maxsize: 最大条目数，0 表示禁用缓存 (每次都重新计算)
+        """
+        self.maxsize = max(0, int(maxsize))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_create(self, key, factory):
+        """
+        命中时返回缓存值，否则调用 factory() 计算并写入。
+        计算在锁外进行，避免慢计算阻塞其他会话；并发未命中时以后写入者为准。
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = factory()
+        self.put(key, value)
+        return value
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = max(0, int(maxsize))
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def stats(self):
+        """返回 {size, maxsize, hits, misses, evictions, hit_rate}"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+# --- 进程级共享实例 / Process-wide instances ---
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def shared_cache(name, maxsize=None):
+    """
+    按名称获取进程级共享缓存。
+    maxsize 缺省时读取环境变量 TENT_CACHE_SIZE (默认 256，0 表示禁用)。
+    """
+    with _registry_lock:
+        cache = _registry.get(name)
+        if cache is None:
+            if maxsize is None:
+                maxsize = int(os.environ.get('TENT_CACHE_SIZE', DEFAULT_MAXSIZE))
+            cache = _registry[name] = LRUCache(maxsize)
+        return cache
@@ -0,0 +1,256 @@
+"""
+标准目录尺寸预计算表
+把标准 BT/PT 目录网格 (跨度 10–50 米、长度为单元长度整数倍、标准边高、4 孔基座) 的
+全部 calculate_all 结果预先算好，存为 NumPy 结构化数组 (.npy) 与元数据 (.json)。
+界面与命令行启动时以只读内存映射方式打开，目录尺寸按坐标直接换算行号，O(1) 查表；
+多个 Streamlit 工作进程映射同一文件，共享操作系统页缓存，不各自复制一份。
+表中记录公式指纹，公式改动后旧表会被拒绝，自动回退到实时计算。
+
+用法:
+    python tent_catalog.py build            # 生成 tent_catalog.npy / tent_catalog.json
+    python tent_catalog.py info             # 查看表信息与是否过期
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+
+from tent_core import BATCH_INPUTS, TentCalculator
+from tent_metrics import span
+
+FORMAT_VERSION = 1
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tent_catalog.npy')
+
+# 标准目录网格; 长度 = 单元数 × 单元长度
+CATALOG_AXES = {
+    'unit_length': (3.0, 5.0),                                   # PT 3 米 / BT 5 米
+    'units': tuple(range(1, 41)),                                # 1–40 个单元
+    'width': tuple(float(w) for w in range(10, 51)),             # 跨度 10–50 米
+    'side_height': (2.5, 3.0, 3.5, 4.0, 4.5, 5.0, 6.0),
+    'gable_unit_length': (3.0, 5.0),
+    'holes_per_base': (4,),
+    'roof_pitch_factor': (1.1, 1.15, 1.2),
+}
+# 额外保存的基础参数 (与 calculate_batch 的输出一致)
+BASIC_FIELDS = ('num_units', 'area', 'perimeter')
+
+
+class StaleCatalogError(Exception):
+    """预计算表与当前公式或格式不一致"""
+
+
+def catalog_fingerprint():
+    return TentCalculator.rules.fingerprint()
+
+
+def _meta_path(path):
+    return os.path.splitext(path)[0] + '.json'
+
+
+def _grid_columns(axes):
+    """按行优先顺序展开目录网格为列式参数"""
+    import numpy as np
+
+    shape = tuple(len(v) for v in axes.values())
+    index = np.unravel_index(np.arange(math.prod(shape)), shape)
+    cols = {k: np.asarray(v)[i] for (k, v), i in zip(axes.items(), index)}
+    cols['length'] = cols.pop('units') * cols['unit_length']
+    return cols
+
+
+def build(path=DEFAULT_PATH, axes=CATALOG_AXES):
+    """生成预计算表，返回行数"""
+    import numpy as np
+
+    cols = _grid_columns(axes)
+    results = TentCalculator.calculate_batch({k: cols[k] for k in BATCH_INPUTS})
+    fields = []
+    for name, values in results.items():
+        if values.dtype == np.bool_:
+            fields.append((name, '?'))
+        elif values.dtype.kind in 'iu':
+            if len(values) and (values.max() > np.iinfo(np.int32).max or values.min() < np.iinfo(np.int32).min):
+                raise OverflowError(f"catalog column '{name}' does not fit in int32")
+            fields.append((name, '<i4'))
+        else:
+            fields.append((name, '<f8'))
+    rows = len(cols['length'])
+
+    # 先写到临时文件再替换，正在映射旧表的进程不受影响
+    tmp = path + '.tmp'
+    table = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.dtype(fields), shape=(rows,))
+    for name, values in results.items():
+        table[name] = values
+    table.flush()
+    del table
+    meta = {
+        'format': FORMAT_VERSION,
+        'rules': TentCalculator.rules.name,
+        'fingerprint': catalog_fingerprint(),
+        'rows': rows,
+        'axes': {k: list(v) for k, v in axes.items()},
+    }
+    with open(_meta_path(tmp), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    # 先换表、最后换元数据: 两次替换之间的读者看到的是新表配旧指纹，会当作过期拒绝，
+    # 而不会把新指纹配上旧表 (Catalog 打开后还会确认元数据未被替换)
+    os.replace(tmp, path)
+    os.replace(_meta_path(tmp), _meta_path(path))
+    return rows
+
+
+class Catalog:
+    """只读内存映射的预计算表"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        import numpy as np
+
+        with open(_meta_path(path), encoding='utf-8') as f:
+            meta = json.load(f)
+            meta_id = os.fstat(f.fileno()).st_ino
+        if meta.get('format') != FORMAT_VERSION:
+            raise StaleCatalogError(f"{path}: format {meta.get('format')} != {FORMAT_VERSION}")
+        if meta.get('fingerprint') != catalog_fingerprint():
+            raise StaleCatalogError(f"{path}: built for formula set {meta.get('fingerprint')}, "
+                                    f"current is {catalog_fingerprint()}; run 'python tent_catalog.py build'")
+        self.path = path
+        self.meta = meta
+        self.table = np.load(path, mmap_mode='r')
+        # 读元数据与映射表之间若有 build 完成，表可能已是新的而元数据是旧的
+        if os.stat(_meta_path(path)).st_ino != meta_id:
+            raise StaleCatalogError(f"{path}: rebuilt while loading")
+        if len(self.table) != meta['rows']:
+            raise StaleCatalogError(f"{path}: row count does not match metadata")
+        self.fields = self.table.dtype.names
+
+        # 每个坐标轴: 值 -> 下标；行号按行优先顺序换算
+        self._axes = {k: {v: i for i, v in enumerate(vals)} for k, vals in meta['axes'].items()}
+        self._strides = {}
+        stride = 1
+        for k in reversed(list(meta['axes'])):
+            self._strides[k] = stride
+            stride *= len(meta['axes'][k])
+        self._max_units = max(meta['axes']['units'])
+
+    def __len__(self):
+        return len(self.table)
+
+    def inputs(self):
+        """各行的构造参数 {列名: 数组}，与表中行号对齐"""
+        return _grid_columns(self.meta['axes'])
+
+    def index(self, length, width, side_height, unit_length, gable_unit_length, holes_per_base, roof_pitch_factor):
+        """目录尺寸对应的行号，不在目录网格内时返回 None"""
+        unit_length = float(unit_length)
+        length = float(length)
+        if unit_length <= 0:
+            return None
+        units = round(length / unit_length)
+        # 长度必须正好是单元长度的整数倍 (与生成表时的乘法一致)
+        if units < 1 or units > self._max_units or units * unit_length != length:
+            return None
+        coords = {
+            'unit_length': unit_length,
+            'units': units,
+            'width': float(width),
+            'side_height': float(side_height),
+            'gable_unit_length': float(gable_unit_length),
+            'holes_per_base': int(holes_per_base),
+            'roof_pitch_factor': float(roof_pitch_factor),
+        }
+        row = 0
+        for name, value in coords.items():
+            i = self._axes[name].get(value)
+            if i is None:
+                return None
+            row += i * self._strides[name]
+        return row
+
+    def lookup(self, *params):
+        """
+        查表
+        :param params: 与 TentCalculator 构造参数相同
+        :return: {num_units, area, perimeter, 以及 calculate_all 的全部输出}，不在目录内时返回 None
+        """
+        row = self.index(*params)
+        if row is None:
+            return None
+        record = self.table[row]
+        return {name: record[name].item() for name in self.fields}
+
+
+def calculate(*params, catalog=None):
+    """
+    目录内尺寸查表，其余实时计算
+    :return: 与 Catalog.lookup 相同结构的字典
+    """
+    if catalog is not None:
+        with span('catalog_lookup'):
+            row = catalog.lookup(*params)
+        if row is not None:
+            return row
+    with span('construct'):
+        calc = TentCalculator(*params)
+    with span('calculate_all'):
+        row = {'num_units': calc.num_units, 'area': calc.area, 'perimeter': calc.perimeter}
+        row.update(calc.calculate_all())
+    return row
+
+
+_default = None
+_default_lock = threading.Lock()
+_default_loaded = False
+
+
+def default_catalog():
+    """
+    进程级共享的预计算表 (环境变量 TENT_CATALOG 指定路径，默认 tent_catalog.npy)。
+    文件不存在或已过期时返回 None，调用方回退到实时计算。
+    """
+    global _default, _default_loaded
+    if _default_loaded:
+        return _default
+    with _default_lock:
+        if not _default_loaded:
+            path = os.environ.get('TENT_CATALOG', DEFAULT_PATH)
+            try:
+                _default = Catalog(path)
+            except FileNotFoundError:
+                _default = None
+            except StaleCatalogError as e:
+                print(f"⚠️ ignoring stale catalog: {e}", file=sys.stderr)
+                _default = None
+            _default_loaded = True
+    return _default
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="标准目录预计算表 / Catalog lookup table")
+    parser.add_argument('command', choices=('build', 'info'))
+    parser.add_argument('--path', default=os.environ.get('TENT_CATALOG', DEFAULT_PATH))
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        rows = build(args.path)
+        size = os.path.getsize(args.path)
+        print(f"built {args.path}: {rows:,} rows, {size / 1e6:.1f} MB, fingerprint {catalog_fingerprint()}")
+        return 0
+
+    try:
+        catalog = Catalog(args.path)
+    except FileNotFoundError:
+        print(f"{args.path} not found; run 'python tent_catalog.py build'")
+        return 1
+    except StaleCatalogError as e:
+        print(f"❌ stale: {e}")
+        return 1
+    print(f"{args.path}: {len(catalog):,} rows, fingerprint {catalog.meta['fingerprint']} (current)")
+    for name, values in catalog.meta['axes'].items():
+        print(f"  {name}: {values[0]} … {values[-1]} ({len(values)} values)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
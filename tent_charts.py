@@ -0,0 +1,344 @@
+"""
+多方案结果的可视化 (服务端聚合)
+单顶篷房的两张图把几行数据直接嵌在图表规格里；参数扫描或目录表有 10^5 行以上，
+原样发给浏览器会让页面又大又卡。这里先在服务端聚合，图表里只放聚合后的数据:
+    Heatmap       主要构件总数在 长 × 宽 网格上的最小/平均/最大值 (每轴最多 MAX_BINS 格)
+    Distribution  紧固件数量的分布 (每个字段最多 HIST_BINS 根柱)
+两者都可以分块累加、跨进程合并，扫描时每块在工作进程内聚合，只有聚合结果传回主进程。
+生成的 Vega-Lite 规格按 (数据集, 图表, 语言) 缓存在进程级 LRU 中。
+
+用法:
+    python tent_charts.py --catalog -o catalog_charts.html        # 目录预计算表
+    python tent_charts.py results.parquet -o charts.json           # tent_cli.py --rules core 的输出 (CSV/Parquet)
+"""
+import argparse
+import hashlib
+import os
+import sys
+
+from tent_cache import shared_cache
+
+# 热力图每轴最多的格数，分布图每个字段最多的柱数
+MAX_BINS = 40
+HIST_BINS = 30
+HEATMAP_FIELD = 'main_comp_total'
+FASTENER_FIELDS = ('expansion_screw', 'drilling_steel', 'ridge_conn', 'eave_conn')
+HEATMAP_STATS = ('min', 'mean', 'max')
+
+
+def _edges(values, max_bins):
+    """
+    坐标轴的格边界: 不同取值不超过 max_bins 时每个值一格 (边界取相邻值的中点)，否则等宽分格
+    :raises ValueError: 没有任何取值 (空结果表)
+    """
+    import numpy as np
+
+    values = np.unique(np.asarray(values, dtype=float))
+    if not len(values):
+        raise ValueError("no rows to chart")
+    if len(values) == 1:
+        return np.array([values[0] - 0.5, values[0] + 0.5])
+    if len(values) <= max_bins:
+        mids = (values[1:] + values[:-1]) / 2
+        return np.concatenate(([2 * values[0] - mids[0]], mids, [2 * values[-1] - mids[-1]]))
+    return np.linspace(values[0], values[-1], max_bins + 1)
+
+
+def _bin_index(edges, values):
+    import numpy as np
+
+    # 最后一格包含右边界
+    return np.clip(np.searchsorted(edges, values, side='right') - 1, 0, len(edges) - 2)
+
+
+class Heatmap:
+    """某个字段在 长 × 宽 网格上的聚合 (计数、求和、最小、最大)，可分块累加与合并"""
+
+    def __init__(self, x_edges, y_edges, field=HEATMAP_FIELD, x='length', y='width'):
+        import numpy as np
+
+        self.x, self.y, self.field = x, y, field
+        self.x_edges = np.asarray(x_edges, dtype=float)
+        self.y_edges = np.asarray(y_edges, dtype=float)
+        shape = (len(self.x_edges) - 1) * (len(self.y_edges) - 1)
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.sum = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+
+    def empty(self):
+        return Heatmap(self.x_edges, self.y_edges, self.field, self.x, self.y)
+
+    def add(self, columns):
+        import numpy as np
+
+        values = np.asarray(columns[self.field], dtype=float)
+        if not len(values):
+            return self
+        ny = len(self.y_edges) - 1
+        cell = _bin_index(self.x_edges, columns[self.x]) * ny + _bin_index(self.y_edges, columns[self.y])
+        self.count += np.bincount(cell, minlength=len(self.count))
+        self.sum += np.bincount(cell, weights=values, minlength=len(self.sum))
+        np.minimum.at(self.min, cell, values)
+        np.maximum.at(self.max, cell, values)
+        return self
+
+    def merge(self, other):
+        import numpy as np
+
+        self.count += other.count
+        self.sum += other.sum
+        np.minimum(self.min, other.min, out=self.min)
+        np.maximum(self.max, other.max, out=self.max)
+        return self
+
+    def cells(self):
+        """非空格子的列式数据: 格边界 x0/x1/y0/y1、count、min/mean/max (最多 MAX_BINS² 行)"""
+        import numpy as np
+
+        ny = len(self.y_edges) - 1
+        cell = np.flatnonzero(self.count)
+        ix, iy = cell // ny, cell % ny
+        return {
+            'x0': np.round(self.x_edges[ix], 3), 'x1': np.round(self.x_edges[ix + 1], 3),
+            'y0': np.round(self.y_edges[iy], 3), 'y1': np.round(self.y_edges[iy + 1], 3),
+            'count': self.count[cell],
+            'min': self.min[cell],
+            'mean': np.round(self.sum[cell] / self.count[cell], 2),
+            'max': self.max[cell],
+        }
+
+
+class Distribution:
+    """整数字段的取值计数 {字段: (取值数组, 计数数组)}，可分块累加与合并；出图时再分柱"""
+
+    def __init__(self, fields=FASTENER_FIELDS):
+        import numpy as np
+
+        self.fields = tuple(fields)
+        self.counts = {f: (np.zeros(0), np.zeros(0, dtype=np.int64)) for f in self.fields}
+
+    def empty(self):
+        return Distribution(self.fields)
+
+    def _combine(self, field, values, counts):
+        import numpy as np
+
+        old_values, old_counts = self.counts[field]
+        unique, inverse = np.unique(np.concatenate((old_values, values)), return_inverse=True)
+        total = np.bincount(inverse, weights=np.concatenate((old_counts, counts)), minlength=len(unique))
+        self.counts[field] = (unique, total.astype(np.int64))
+
+    def add(self, columns):
+        import numpy as np
+
+        for field in self.fields:
+            values, counts = np.unique(np.asarray(columns[field], dtype=float), return_counts=True)
+            self._combine(field, values, counts)
+        return self
+
+    def merge(self, other):
+        for field in self.fields:
+            self._combine(field, *other.counts[field])
+        return self
+
+    def bins(self, field, max_bins=HIST_BINS):
+        """
+        一个字段的柱: 每根柱为闭区间 [start, end] 的整数取值
+        :return: {'start', 'end', 'count'} 数组，最多 max_bins 根
+        """
+        import numpy as np
+
+        values, counts = self.counts[field]
+        if not len(values):
+            return {'start': values, 'end': values, 'count': counts}
+        low, high = int(values[0]), int(values[-1])
+        width = max(1, -(-(high - low + 1) // max_bins))
+        index = ((values - low) // width).astype(np.int64)
+        total = np.bincount(index, weights=counts).astype(np.int64)
+        starts = low + width * np.arange(len(total))
+        keep = total > 0
+        return {'start': starts[keep], 'end': starts[keep] + width - 1, 'count': total[keep]}
+
+
+class Aggregates:
+    """一组可合并的聚合: 主要构件总数热力图 + 紧固件分布"""
+
+    def __init__(self, heatmap, distribution):
+        self.heatmap = heatmap
+        self.distribution = distribution
+
+    @classmethod
+    def for_axes(cls, lengths, widths, max_bins=MAX_BINS):
+        """按已知的长度/宽度取值确定网格 (扫描前就能确定，各块可独立聚合)"""
+        return cls(Heatmap(_edges(lengths, max_bins), _edges(widths, max_bins)), Distribution())
+
+    @classmethod
+    def for_grid(cls, grid, max_bins=MAX_BINS):
+        """tent_sweep.ParamGrid 对应的空聚合"""
+        return cls.for_axes(grid.axes['length'], grid.axes['width'], max_bins)
+
+    @classmethod
+    def from_columns(cls, columns, max_bins=MAX_BINS):
+        """一次性聚合一张完整的结果表 (需要 length、width 与结果列)"""
+        return cls.for_axes(columns['length'], columns['width'], max_bins).add(columns)
+
+    @property
+    def rows(self):
+        return int(self.heatmap.count.sum())
+
+    def empty(self):
+        return Aggregates(self.heatmap.empty(), self.distribution.empty())
+
+    def add(self, columns):
+        self.heatmap.add(columns)
+        self.distribution.add(columns)
+        return self
+
+    def aggregate(self, columns):
+        """只聚合这一块 (进程池任务中使用)，返回新的聚合"""
+        return self.empty().add(columns)
+
+    def merge(self, other):
+        self.heatmap.merge(other.heatmap)
+        self.distribution.merge(other.distribution)
+        return self
+
+
+# --- 图表 / Charts ---
+
+def heatmap_chart(alt, pd, heatmap, t, stat='min'):
+    """热力图: 每格颜色为该格内方案的 min/mean/max，提示中给出格范围与方案数"""
+    label = t.get(heatmap.field, heatmap.field)
+    df = pd.DataFrame(heatmap.cells())
+    return alt.Chart(df).mark_rect().encode(
+        x=alt.X('x0:Q', title=t[heatmap.x], scale=alt.Scale(zero=False)),
+        x2='x1:Q',
+        y=alt.Y('y0:Q', title=t[heatmap.y], scale=alt.Scale(zero=False)),
+        y2='y1:Q',
+        color=alt.Color(f'{stat}:Q', title=f"{label} ({t['chart_' + stat]})", scale=alt.Scale(scheme='viridis')),
+        tooltip=[
+            alt.Tooltip('x0:Q', title=t[heatmap.x] + ' ≥', format='.1f'),
+            alt.Tooltip('x1:Q', title=t[heatmap.x] + ' ≤', format='.1f'),
+            alt.Tooltip('y0:Q', title=t[heatmap.y] + ' ≥', format='.1f'),
+            alt.Tooltip('y1:Q', title=t[heatmap.y] + ' ≤', format='.1f'),
+            alt.Tooltip('count:Q', title=t['chart_count']),
+        ] + [alt.Tooltip(f'{s}:Q', title=t['chart_' + s]) for s in HEATMAP_STATS],
+    ).properties(title=t['chart_heatmap'].format(label=label), height=380)
+
+
+def distribution_chart(alt, pd, distribution, t):
+    """紧固件分布: 每个字段一个小图，横轴各自独立"""
+    parts = []
+    for field in distribution.fields:
+        bins = distribution.bins(field)
+        parts.append(pd.DataFrame({'field': t.get(field, field), 'start': bins['start'], 'end': bins['end'] + 1,
+                                   'count': bins['count']}))
+    df = pd.concat(parts, ignore_index=True)
+    bars = alt.Chart(df).mark_bar().encode(
+        x=alt.X('start:Q', bin='binned', title=None),
+        x2='end:Q',
+        y=alt.Y('count:Q', title=t['chart_count']),
+        tooltip=[alt.Tooltip('field:N', title=t['col_item']), alt.Tooltip('start:Q', title='≥'),
+                 alt.Tooltip('end:Q', title='<'), alt.Tooltip('count:Q', title=t['chart_count'])],
+    ).properties(width=260, height=160)
+    return bars.facet(facet=alt.Facet('field:N', title=None), columns=2, title=t['chart_fasteners']) \
+        .resolve_scale(x='independent', y='independent')
+
+
+def dataset_key(columns, names=('length', 'width', HEATMAP_FIELD) + FASTENER_FIELDS):
+    """按列内容计算数据集指纹 (10^5 行约 1 ms)，用作图表缓存键"""
+    import numpy as np
+
+    digest = hashlib.blake2b(digest_size=16)
+    for name in names:
+        values = np.ascontiguousarray(columns[name])
+        digest.update(name.encode())
+        digest.update(values.dtype.str.encode())
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+def _spec_cache():
+    return shared_cache('tent_charts.specs')
+
+
+def chart_spec(kind, key, lang, build):
+    """
+    生成 (并缓存) 图表的 Vega-Lite 规格字典
+    :param kind: 图表名 (如 'heatmap:min')
+    :param key: 数据集标识 (dataset_key 或扫描网格等可哈希值)
+    :param lang: 语言名，标签随语言变化
+    :param build: 无参函数，返回 Altair 图表
+    """
+    return _spec_cache().get_or_create((kind, key, lang), lambda: build().to_dict())
+
+
+def chart_specs(alt, pd, aggregates, t, key, lang, stat='min'):
+    """热力图与紧固件分布的规格 (heatmap, distribution)"""
+    return (
+        chart_spec(f'heatmap:{stat}', key, lang, lambda: heatmap_chart(alt, pd, aggregates.heatmap, t, stat)),
+        chart_spec('fasteners', key, lang, lambda: distribution_chart(alt, pd, aggregates.distribution, t)),
+    )
+
+
+# --- 命令行 / Command line ---
+
+def _load_columns(path):
+    import pandas as pd
+
+    names = ['length', 'width', HEATMAP_FIELD, *FASTENER_FIELDS]
+    if path.endswith('.parquet'):
+        df = pd.read_parquet(path, columns=names)
+    else:
+        df = pd.read_csv(path, usecols=names, encoding='utf-8-sig')
+    return {name: df[name].to_numpy() for name in names}
+
+
+def main(argv=None):
+    import json
+
+    parser = argparse.ArgumentParser(description="多方案结果的聚合图表 / Aggregated charts for batch results")
+    parser.add_argument('input', nargs='?', help="结果文件 (.csv / .parquet，需含 length、width 与结果列)")
+    parser.add_argument('--catalog', action='store_true', help="使用目录预计算表 (见 tent_catalog.py)")
+    parser.add_argument('-o', '--output', required=True, help="输出 .html 或 .json (Vega-Lite 规格)")
+    parser.add_argument('--stat', choices=HEATMAP_STATS, default='min', help="热力图每格显示的统计量")
+    parser.add_argument('--lang', choices=('zh', 'en'), default='zh')
+    args = parser.parse_args(argv)
+    if bool(args.input) == args.catalog:
+        parser.error("give either an input file or --catalog")
+
+    import altair as alt
+    import pandas as pd
+
+    from tent_core import TRANSLATIONS
+
+    try:
+        if args.catalog:
+            from tent_catalog import Catalog
+
+            catalog = Catalog()
+            columns = dict(catalog.inputs())
+            columns.update((name, catalog.table[name]) for name in (HEATMAP_FIELD,) + FASTENER_FIELDS)
+        else:
+            columns = _load_columns(args.input)
+        aggregates = Aggregates.from_columns(columns)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    t = TRANSLATIONS['中文' if args.lang == 'zh' else 'English']
+    chart = alt.vconcat(heatmap_chart(alt, pd, aggregates.heatmap, t, args.stat),
+                        distribution_chart(alt, pd, aggregates.distribution, t))
+    if args.output.endswith('.json'):
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(chart.to_dict(), f, ensure_ascii=False)
+    else:
+        chart.save(args.output)
+    print(f"{aggregates.rows:,} rows -> {len(aggregates.heatmap.cells()['count'])} heatmap cells, "
+          f"{os.path.getsize(args.output):,} bytes", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
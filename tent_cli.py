@@ -0,0 +1,334 @@
+"""
+篷房配件计算 - 命令行批处理模式
+从 CSV / JSONL 文件或标准输入读取篷房规格，逐行计算并流式输出结果。
+
+用法:
+    python tent_cli.py orders.csv --format jsonl > results.jsonl
+    cat orders.jsonl | python tent_cli.py - --input-format jsonl --format zh
+    python tent_cli.py orders.csv --rules core --format jsonl
+    python tent_cli.py orders.csv --rules core --format parquet -o results.parquet
+
+输入字段: length, width (必填), side_height, unit_length (可选，使用计算器默认值)。
+--rules core 时计算主体结构 (tent_core.TentCalculator)，另可指定 gable_unit_length、
+holes_per_base、roof_pitch_factor；标准目录尺寸直接查预计算表 (tent_catalog.py)。
+整个流程是分块的生成器管道，内存占用与输入行数无关；
+坏行只记录到 stderr 并计数，不会中断处理。
+"""
+import argparse
+import csv
+import io
+import itertools
+import json
+import sys
+import time
+
+import tent_export
+from tent_catalog import calculate as catalog_calculate, default_catalog
+from tent_core import INPUT_DEFAULTS
+from tent_templates import CORE_REPORT_ROWS, core_report_template
+from 篷房配件计算系统 import TentCalculator
+
+# 输入规格字段: (字段名, 是否必填)
+SPEC_FIELDS = (
+    ('length', True),
+    ('width', True),
+    ('side_height', False),
+    ('unit_length', False),
+)
+RESULT_FIELDS = ('roof_canvas', 'roof_liner', 'side_canvas', 'side_liner',
+                 'lighting', 'anchoring', 'flooring', 'glass_wall')
+# 配件结果的列类型与单位 (列式输出格式用)
+RESULT_COLUMNS = {
+    'roof_canvas': ('float', 'm²'), 'roof_liner': ('float', 'm²'),
+    'side_canvas': ('float', 'm²'), 'side_liner': ('float', 'm²'),
+    'lighting': ('int', 'pcs'), 'anchoring': ('int', 'pcs'),
+    'flooring': ('float', 'm²'), 'glass_wall': ('float', 'm²'),
+}
+# 主体结构 (--rules core) 的输入字段 (可选参数的默认值见 tent_core.INPUT_DEFAULTS)
+CORE_SPEC_FIELDS = (
+    ('length', True),
+    ('width', True),
+    ('side_height', False),
+    ('unit_length', False),
+    ('gable_unit_length', False),
+    ('holes_per_base', False),
+    ('roof_pitch_factor', False),
+)
+CORE_RESULT_FIELDS = tuple(key for key, _ in CORE_REPORT_ROWS)
+# 以米为单位的输入字段
+METRE_FIELDS = ('length', 'width', 'side_height', 'unit_length', 'gable_unit_length')
+RULES = ('accessory', 'core')
+OUTPUT_FORMATS = ('csv', 'jsonl', 'zh', 'en', 'parquet', 'arrow', 'xlsx')
+# 带类型的列式格式 (见 tent_export.py)，按块写出
+COLUMNAR_FORMATS = ('parquet', 'arrow', 'xlsx')
+INPUT_FORMATS = ('csv', 'jsonl')
+
+
+def parse_spec(record, fields=SPEC_FIELDS):
+    """
+    校验并转换一条输入记录
+    :param record: 原始字段字典 (CSV 中为字符串)
+    :param fields: 输入字段定义，默认为配件计算的 SPEC_FIELDS
+    :return: 可直接传给 TentCalculator 的关键字参数
+    :raises ValueError: 缺少必填字段或数值非法
+    """
+    spec = {}
+    for name, required in fields:
+        raw = record.get(name)
+        if raw is None or (isinstance(raw, str) and not raw.strip()):
+            if required:
+                raise ValueError(f"missing '{name}'")
+            continue
+        try:
+            value = float(raw)
+        except (TypeError, ValueError):
+            raise ValueError(f"invalid {name}={raw!r}") from None
+        if not value > 0 or value == float('inf'):
+            raise ValueError(f"{name} must be a positive number, got {raw!r}")
+        # 整数值按整数传入 (CSV 中的 "20" 与 JSONL 中的 20.0 都得到 20)，报告中与直接调用一样显示 20m
+        spec[name] = int(value) if value.is_integer() else value
+    return spec
+
+
+def read_records(stream, input_format):
+    """逐行读取输入，产出 (行号, 记录字典)；无法解析的行产出 (行号, 异常)"""
+    if input_format == 'csv':
+        reader = csv.DictReader(stream)
+        line_no = 1  # 表头
+        while True:
+            try:
+                record = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                # 格式错误的行 (如字段超长) 与其他坏行一样按行报告，读取器从下一行继续；
+                # 出错时 line_num 可能还停在上一条记录，行号取上一条记录之后的一行
+                line_no = max(reader.line_num, line_no + 1)
+                yield line_no, ValueError(f"bad CSV: {e}")
+                continue
+            line_no = reader.line_num
+            yield line_no, record
+    else:
+        for line_no, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("expected a JSON object")
+            except ValueError as e:
+                yield line_no, ValueError(f"bad JSON: {e}")
+                continue
+            yield line_no, record
+
+
+def chunked(iterable, size):
+    """把迭代器切成长度不超过 size 的列表块"""
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class CoreSpec:
+    """主体结构计算的一行规格 (与配件计算器一样提供属性与 _format_results，供输出复用)"""
+
+    def __init__(self, spec):
+        params = dict(INPUT_DEFAULTS)
+        params.update(spec)
+        # 与项目清单一样拒绝非整数的孔数，不悄悄截断 (parse_spec 已把整数值转成 int)
+        if not isinstance(params['holes_per_base'], int):
+            raise ValueError(f"holes_per_base must be an integer, got {params['holes_per_base']!r}")
+        for name, _ in CORE_SPEC_FIELDS:
+            setattr(self, name, params[name])
+
+    def params(self):
+        return tuple(getattr(self, name) for name, _ in CORE_SPEC_FIELDS)
+
+    def _format_results(self, results, lang='zh'):
+        # 按语言预编译的报告模板 (见 tent_templates.py)
+        return core_report_template(lang).format(self.width, self.length, results)
+
+
+def compute_chunk(chunk, rules='accessory'):
+    """计算一个块，产出 (行号, 规格, 结果) 或 (行号, None, 异常)"""
+    catalog = default_catalog() if rules == 'core' else None
+    for line_no, record in chunk:
+        if isinstance(record, Exception):
+            yield line_no, None, record
+            continue
+        try:
+            if rules == 'core':
+                calc = CoreSpec(parse_spec(record, CORE_SPEC_FIELDS))
+                yield line_no, calc, catalog_calculate(*calc.params(), catalog=catalog)
+            else:
+                calc = TentCalculator(**parse_spec(record))
+                yield line_no, calc, calc.calculate_values()
+        except (ValueError, ArithmeticError) as e:
+            yield line_no, None, e
+
+
+class _Writer:
+    """按输出格式把结果写入流"""
+
+    def __init__(self, stream, output_format, rules='accessory'):
+        self.stream = stream
+        self.output_format = output_format
+        self.spec_fields = tuple(n for n, _ in (CORE_SPEC_FIELDS if rules == 'core' else SPEC_FIELDS))
+        self.result_fields = CORE_RESULT_FIELDS if rules == 'core' else RESULT_FIELDS
+        self._csv = None
+        self._columns = None
+        if output_format == 'csv':
+            self._csv = csv.writer(stream, lineterminator='\n')
+            self._csv.writerow(('row',) + self.spec_fields + self.result_fields)
+        elif output_format in COLUMNAR_FORMATS:
+            fields = [('row', 'int', '')]
+            fields += [(n, 'int' if n == 'holes_per_base' else 'float', 'm' if n in METRE_FIELDS else '')
+                       for n in self.spec_fields]
+            if rules == 'core':
+                fields += tent_export.core_fields(self.result_fields)
+            else:
+                fields += [(n,) + RESULT_COLUMNS[n] for n in self.result_fields]
+            self._export = tent_export.open_writer(output_format, stream, fields)
+            self._names = [name for name, _, _ in fields]
+            self._columns = {name: [] for name in self._names}
+
+    def write(self, line_no, calc, results):
+        if self._columns is not None:
+            columns = self._columns
+            columns['row'].append(line_no)
+            for n in self.spec_fields:
+                columns[n].append(getattr(calc, n))
+            for k in self.result_fields:
+                columns[k].append(results[k])
+        elif self.output_format == 'csv':
+            self._csv.writerow((line_no,) + tuple(getattr(calc, n) for n in self.spec_fields)
+                               + tuple(results[k] for k in self.result_fields))
+        elif self.output_format == 'jsonl':
+            row = {'row': line_no}
+            row.update((n, getattr(calc, n)) for n in self.spec_fields)
+            row.update((k, results[k]) for k in self.result_fields)
+            self.stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+        else:
+            self.stream.write(calc._format_results(results, self.output_format))
+
+    def flush(self):
+        """列式格式: 把缓冲的一块写成一个行组 / 记录批"""
+        if self._columns is not None and self._columns['row']:
+            self._export.write(self._columns)
+            self._columns = {name: [] for name in self._names}
+
+    def close(self):
+        if self._columns is not None:
+            self.flush()
+            self._export.close()
+
+
+def run(in_stream, out_stream, input_format='csv', output_format='csv', chunk_size=1000,
+        err_stream=None, progress_every=0, rules='accessory'):
+    """
+    执行流式批处理
+    :param rules: 'accessory' 配件计算 / 'core' 主体结构计算
+    :return: (成功行数, 错误行数)
+    """
+    err_stream = err_stream if err_stream is not None else sys.stderr
+    writer = _Writer(out_stream, output_format, rules)
+    ok = errors = 0
+    started = time.perf_counter()
+    next_report = progress_every
+
+    for chunk in chunked(read_records(in_stream, input_format), chunk_size):
+        for line_no, calc, results in compute_chunk(chunk, rules):
+            if calc is None:
+                errors += 1
+                print(f"row {line_no}: {results}", file=err_stream)
+            else:
+                ok += 1
+                writer.write(line_no, calc, results)
+        writer.flush()
+        out_stream.flush()
+        if progress_every and ok + errors >= next_report:
+            _report(err_stream, ok, errors, started, final=False)
+            next_report += progress_every
+
+    writer.close()
+    _report(err_stream, ok, errors, started, final=True)
+    return ok, errors
+
+
+def _report(err_stream, ok, errors, started, final):
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    total = ok + errors
+    prefix = "done" if final else "progress"
+    print(f"{prefix}: {total} rows ({errors} errors) in {elapsed:.2f}s, "
+          f"{total / elapsed:,.0f} rows/s", file=err_stream)
+
+
+def _open_input(path):
+    if path == '-':
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+    return open(path, encoding='utf-8-sig', newline='')
+
+
+def _open_output(path, output_format='csv'):
+    if output_format in COLUMNAR_FORMATS:
+        return sys.stdout.buffer if path == '-' else open(path, 'wb')
+    if path == '-':
+        return io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline='', write_through=False)
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="篷房配件批量计算 / Tent accessories batch calculator")
+    parser.add_argument('input', nargs='?', default='-', help="输入文件 (CSV/JSONL)，'-' 表示标准输入")
+    parser.add_argument('-o', '--output', default='-', help="输出文件，默认标准输出")
+    parser.add_argument('--input-format', choices=INPUT_FORMATS,
+                        help="输入格式，默认按扩展名判断 (标准输入默认 csv)")
+    parser.add_argument('-f', '--format', dest='output_format', choices=OUTPUT_FORMATS, default='csv',
+                        help="输出格式: csv / jsonl / zh / en (文本报告) / parquet / arrow / xlsx (带类型，按块写出)")
+    parser.add_argument('--rules', choices=RULES, default='accessory',
+                        help="accessory: 配件计算 (默认) / core: 主体结构计算 (标准目录尺寸查预计算表)")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="每块处理的行数")
+    parser.add_argument('--progress-every', type=int, default=0, metavar='N',
+                        help="每处理 N 行在 stderr 报告一次速度 (0 = 仅在结束时报告)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.chunk_size < 1:
+        print("--chunk-size must be >= 1", file=sys.stderr)
+        return 2
+    input_format = args.input_format
+    if input_format is None:
+        input_format = 'jsonl' if args.input.endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+    # 先检查可选依赖，缺少时不留下空的输出文件
+    if args.output_format in COLUMNAR_FORMATS:
+        try:
+            tent_export.require(args.output_format)
+        except ImportError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 2
+
+    in_stream = _open_input(args.input)
+    out_stream = _open_output(args.output, args.output_format)
+    try:
+        _, errors = run(in_stream, out_stream, input_format, args.output_format,
+                        args.chunk_size, progress_every=args.progress_every, rules=args.rules)
+    except ImportError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    finally:
+        out_stream.flush()
+        if args.input != '-':
+            in_stream.close()
+        if args.output != '-':
+            out_stream.close()
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
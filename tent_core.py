@@ -0,0 +1,520 @@
+"""
+篷房核心计算模块 (无第三方依赖)
+包含翻译字典与全部计算公式，可在批处理、测试或服务端直接导入，
+无需 Streamlit / pandas / altair；批量计算时才按需加载 NumPy。
+"""
+import sys
+from operator import itemgetter
+
+from tent_formulas import ACCESSORY_RULES, CORE_RULES, SCALAR_OPS, get_ops, vector_ops
+from tent_results import record_type
+
+# --- 翻译字典 / Translation Dictionary ---
+TRANSLATIONS = {
+    '中文': {
+        'page_title': "篷房核心计算系统",
+        'main_title': "⛺ 篷房核心计算系统",
+        'settings': "基础参数",
+        'adv_settings': "高级参数",
+        'lang_select': "语言选择 / Language",
+        'length': "篷房长度 (米)",
+        'width': "篷房宽度/跨度 (米)",
+        'side_height': "边高 (米)",
+        'unit_length': "单元长度 (米)",
+        'gable_unit_length': "山墙单元/间隔 (米)",
+        'holes_per_base': "基座孔位数量 (个)",
+        'roof_pitch_factor': "三角形角度系数",
+        
+        'calc_note': "依据“篷房核心计算公式”标准进行计算。",
+        'overview': "📊 核心指标概览",
+        'details': "📝 详细组件清单",
+        'visualization': "📈 数据可视化",
+        'export': "💾 导出数据",
+        'download_btn': "下载计算结果",
+        'export_format': "导出格式",
+        'area_tab': "面积与覆盖",
+        'count_tab': "结构组件数量",
+        'col_item': "组件名称",
+        'col_value': "数值",
+        'col_desc': "计算规则/说明",
+        'unit_area': "㎡",
+        'unit_pcs': "件",
+        'unit_sets': "组",
+        'unit_tents': "顶",
+        'unit_m': "米",
+        'unit_kmh': "km/h",
+        'unit_kn': "kN/㎡",
+        
+        # Sections
+        'sec_basic': "1. 基础参数关系",
+        'sec_struct': "2. 结构性组件关系",
+        'sec_conn': "3. 连接件与辅助组件",
+        'sec_cover': "4. 覆盖物与装饰组件",
+        'sec_specs': "技术规格",
+        'sec_quote': "5. 报价",
+        'col_unit_price': "单价",
+        'col_amount': "金额",
+        'quote_total': "报价合计",
+
+        # Items
+        'num_units': "单元数量",
+        'tent_area': "篷房面积",
+        'perimeter': "周长",
+        
+        'gable_post': "山墙侧柱",
+        'gable_mid_post': "山墙中柱 (说明)",
+        'bom_mid_post_tents': "带山墙中柱的篷房",
+        'upright_support': "边墙承重柱",
+        
+        'roof_beam': "斜梁",
+        'ridge_conn': "屋脊连接角",
+        'eave_conn': "屋檐连接角",
+        'expansion_screw': "膨胀螺丝",
+        'drilling_steel': "钢钎",
+        'bearing_count': "承重数量",
+        'main_comp_total': "主要构件总数",
+        
+        'roof_canvas': "顶棚面积",
+        'roof_liner': "顶幔面积",
+        'roof_cover': "总覆盖面积",
+        'glass_wall_m': "玻璃墙 (米)",
+        'glass_wall_sqm': "玻璃墙 (平方)",
+        'basic_lighting': "基础照明",
+        'roof_stretcher': "顶棚紧固器",
+
+        # Descriptions (Formulas)
+        'desc_num_units': "长度 / 单元长度",
+        'desc_area': "长度 × 宽度",
+        'desc_perimeter': "(长度 + 宽度) × 2",
+        
+        'desc_gable_post': "(宽度 / 山墙间隔 - 1) × 2",
+        'desc_gable_mid': "奇数间隔无中柱，偶数有中柱",
+        'desc_upright': "(单元数量 + 1) × 2",
+        
+        'desc_roof_beam': "单元数量 + 1 (组/对)",
+        'desc_ridge_conn': "单元数量 + 1",
+        'desc_eave_conn': "(单元数量 + 1) × 2",
+        'desc_bearing': "(边墙单元数+1)×2 + 山墙柱数",
+        'desc_expansion_screw': "(边墙柱数 + 山墙侧柱数) × 基座孔数",
+        'desc_drilling_steel': "(边墙柱数 + 山墙侧柱数) × 基座孔数",
+        
+        'desc_roof_canvas': "篷房面积 × 角度系数",
+        'desc_roof_liner': "同顶棚面积",
+        'desc_roof_cover': "顶棚面积 + 顶幔面积 + 玻璃墙面积",
+        'desc_glass_m': "周长",
+        'desc_glass_sqm': "周长 × 边高",
+        'desc_basic_lighting': "(单元数量 - 1) × 2",
+        'desc_roof_stretcher': "单元数量 × 2",
+
+        # 主体结构文本报告 (tent_cli.py --rules core --format zh)
+        'core_title': "主体结构计算结果 ({width}m×{length}m)",
+
+        # 配件计算报告 (篷房配件计算系统.py)
+        'acc_title': "篷房配件计算结果 (尺寸: {width}m×{length}m)",
+        'acc_roof_canvas': "顶篷面积",
+        'acc_roof_liner': "顶幔面积",
+        'acc_side_canvas': "四周篷布",
+        'acc_side_liner': "四周边幔",
+        'acc_lighting': "基础照明",
+        'acc_anchoring': "锚固系统",
+        'acc_flooring': "承重地板",
+        'acc_glass_wall': "玻璃墙",
+        'acc_unit_area': "㎡",
+        'acc_unit_sets': "组",
+        'acc_unit_pcs': "件",
+        'acc_desc_roof_canvas': "(篷房面积×角度系数)",
+        'acc_desc_roof_liner': "(同顶篷计算)",
+        'acc_desc_side_canvas': "(周长×边高)",
+        'acc_desc_side_liner': "(同四周篷布)",
+        'acc_desc_lighting': "(单元数-1)×2",
+        'acc_desc_anchoring': "(公式计算)",
+        'acc_desc_flooring': "(等于篷房面积)",
+        'acc_desc_glass_wall': "(长度×边高)",
+
+        # Optimize mode
+        'mode_select': "模式",
+        'mode_calc': "计算",
+        'mode_optimize': "优化",
+        'mode_project': "项目",
+        'opt_title': "🔍 尺寸优化",
+        'opt_note': "在场地范围内枚举长度、宽度与单元组合，保留面积与构件数量之间的最优解 (Pareto 前沿)。",
+        'opt_site_length': "场地最大长度 (米)",
+        'opt_site_width': "场地最大宽度 (米)",
+        'opt_min_length': "最小长度 (米)",
+        'opt_min_width': "最小宽度 (米)",
+        'opt_step': "尺寸步长 (米)",
+        'opt_unit_choices': "候选单元长度 (米)",
+        'opt_gable_choices': "候选山墙间隔 (米)",
+        'opt_objectives': "优化目标 (面积越大越好，其余越少越好)",
+        'opt_top_k': "只显示前 N 名 (0 = 全部最优解)",
+        'opt_run': "开始优化",
+        'opt_progress': "已计算 {done:,} / {total:,} 种组合",
+        'opt_result': "最优方案",
+        'opt_empty': "没有满足条件的方案。",
+        'opt_charts': "全部方案分布",
+        'opt_charts_note': "共 {rows:,} 种组合，图表只包含服务端聚合后的数据。",
+        # 多方案图表
+        'chart_heatmap': "{label} (长 × 宽)",
+        'chart_fasteners': "紧固件数量分布",
+        'chart_count': "方案数",
+        'chart_stat': "热力图统计量",
+        'chart_min': "最小值",
+        'chart_mean': "平均值",
+        'chart_max': "最大值",
+        # Project mode
+        'proj_title': "📦 多篷房项目汇总",
+        'proj_note': "每行一顶 (或一组相同的) 篷房，可直接编辑或上传 CSV；相同规格只计算一次，修改一行只重算该行。",
+        'proj_upload': "上传篷房清单 (CSV)",
+        'proj_tents': "篷房清单",
+        'proj_bom': "汇总物料清单",
+        'proj_per_tent': "逐顶明细 (单顶数量)",
+        'proj_stats': "共 {tents} 顶，{unique} 种规格，本次计算 {computed} 种",
+        'proj_download': "下载物料清单",
+        'proj_download_detail': "下载逐顶明细",
+        'col_name': "名称",
+        'col_quantity': "数量",
+        'col_unit': "单位",
+        # Cutting list
+        'cut_download': "下载裁剪清单 (CSV)",
+        'cut_material': "材料",
+        'cut_stock': "原材料规格",
+        'cut_pattern': "裁剪方案 (段数 × 段长 米)",
+        'cut_count': "卷/根数",
+        'cut_offcut': "每卷/根余料 (米)",
+        'cut_total': "合计: 净用量 {net} {unit}，余料 {waste} {unit} ({pct}%)",
+        # Reverse solver
+        'solve_title': "🧮 按库存反求最大篷房",
+        'solve_note': "填写现有构件库存 (0 = 不限)，按当前单元长度与山墙间隔求可搭建的最大尺寸。",
+        'solve_best': "最大可搭建: {length} × {width} 米 ({area} ㎡)",
+        'solve_none': "现有库存连一个单元也搭不起来。",
+        'solve_front': "可选尺寸 (长 × 宽，均不可再加大)",
+        'solve_apply': "使用该尺寸",
+        'solve_capped': "已达到搜索上限 ({units} 个单元 × {bays} 个间隔)，库存可能还能搭建更大的篷房；可填写更多构件的库存。",
+        # Debug panel
+        'debug_title': "🛠 性能调试",
+        'debug_stages': "各阶段耗时 (毫秒，最近 1024 次)",
+        'debug_caches': "缓存命中",
+        'debug_reset': "清空统计",
+    },
+    'English': {
+        'page_title': "Tent Core Calculator",
+        'main_title': "⛺ Tent Core Calculator",
+        'settings': "Basic Parameters",
+        'adv_settings': "Advanced Parameters",
+        'lang_select': "Language",
+        'length': "Length (m)",
+        'width': "Width / Span (m)",
+        'side_height': "Side Height (m)",
+        'unit_length': "Unit Length (m)",
+        'gable_unit_length': "Gable Unit/Bay (m)",
+        'holes_per_base': "Holes per Base Plate",
+        'roof_pitch_factor': "Angle ratio of triangle",
+        
+        'calc_note': "Calculated based on Core Tent Formulas.",
+        'overview': "📊 Key Metrics",
+        'details': "📝 Detailed List",
+        'visualization': "📈 Visualization",
+        'export': "💾 Export Data",
+        'download_btn': "Download Results",
+        'export_format': "Export format",
+        'area_tab': "Area & Cover",
+        'count_tab': "Structural Count",
+        'col_item': "Component",
+        'col_value': "Value",
+        'col_desc': "Formula / Rule",
+        'unit_area': "㎡",
+        'unit_pcs': "pcs",
+        'unit_sets': "sets",
+        'unit_tents': "tents",
+        'unit_m': "m",
+        'unit_kmh': "km/h",
+        'unit_kn': "kN/㎡",
+
+        # Sections
+        'sec_basic': "1. Basic Parameters",
+        'sec_struct': "2. Structural Components",
+        'sec_conn': "3. Connections & Aux",
+        'sec_cover': "4. Cover & Decoration",
+        'sec_specs': "Tech Specs",
+        'sec_quote': "5. Quote",
+        'col_unit_price': "Unit price",
+        'col_amount': "Amount",
+        'quote_total': "Quote total",
+
+        # Items
+        'num_units': "Quantities of tent units",
+        'tent_area': "Tent Area",
+        'perimeter': "Perimeter",
+        
+        'gable_post': "Gable support side",
+        'gable_mid_post': "Middle gable support (Note)",
+        'bom_mid_post_tents': "Tents with middle gable post",
+        'upright_support': "Side pillars",
+        
+        'roof_beam': "Main frame / Beam",
+        'ridge_conn': "Ridge connector",
+        'eave_conn': "Eave connector",
+        'expansion_screw': "Expansion screw",
+        'drilling_steel': "Drilling steel",
+        'bearing_count': "Bearing Count",
+        'main_comp_total': "Total main components",
+        
+        'roof_canvas': "Roof canvas area",
+        'roof_liner': "Roof liner area",
+        'roof_cover': "Total cover area",
+        'glass_wall_m': "Glass wall (Length)",
+        'glass_wall_sqm': "Glass wall (Area)",
+        'basic_lighting': "Basic lighting",
+        'roof_stretcher': "Roof stretching spare parts",
+
+        # Descriptions
+        'desc_num_units': "Length / Unit Length",
+        'desc_area': "Length × Width",
+        'desc_perimeter': "(Length + Width) × 2",
+        
+        'desc_gable_post': "(Width / Gable Bay - 1) × 2",
+        'desc_gable_mid': "No mid post for odd bays",
+        'desc_upright': "(Units + 1) × 2",
+        
+        'desc_roof_beam': "Units + 1 (Sets/Pairs)",
+        'desc_ridge_conn': "Units + 1",
+        'desc_eave_conn': "(Units + 1) × 2",
+        'desc_bearing': "(Side Units + 1)×2 + Gable Cols",
+        'desc_expansion_screw': "(Side pillars + Gable support side) × Holes",
+        'desc_drilling_steel': "(Side pillars + Gable support side) × Holes",
+        
+        'desc_roof_canvas': "Area × Angle ratio of triangle",
+        'desc_roof_liner': "Same as roof canvas",
+        'desc_roof_cover': "Roof canvas + roof liner + glass wall area",
+        'desc_glass_m': "Perimeter",
+        'desc_glass_sqm': "Perimeter × Height",
+        'desc_basic_lighting': "(Units - 1) × 2",
+        'desc_roof_stretcher': "Units × 2",
+
+        # Structure text report (tent_cli.py --rules core --format en)
+        'core_title': "Tent Structure Calculation ({width}m×{length}m)",
+
+        # Accessory report (篷房配件计算系统.py)
+        'acc_title': "Tent Accessories Calculation (Size: {width}m×{length}m)",
+        'acc_roof_canvas': "Roof Canvas",
+        'acc_roof_liner': "Roof Liner",
+        'acc_side_canvas': "Side Canvas",
+        'acc_side_liner': "Side Liner",
+        'acc_lighting': "Basic Lighting",
+        'acc_anchoring': "Anchoring System",
+        'acc_flooring': "Flooring Area",
+        'acc_glass_wall': "Glass Wall",
+        'acc_unit_area': "㎡",
+        'acc_unit_sets': " sets",
+        'acc_unit_pcs': " pcs",
+        'acc_desc_roof_canvas': "(Area×Angle Ratio)",
+        'acc_desc_roof_liner': "(Same as Roof)",
+        'acc_desc_side_canvas': "(Perimeter×Height)",
+        'acc_desc_side_liner': "(Same as Side Canvas)",
+        'acc_desc_lighting': "(Units-1)×2",
+        'acc_desc_anchoring': "(Formula)",
+        'acc_desc_flooring': "(Equal to Tent Area)",
+        'acc_desc_glass_wall': "(Length×Height)",
+
+        # Optimize mode
+        'mode_select': "Mode",
+        'mode_calc': "Calculate",
+        'mode_optimize': "Optimize",
+        'mode_project': "Project",
+        'opt_title': "🔍 Dimension Optimizer",
+        'opt_note': "Enumerates length, width and unit combinations within the site and keeps the best trade-offs between area and component counts (Pareto front).",
+        'opt_site_length': "Max site length (m)",
+        'opt_site_width': "Max site width (m)",
+        'opt_min_length': "Min length (m)",
+        'opt_min_width': "Min width (m)",
+        'opt_step': "Dimension step (m)",
+        'opt_unit_choices': "Unit length options (m)",
+        'opt_gable_choices': "Gable bay options (m)",
+        'opt_objectives': "Objectives (maximize area, minimize the rest)",
+        'opt_top_k': "Show top N only (0 = full front)",
+        'opt_run': "Run optimizer",
+        'opt_progress': "Evaluated {done:,} / {total:,} combinations",
+        'opt_result': "Best options",
+        'opt_empty': "No option satisfies the constraints.",
+        'opt_charts': "All evaluated options",
+        'opt_charts_note': "{rows:,} combinations; charts carry only server-side aggregates.",
+        # Multi-configuration charts
+        'chart_heatmap': "{label} (length × width)",
+        'chart_fasteners': "Fastener count distribution",
+        'chart_count': "Options",
+        'chart_stat': "Heatmap statistic",
+        'chart_min': "Min",
+        'chart_mean': "Mean",
+        'chart_max': "Max",
+        # Project mode
+        'proj_title': "📦 Multi-tent Project",
+        'proj_note': "One row per tent (or group of identical tents). Edit in place or upload a CSV; identical specs are computed once and editing a row recomputes only that row.",
+        'proj_upload': "Upload tent list (CSV)",
+        'proj_tents': "Tent list",
+        'proj_bom': "Bill of Materials",
+        'proj_per_tent': "Per-tent details (single tent)",
+        'proj_stats': "{tents} tents, {unique} unique specs, {computed} computed this run",
+        'proj_download': "Download BOM",
+        'proj_download_detail': "Download per-tent details",
+        'col_name': "Name",
+        'col_quantity': "Quantity",
+        'col_unit': "Unit",
+        # Cutting list
+        'cut_download': "Download Cutting List (CSV)",
+        'cut_material': "Material",
+        'cut_stock': "Stock size",
+        'cut_pattern': "Pattern (pieces × length m)",
+        'cut_count': "Rolls/bars",
+        'cut_offcut': "Offcut per roll/bar (m)",
+        'cut_total': "Total: net {net} {unit}, waste {waste} {unit} ({pct}%)",
+        # Reverse solver
+        'solve_title': "🧮 Largest Tent from Stock",
+        'solve_note': "Enter the components on hand (0 = unlimited) to find the largest tent buildable with the current unit lengths.",
+        'solve_best': "Largest buildable: {length} × {width} m ({area} m²)",
+        'solve_none': "The stock cannot build even a single unit.",
+        'solve_front': "Options (length × width, none can grow further)",
+        'solve_apply': "Use this size",
+        'solve_capped': "Search limit reached ({units} units × {bays} bays); the stock may build a larger tent. Enter more components to narrow it down.",
+        # Debug panel
+        'debug_title': "🛠 Performance Debug",
+        'debug_stages': "Stage timings (ms, last 1024 runs)",
+        'debug_caches': "Cache hits",
+        'debug_reset': "Reset metrics",
+    }
+}
+
+# --- 计算器 / Calculators ---
+# 公式本身登记在 tent_formulas 中；这里的计算器只是规则集的标量/批量入口
+
+# calculate_batch 接受的输入列 (与 TentCalculator 构造参数同序)
+BATCH_INPUTS = tuple(CORE_RULES.inputs)
+# 构造参数的默认值 (界面初始值)；命令行、项目清单与排期中长度、宽度必填，其余参数缺省时取这里的值
+INPUT_DEFAULTS = {'length': 25.0, 'width': 20.0, 'side_height': 3.0, 'unit_length': 5.0, 'gable_unit_length': 5.0,
+                  'holes_per_base': 4, 'roof_pitch_factor': 1.15}
+REQUIRED_INPUTS = ('length', 'width')
+# 以属性形式公开的输入参数与基础参数 (单元数量/面积/周长)
+_ATTRIBUTES = BATCH_INPUTS + ('num_units', 'area', 'perimeter')
+_attribute_values = itemgetter(*_ATTRIBUTES)
+
+
+def spec_key(length, width, side_height, unit_length, gable_unit_length, holes_per_base, roof_pitch_factor):
+    """规范化参数元组 (与 TentCalculator 的类型转换一致)，用作去重与缓存键"""
+    return (float(length), float(width), float(side_height), float(unit_length),
+            float(gable_unit_length), int(holes_per_base), float(roof_pitch_factor))
+
+
+class TentCalculator:
+    rules = CORE_RULES
+
+    def __init__(self, length, width, side_height, unit_length, gable_unit_length, holes_per_base, roof_pitch_factor,
+                 arithmetic='float'):
+        """
+        :param arithmetic: 'float' 与原公式逐位一致的浮点运算；
+                           'exact' 尺寸按整数毫米、系数按 1/10000 定点运算，单元数量由整数整除得到，
+                           面积只在最后舍入一次 (3.3 米 / 1.1 米 得到 3 个单元，而不是浮点误差下的 2 个)
+        """
+        self.arithmetic = arithmetic
+        self._ops = get_ops(arithmetic)
+        self._env = self.rules.compile().evaluate({
+            'length': length,
+            'width': width,
+            'side_height': side_height,
+            'unit_length': unit_length,
+            'gable_unit_length': gable_unit_length,
+            'holes_per_base': holes_per_base,
+            'roof_pitch_factor': roof_pitch_factor,
+        }, self._ops)
+        self._sync()
+
+    def _sync(self):
+        # 输入参数与基础参数 (单元数量/面积/周长) 以属性形式公开；浮点运算的结果无需转换
+        values = _attribute_values(self._env)
+        if self._ops is not SCALAR_OPS:
+            values = map(self._ops.finish, values)
+        self.__dict__.update(zip(_ATTRIBUTES, values))
+
+    def calculate_all(self):
+        """
+        全部输出，返回定长的 __slots__ 记录 (见 tent_results.py)：
+        字段顺序同规则输出，res['roof_canvas'] 与 res.roof_canvas 等价，可当只读字典使用
+        """
+        plan = self.rules.compile()
+        values = plan.output_values(self._env)
+        if self._ops is not SCALAR_OPS:
+            values = map(self._ops.finish, values)
+        return record_type(plan.outputs)(*values)
+
+    def update(self, **changes):
+        """
+        修改部分参数并增量重算，只重新计算受影响的规则
+        :return: 实际重算的规则名列表
+        """
+        self._env, recomputed = self.rules.compile().update(self._env, changes, self._ops)
+        self._sync()
+        return recomputed
+
+    @classmethod
+    def calculate_batch(cls, data, arithmetic='float'):
+        """
+        批量计算: 对列式输入做向量化运算，结果与逐个调用 calculate_all 完全一致。
+        :param data: pandas DataFrame 或 {列名: 数组/标量} 字典，列名见 BATCH_INPUTS；
+                     标量会广播到所有行
+        :param arithmetic: 'float' 或 'exact' (int64 定点运算，见 __init__)
+        :return: 输入为 DataFrame 时返回同索引的 DataFrame，否则返回 {列名: ndarray}。
+                 除 calculate_all 的全部输出外，还包含 num_units / area / perimeter
+        """
+        plan = cls.rules.compile()
+        missing = [k for k in BATCH_INPUTS if k not in data]
+        if missing:
+            raise KeyError(f"calculate_batch missing columns: {', '.join(missing)}")
+
+        ops = get_ops(arithmetic, vector=True)
+        env = plan.evaluate({k: data[k] for k in BATCH_INPUTS}, ops)
+        results = {k: ops.finish(env[k]) for k in ('num_units', 'area', 'perimeter') + plan.outputs}
+
+        # 输入是 DataFrame 时 pandas 必然已被导入，这里不主动加载
+        pd = sys.modules.get('pandas')
+        if pd is not None and isinstance(data, pd.DataFrame):
+            return pd.DataFrame(results, index=data.index)
+        return results
+
+
+class AccessoryCalculator:
+    """篷房配件计算 4.0 版公式 (顶篷/四周篷布/锚固/地板等)，格式化输出见 篷房配件计算系统.py"""
+
+    rules = ACCESSORY_RULES
+
+    def __init__(self, length=25, width=20, side_height=3, unit_length=5):
+        """
+        初始化篷房参数
+        :param length: 篷房长度 (米)
+        :param width: 篷房宽度/跨度 (米)
+        :param side_height: 边高 (米)
+        :param unit_length: 标准单元长度 (默认5米)
+        """
+        self.length = length
+        self.width = width
+        self.side_height = side_height
+        self.unit_length = unit_length
+        self.triangle_angle_ratio = 1.05  # 三角形角度系数
+
+    def calculate_values(self):
+        """计算所有配件数量，返回未格式化的 {配件: 数值} 字典"""
+        plan = self.rules.compile()
+        env = plan.evaluate({k: getattr(self, k) for k in plan.inputs})
+        return plan.output_dict(env)
+
+    @classmethod
+    def calculate_batch(cls, data, triangle_angle_ratio=1.05):
+        """
+        批量计算 4.0 版配件公式
+        :param data: {列名: 数组/标量} 或 DataFrame，需包含 length / width / side_height / unit_length
+        :return: {配件: ndarray}
+        """
+        plan = cls.rules.compile()
+        values = {k: data[k] for k in ('length', 'width', 'side_height', 'unit_length')}
+        values['triangle_angle_ratio'] = data['triangle_angle_ratio'] if 'triangle_angle_ratio' in data \
+            else triangle_angle_ratio
+        env = plan.evaluate(values, vector_ops())
+        return {k: env[k] for k in plan.outputs}
+
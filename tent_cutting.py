@@ -0,0 +1,339 @@
+"""
+下料优化: 篷布卷材与铝型材的采购数量与余料
+calculate_all 只给出毛面积 (roof_canvas, roof_liner, glass_wall_sqm) 与长度 (glass_wall_m)。
+这里把它们按开间拆成单片:
+    顶棚/内衬  每个开间 (unit_length) 两片坡面，长 = 宽度 / 2 × 屋面系数
+    墙面       边墙每开间 (unit_length)、山墙每间隔 (gable_unit_length) 一片，高 = side_height
+    墙面型材   与墙面分段相同
+卷材按幅宽把单片裁成若干条，再把条/型材段装到定长的卷材或型材上 (一维下料)。
+默认用最佳适应递减 (排序后二分查找剩余长度最合适的一根，O(n log n))；
+件数不多时可选精确模式 (分支定界求最少根数)。
+尺寸内部统一换算为整数毫米，避免浮点误差。
+
+用法:
+    python tent_cutting.py tents.csv -o cutting.csv          # 篷房清单同 tent_project.py
+    python tent_cutting.py tents.csv --exact --bar-length 6.5
+"""
+import argparse
+import bisect
+import csv
+import sys
+from collections import Counter
+
+from tent_core import TRANSLATIONS
+
+
+class Stock:
+    """一种原材料规格: 卷材 (幅宽 × 卷长) 或型材 (定尺长度，width 为 None)，单位米"""
+
+    __slots__ = ('width', 'length')
+
+    def __init__(self, width, length):
+        self.width = width
+        self.length = length
+
+    def __repr__(self):
+        return f"Stock(width={self.width!r}, length={self.length!r})"
+
+
+# 默认原材料规格 (可按供应商调整)
+DEFAULT_STOCK = {
+    'roof_canvas': Stock(3.0, 50.0),
+    'roof_liner': Stock(3.0, 50.0),
+    'glass_wall_sqm': Stock(2.5, 50.0),
+    'glass_wall_m': Stock(None, 6.0),
+}
+# 精确模式的件数上限；分支定界最多搜索的节点数，超过后返回已找到的最好方案
+EXACT_MAX_PIECES = 40
+EXACT_NODE_LIMIT = 200000
+
+
+def _mm(metres):
+    return int(round(metres * 1000))
+
+
+def _segments(total, bay):
+    """把 total 毫米按 bay 分段: 整开间若干段 + 不足一个开间的余段"""
+    n = total // bay if bay > 0 else 0
+    rest = total - n * bay
+    return [(bay, n)] + ([(rest, 1)] if rest > 0 else [])
+
+
+def panels(length, width, side_height, unit_length, gable_unit_length, roof_pitch_factor):
+    """
+    把一顶篷房的面积/长度拆成单片
+    :return: {材料: [(片宽 mm, 片长 mm, 片数)]}；型材的片宽为 None
+    """
+    length, width, side_height = _mm(length), _mm(width), _mm(side_height)
+    sides = _segments(length, _mm(unit_length))
+    gables = _segments(width, _mm(gable_unit_length))
+    slope = int(round(width / 2 * roof_pitch_factor))
+    roof = [(w, slope, n * 2) for w, n in sides if n]
+    walls = [(w, side_height, n * 2) for w, n in sides + gables if n]
+    return {
+        'roof_canvas': roof,
+        'roof_liner': list(roof),
+        'glass_wall_sqm': walls,
+        'glass_wall_m': [(None, w, n) for w, _, n in walls],
+    }
+
+
+class MaterialPlan:
+    """一种材料的下料结果"""
+
+    def __init__(self, material, stock, bins, net, optimal=None):
+        self.material = material
+        self.stock = stock
+        self.bins = bins                # 每根/卷上裁出的段长 (mm)，按降序
+        self.net = net                  # 单片净用量: 卷材为平方米，型材为米
+        self.optimal = optimal          # 精确模式是否证明最优；启发式为 None
+
+    @property
+    def stock_count(self):
+        return len(self.bins)
+
+    @property
+    def purchased(self):
+        """采购总量: 卷材为平方米，型材为米"""
+        size = self.stock.length * (self.stock.width or 1)
+        return round(self.stock_count * size, 2)
+
+    @property
+    def waste(self):
+        return round(self.purchased - self.net, 2)
+
+    @property
+    def waste_pct(self):
+        return round(100 * self.waste / self.purchased, 1) if self.purchased else 0.0
+
+    def patterns(self):
+        """裁剪方案 [(段长元组 mm, 根数, 该根余料 mm)]，按根数降序"""
+        stock = _mm(self.stock.length)
+        counts = Counter(tuple(b) for b in self.bins)
+        return [(p, n, stock - sum(p)) for p, n in counts.most_common()]
+
+
+def _split(pieces, stock):
+    """超过原材料长度的段拆成整根 + 余段 (现场拼接)"""
+    out = []
+    for piece in pieces:
+        while piece > stock:
+            out.append(stock)
+            piece -= stock
+        out.append(piece)
+    return out
+
+
+def best_fit_decreasing(pieces, stock):
+    """
+    一维下料启发式: 段长降序，每段放进剩余长度最小且放得下的一根，放不下则新开一根
+    :param pieces: 段长列表 (mm)，均不超过 stock
+    :return: [[段长, ...], ...]
+    """
+    bins = []
+    free = []   # (剩余长度, 编号) 升序
+    for piece in sorted(pieces, reverse=True):
+        i = bisect.bisect_left(free, (piece, -1))
+        if i < len(free):
+            remaining, k = free.pop(i)
+        else:
+            remaining, k = stock, len(bins)
+            bins.append([])
+        bins[k].append(piece)
+        bisect.insort(free, (remaining - piece, k))
+    return bins
+
+
+def exact(pieces, stock):
+    """
+    分支定界求最少根数 (件数不超过 EXACT_MAX_PIECES)
+    :return: (bins, 是否已证明最优)；节点数超过 EXACT_NODE_LIMIT 时返回当前最好方案
+    """
+    if len(pieces) > EXACT_MAX_PIECES:
+        raise ValueError(f"exact mode supports at most {EXACT_MAX_PIECES} pieces per material, got {len(pieces)}")
+    pieces = sorted(pieces, reverse=True)
+    best = best_fit_decreasing(pieces, stock)
+    lower = -(-sum(pieces) // stock)
+    if len(best) <= lower:
+        return best, True
+
+    suffix = [0] * (len(pieces) + 1)
+    for i in range(len(pieces) - 1, -1, -1):
+        suffix[i] = suffix[i + 1] + pieces[i]
+    bins, free = [], []
+    state = {'best': best, 'nodes': 0}
+
+    def search(i):
+        state['nodes'] += 1
+        if state['nodes'] > EXACT_NODE_LIMIT:
+            return
+        if i == len(pieces):
+            state['best'] = [list(b) for b in bins]
+            return
+        # 下界: 剩余段在已开的根中放不下的部分至少还要多开几根
+        overflow = suffix[i] - sum(free)
+        if len(bins) + max(0, -(-overflow // stock)) >= len(state['best']):
+            return
+        piece = pieces[i]
+        tried = set()
+        for k in range(len(bins)):
+            if free[k] >= piece and free[k] not in tried:
+                tried.add(free[k])
+                bins[k].append(piece)
+                free[k] -= piece
+                search(i + 1)
+                free[k] += piece
+                bins[k].pop()
+                if len(state['best']) <= lower:
+                    return
+        if len(bins) + 1 < len(state['best']):
+            bins.append([piece])
+            free.append(stock - piece)
+            search(i + 1)
+            bins.pop()
+            free.pop()
+
+    search(0)
+    optimal = state['nodes'] <= EXACT_NODE_LIMIT or len(state['best']) <= lower
+    return state['best'], optimal
+
+
+def plan_material(material, items, stock, exact_mode=False):
+    """
+    一种材料的下料
+    :param items: [(片宽 mm, 片长 mm, 片数)]，型材片宽为 None
+    :param stock: Stock
+    :param exact_mode: True 时使用分支定界 (件数较少时)
+    """
+    length = _mm(stock.length)
+    pieces = []
+    net = 0
+    for w, l, n in items:
+        if w is None:
+            strips = 1
+            net += l * n / 1000
+        else:
+            # 每片按幅宽裁成若干条，每条长度都是片长
+            strips = -(-w // _mm(stock.width))
+            net += w * l * n / 1e6
+        pieces.extend([l] * (strips * n))
+    pieces = _split(pieces, length)
+    if exact_mode:
+        bins, optimal = exact(pieces, length)
+    else:
+        bins, optimal = best_fit_decreasing(pieces, length), None
+    for b in bins:
+        b.sort(reverse=True)
+    return MaterialPlan(material, stock, bins, round(net, 2), optimal)
+
+
+class CuttingPlan:
+    """一顶或一批篷房的下料结果 {材料: MaterialPlan}"""
+
+    def __init__(self, materials):
+        self.materials = materials
+
+    def rows(self, t):
+        """裁剪清单 (表头 + 行)，供 CSV 导出与界面表格使用"""
+        header = [t['cut_material'], t['cut_stock'], t['cut_pattern'], t['cut_count'], t['cut_offcut']]
+        rows = []
+        for name, plan in self.materials.items():
+            stock = plan.stock
+            label = f"{stock.width} × {stock.length} m" if stock.width else f"{stock.length} m"
+            for pattern, count, rest in plan.patterns():
+                pieces = Counter(pattern)
+                text = ' + '.join(f"{n} × {p / 1000:g}" for p, n in sorted(pieces.items(), reverse=True))
+                rows.append([t[name], label, text, count, rest / 1000])
+            unit = t['unit_area'] if stock.width else t['unit_m']
+            rows.append([t[name], label, t['cut_total'].format(net=plan.net, waste=plan.waste, unit=unit,
+                                                               pct=plan.waste_pct), plan.stock_count, ''])
+        return header, rows
+
+    def to_csv(self, t):
+        import io
+
+        header, rows = self.rows(t)
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator='\n')
+        writer.writerow(header)
+        writer.writerows(rows)
+        return out.getvalue().encode('utf-8-sig')
+
+
+def plan_tents(tents, stock=None, exact_mode=False):
+    """
+    多顶篷房合并下料 (余料可以跨篷房复用)
+    :param tents: [(构造参数元组, 数量)]，参数顺序同 BATCH_INPUTS；也接受 tent_project.Tent
+    :param stock: {材料: Stock}，缺省用 DEFAULT_STOCK
+    :return: CuttingPlan
+    """
+    stock = dict(DEFAULT_STOCK, **(stock or {}))
+    items = {name: Counter() for name in stock}
+    cache = {}
+    for tent in tents:
+        params, quantity = (tent.params, tent.quantity) if hasattr(tent, 'params') else tent
+        split = cache.get(params)
+        if split is None:
+            length, width, side_height, unit_length, gable_unit_length, _, roof_pitch_factor = params
+            split = cache[params] = panels(length, width, side_height, unit_length, gable_unit_length,
+                                           roof_pitch_factor)
+        for name, parts in split.items():
+            for w, l, n in parts:
+                items[name][w, l] += n * quantity
+    return CuttingPlan({
+        name: plan_material(name, [(w, l, n) for (w, l), n in items[name].items()], stock[name], exact_mode)
+        for name in stock
+    })
+
+
+def plan(length, width, side_height, unit_length, gable_unit_length, holes_per_base, roof_pitch_factor,
+         stock=None, exact_mode=False):
+    """单顶篷房的下料，参数同 TentCalculator"""
+    params = (length, width, side_height, unit_length, gable_unit_length, holes_per_base, roof_pitch_factor)
+    return plan_tents([(params, 1)], stock, exact_mode)
+
+
+# --- 命令行 / Command line ---
+
+def main(argv=None):
+    import tent_project
+
+    parser = argparse.ArgumentParser(description="篷布卷材与铝型材下料 / Cutting list for canvas rolls and profiles")
+    parser.add_argument('input', help="篷房清单 CSV (格式同 tent_project.py)，'-' 表示标准输入")
+    parser.add_argument('-o', '--output', help="输出 CSV 文件 (默认打印到标准输出)")
+    parser.add_argument('--lang', choices=('zh', 'en'), default='zh')
+    parser.add_argument('--exact', action='store_true', help="精确模式 (每种材料最多 %d 段)" % EXACT_MAX_PIECES)
+    parser.add_argument('--roll-width', type=float, default=DEFAULT_STOCK['roof_canvas'].width, help="顶棚/内衬卷材幅宽 (米)")
+    parser.add_argument('--roll-length', type=float, default=DEFAULT_STOCK['roof_canvas'].length, help="卷长 (米)")
+    parser.add_argument('--wall-roll-width', type=float, default=DEFAULT_STOCK['glass_wall_sqm'].width, help="墙面卷材幅宽 (米)")
+    parser.add_argument('--bar-length', type=float, default=DEFAULT_STOCK['glass_wall_m'].length, help="型材定尺长度 (米)")
+    args = parser.parse_args(argv)
+
+    stock = {
+        'roof_canvas': Stock(args.roll_width, args.roll_length),
+        'roof_liner': Stock(args.roll_width, args.roll_length),
+        'glass_wall_sqm': Stock(args.wall_roll_width, args.roll_length),
+        'glass_wall_m': Stock(None, args.bar_length),
+    }
+    stream = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8-sig', newline='')
+    try:
+        result = plan_tents(tent_project.parse_tents(csv.DictReader(stream)), stock, args.exact)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    t = TRANSLATIONS['中文' if args.lang == 'zh' else 'English']
+    data = result.to_csv(t)
+    if args.output:
+        with open(args.output, 'wb') as f:
+            f.write(data)
+    else:
+        sys.stdout.write(data.decode('utf-8-sig'))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
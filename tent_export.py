@@ -0,0 +1,225 @@
+"""
+带类型的导出: CSV / Parquet / Arrow IPC / XLSX
+数值保持为数值，单位单独成列 (单顶明细) 或写在列元数据中 (批量宽表)，下游工具不必再解析 "575.0 ㎡"。
+所有格式都是分块流式写入: 每块写成一个 Parquet 行组 / Arrow 记录批 / 若干工作表行，
+百万行级的批量或项目结果不需要先拼成一个大 DataFrame 或字符串。
+
+    fields = [('row', 'int', ''), ('roof_canvas', 'float', 'm²'), ...]
+    with open_writer('parquet', 'out.parquet', fields) as writer:
+        for columns in chunks:              # {字段: 列表或数组}
+            writer.write(columns)
+
+Parquet 与 Arrow 需要 pyarrow，XLSX 需要 openpyxl (均为可选依赖，用到时才导入)。
+"""
+import csv
+import io
+
+FORMATS = ('csv', 'parquet', 'arrow', 'xlsx')
+EXTENSIONS = {'csv': 'csv', 'parquet': 'parquet', 'arrow': 'arrow', 'xlsx': 'xlsx'}
+MIME_TYPES = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.file',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+KINDS = ('int', 'float', 'bool', 'str')
+# 各格式需要的可选依赖
+REQUIRES = {'parquet': 'pyarrow', 'arrow': 'pyarrow', 'xlsx': 'openpyxl'}
+# 计量单位 (与语言无关，写入列元数据)；键为 TRANSLATIONS 中的单位键
+UNITS = {'unit_sets': 'set', 'unit_pcs': 'pcs', 'unit_tents': 'tents', 'unit_area': 'm²', 'unit_m': 'm'}
+# Excel 单个工作表的行数上限 (含表头)，超过后续写到新工作表
+XLSX_MAX_ROWS = 1048576
+
+
+def available_formats():
+    """当前环境可用的导出格式 (缺少可选依赖的格式不列出)"""
+    import importlib.util
+
+    return tuple(f for f in FORMATS if f not in REQUIRES or importlib.util.find_spec(REQUIRES[f]) is not None)
+
+
+def _require(module, fmt):
+    import importlib
+
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise ImportError(f"{fmt} export needs {module}: pip install {module}") from None
+
+
+def require(fmt):
+    """检查导出格式的可选依赖，缺少时抛出 ImportError (调用方可在打开输出文件之前检查)"""
+    if fmt in REQUIRES:
+        _require(REQUIRES[fmt], fmt)
+
+
+class _CsvWriter:
+    def __init__(self, sink, fields):
+        self._text = io.TextIOWrapper(sink, encoding='utf-8-sig', newline='', write_through=True)
+        self._csv = csv.writer(self._text, lineterminator='\n')
+        self._names = [name for name, _, _ in fields]
+        self._csv.writerow(self._names)
+
+    def write(self, columns):
+        self._csv.writerows(zip(*(_as_list(columns[n]) for n in self._names)))
+
+    def close(self):
+        self._text.flush()
+        self._text.detach()
+
+
+class _ArrowWriter:
+    """Arrow IPC 文件 (fmt='arrow') 或 Parquet (fmt='parquet')，每块一个记录批 / 行组"""
+
+    def __init__(self, sink, fields, fmt):
+        pa = self._pa = _require('pyarrow', fmt)
+        types = {'int': pa.int64(), 'float': pa.float64(), 'bool': pa.bool_(), 'str': pa.string()}
+        self._schema = pa.schema([
+            pa.field(name, types[kind], metadata={'unit': unit} if unit else None) for name, kind, unit in fields
+        ])
+        if fmt == 'parquet':
+            pq = _require('pyarrow.parquet', fmt)
+            self._writer = pq.ParquetWriter(sink, self._schema)
+        else:
+            self._writer = pa.ipc.new_file(sink, self._schema)
+
+    def write(self, columns):
+        pa = self._pa
+        arrays = [pa.array(columns[f.name], type=f.type) for f in self._schema]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+class _XlsxWriter:
+    """openpyxl 只写模式: 行直接流式写入临时文件，第二行为单位"""
+
+    def __init__(self, sink, fields):
+        openpyxl = _require('openpyxl', 'xlsx')
+        self._sink = sink
+        self._book = openpyxl.Workbook(write_only=True)
+        self._names = [name for name, _, _ in fields]
+        self._header = (self._names, [unit for _, _, unit in fields])
+        self._sheet = None
+        self._rows = 0
+
+    def _new_sheet(self):
+        self._sheet = self._book.create_sheet()
+        for row in self._header:
+            self._sheet.append(row)
+        self._rows = len(self._header)
+
+    def write(self, columns):
+        for row in zip(*(_as_list(columns[n]) for n in self._names)):
+            if self._sheet is None or self._rows >= XLSX_MAX_ROWS:
+                self._new_sheet()
+            self._sheet.append(row)
+            self._rows += 1
+
+    def close(self):
+        if self._sheet is None:
+            self._new_sheet()
+        self._book.save(self._sink)
+
+
+def _as_list(values):
+    # NumPy 数组转为 Python 标量，CSV/Excel 中不会出现 np.float64(...) 之类的表示
+    return values.tolist() if hasattr(values, 'tolist') else values
+
+
+class Writer:
+    """流式写入器: write(columns) 追加一块，close() 完成文件 (也可用 with)"""
+
+    def __init__(self, fmt, sink, fields):
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown export format {fmt!r}, expected one of {', '.join(FORMATS)}")
+        bad = [name for name, kind, _ in fields if kind not in KINDS]
+        if bad:
+            raise ValueError(f"unknown column kinds for: {', '.join(bad)}")
+        # 先检查可选依赖，缺少时不留下空文件
+        require(fmt)
+        self._close_sink = isinstance(sink, str)
+        self._sink = open(sink, 'wb') if self._close_sink else sink
+        try:
+            if fmt == 'csv':
+                self._impl = _CsvWriter(self._sink, fields)
+            elif fmt == 'xlsx':
+                self._impl = _XlsxWriter(self._sink, fields)
+            else:
+                self._impl = _ArrowWriter(self._sink, fields, fmt)
+        except BaseException:
+            if self._close_sink:
+                self._sink.close()
+            raise
+        self.rows = 0
+
+    def write(self, columns):
+        """追加一块 {字段: 列表或数组}，各列等长"""
+        self._impl.write(columns)
+        first = next(iter(columns.values()), ())
+        self.rows += len(first)
+
+    def close(self):
+        try:
+            self._impl.close()
+        finally:
+            if self._close_sink:
+                self._sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_writer(fmt, sink, fields):
+    """
+    打开流式写入器
+    :param fmt: FORMATS 之一
+    :param sink: 文件路径或可写的二进制流
+    :param fields: [(列名, 类型 int/float/bool/str, 单位)]
+    """
+    return Writer(fmt, sink, fields)
+
+
+def to_bytes(fmt, fields, chunks):
+    """把若干块写成一个内存中的文件 (界面下载用)"""
+    buffer = io.BytesIO()
+    with open_writer(fmt, buffer, fields) as writer:
+        for columns in chunks:
+            writer.write(columns)
+    return buffer.getvalue()
+
+
+# --- 篷房结果的列定义 / Tent result columns ---
+
+def core_fields(names=None):
+    """
+    主体结构结果 (calculate_batch 的输出) 的列定义: 计数为 int、面积与长度为 float、has_mid_post 为 bool
+    :param names: 列名顺序，默认同 tent_project.BOM_FIELDS
+    """
+    from tent_project import BOM_FIELDS
+
+    units = dict(BOM_FIELDS)
+    fields = []
+    for name in names or units:
+        unit = units[name]
+        if name == 'has_mid_post':
+            fields.append((name, 'bool', ''))
+        else:
+            fields.append((name, 'float' if unit in ('unit_area', 'unit_m') else 'int', UNITS[unit]))
+    return fields
+
+
+# 单顶明细 (长表) 的列: 数值与单位分开
+DETAIL_FIELDS = [
+    ('section', 'str', ''),
+    ('item', 'str', ''),
+    ('label', 'str', ''),
+    ('value', 'float', ''),
+    ('unit', 'str', ''),
+    ('description', 'str', ''),
+]
+PRICE_FIELDS = [('unit_price', 'float', ''), ('amount', 'float', '')]
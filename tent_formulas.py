@@ -0,0 +1,642 @@
+"""
+篷房公式引擎 (无第三方依赖)
+每个输出以规则形式登记，并声明它依赖的输入；规则集编译一次，得到按拓扑顺序排列的执行计划。
+同一个计划既可逐个计算 (标量运算)，也可对整列数据批量计算 (NumPy 运算)，
+并支持增量重算: 只修改边高时，只会重新计算 glass_wall_sqm 与 roof_cover。
+
+两套现有计算器都是这里的规则集:
+    CORE_RULES       web 版核心公式 (tent_core.TentCalculator)
+    ACCESSORY_RULES  4.0 版配件公式 (tent_core.AccessoryCalculator)
+"""
+import graphlib
+from operator import itemgetter
+
+
+class Formula:
+    """一条规则: 名称、依赖的输入名称与计算函数 func(ops, *inputs)"""
+
+    __slots__ = ('name', 'inputs', 'func', 'output')
+
+    def __init__(self, name, inputs, func, output=True):
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.func = func
+        self.output = output
+
+    def __repr__(self):
+        return f"Formula({self.name!r}, inputs={self.inputs!r})"
+
+
+class FormulaSet:
+    """
+    规则登记表。
+    :param name: 规则集名称
+    :param inputs: {输入名: 类型}，类型为 'length' (米) / 'factor' (系数) / 'int' /
+                   None (不做转换，保持调用方传入的值)
+    """
+
+    def __init__(self, name, inputs):
+        self.name = name
+        self.inputs = dict(inputs)
+        self.formulas = {}
+        self._plan = None
+
+    def add(self, name, inputs, func, output=True):
+        """
+        登记一条规则
+        :param inputs: 依赖的输入/规则名称元组，按顺序传给 func(ops, *values)
+        :param output: False 表示中间量，不出现在结果中
+        """
+        if name in self.formulas or name in self.inputs:
+            raise ValueError(f"{self.name}: duplicate rule '{name}'")
+        self.formulas[name] = Formula(name, inputs, func, output)
+        self._plan = None
+
+    def compile(self):
+        """编译为执行计划 (结果会被缓存，规则变化后自动失效)"""
+        if self._plan is None:
+            self._plan = Plan(self)
+        return self._plan
+
+    def fingerprint(self):
+        """
+        规则集指纹: 覆盖输入类型、每条规则的名称/依赖/源码以及浮点运算实现。
+        预计算表 (tent_catalog.py) 用它识别公式改动后过期的数据。
+        """
+        import hashlib
+        import inspect
+
+        def source(obj):
+            try:
+                return inspect.getsource(obj).strip()
+            except (OSError, TypeError):
+                return obj.__code__.co_code.hex()
+
+        h = hashlib.sha256()
+        h.update(repr((self.name, sorted(self.inputs.items(), key=lambda kv: kv[0]))).encode())
+        for f in self.formulas.values():
+            h.update(repr((f.name, f.inputs, f.output, source(f.func))).encode())
+        for backend in (ScalarOps, VectorOps):
+            h.update(source(backend).encode())
+        return h.hexdigest()[:16]
+
+
+class Plan:
+    """按拓扑顺序排列的执行计划"""
+
+    def __init__(self, formula_set):
+        self.name = formula_set.name
+        self.inputs = formula_set.inputs
+        self.formulas = formula_set.formulas
+
+        graph = {}
+        for f in self.formulas.values():
+            for dep in f.inputs:
+                if dep not in self.formulas and dep not in self.inputs:
+                    raise ValueError(f"{self.name}: rule '{f.name}' depends on unknown '{dep}'")
+            graph[f.name] = set(f.inputs)
+        try:
+            order = tuple(graphlib.TopologicalSorter(graph).static_order())
+        except graphlib.CycleError as e:
+            raise ValueError(f"{self.name}: circular rule dependency {e.args[1]}") from None
+        self.order = tuple(n for n in order if n in self.formulas)
+        # 输出按登记顺序排列，与原 calculate_all 的字典顺序一致
+        self.outputs = tuple(n for n, f in self.formulas.items() if f.output)
+
+        self.dependents = {n: [] for n in list(self.inputs) + list(self.formulas)}
+        for f in self.formulas.values():
+            for dep in f.inputs:
+                self.dependents[dep].append(f.name)
+        self._position = {n: i for i, n in enumerate(self.order)}
+        # 按拓扑顺序逐条执行的步骤，取依赖值的 itemgetter 编译时建好，计算时不再逐条查表、拼参数列表
+        self._steps = tuple(_step(self.formulas[n]) for n in self.order)
+        self._converters = tuple((name, self._CONVERTERS[kind]) for name, kind in self.inputs.items())
+        self._output_values = _getter(self.outputs)
+        # 增量重算: {变化的输入集合: 需要检查的步骤}
+        self._update_steps = {}
+
+    # 输入类型 -> 运算实现中的转换方法
+    _CONVERTERS = {'length': 'to_length', 'factor': 'to_factor', 'int': 'to_int', None: 'to_value'}
+
+    def coerce(self, values, ops):
+        """按输入类型转换输入值，缺少输入时报错"""
+        missing = [k for k in self.inputs if k not in values]
+        if missing:
+            raise KeyError(f"{self.name}: missing inputs: {', '.join(missing)}")
+        return ops.align({name: getattr(ops, method)(values[name]) for name, method in self._converters})
+
+    def _convert(self, name, value, ops):
+        return getattr(ops, self._CONVERTERS[self.inputs[name]])(value)
+
+    def evaluate(self, values, ops=None):
+        """
+        完整计算
+        :param values: {输入名: 值}
+        :param ops: 运算实现，默认 SCALAR_OPS；批量计算传入 vector_ops()
+        :return: 包含全部输入与中间量、输出的字典
+        """
+        ops = ops or SCALAR_OPS
+        env = self.coerce(values, ops)
+        for name, func, get, many, _ in self._steps:
+            env[name] = func(ops, *get(env)) if many else func(ops, get(env))
+        return env
+
+    def output_values(self, env):
+        """env 中按 outputs 顺序排列的输出值元组"""
+        return self._output_values(env)
+
+    def output_dict(self, env):
+        """env 中的输出 {输出名: 值}，按 outputs 顺序"""
+        return dict(zip(self.outputs, self._output_values(env)))
+
+    def affected(self, changed):
+        """修改 changed 中的输入后可能需要重算的规则 (按执行顺序)"""
+        seen = set()
+        stack = list(changed)
+        while stack:
+            for dep in self.dependents[stack.pop()]:
+                if dep not in seen:
+                    seen.add(dep)
+                    stack.append(dep)
+        return sorted(seen, key=self._position.__getitem__)
+
+    def update(self, env, changes, ops=None):
+        """
+        增量重算: 只重新计算受 changes 影响的规则；某条规则结果未变时不再向下游传播。
+        :param env: 上一次 evaluate/update 的结果 (不会被修改)
+        :param changes: {输入名: 新值}
+        :return: (新结果字典, 实际重算的规则名列表)
+        """
+        ops = ops or SCALAR_OPS
+        unknown = [k for k in changes if k not in self.inputs]
+        if unknown:
+            raise KeyError(f"{self.name}: unknown inputs: {', '.join(unknown)}")
+        new_env = dict(env)
+        for name, value in changes.items():
+            new_env[name] = self._convert(name, value, ops)
+        new_env.update(ops.align({k: new_env[k] for k in self.inputs}))
+        dirty = {k for k in changes if not ops.unchanged(env[k], new_env[k])}
+        if not dirty:
+            return new_env, []
+        key = frozenset(dirty)
+        steps = self._update_steps.get(key)
+        if steps is None:
+            steps = self._update_steps[key] = tuple(self._steps[self._position[n]] for n in self.affected(key))
+        recomputed = []
+        for name, func, get, many, inputs in steps:
+            if dirty.isdisjoint(inputs):
+                continue
+            value = func(ops, *get(new_env)) if many else func(ops, get(new_env))
+            recomputed.append(name)
+            if not ops.unchanged(new_env[name], value):
+                dirty.add(name)
+            new_env[name] = value
+        return new_env, recomputed
+
+
+def _getter(names):
+    """env -> 按 names 顺序的值元组 (itemgetter 在只有一个名称时不返回元组，这里统一)"""
+    if len(names) == 1:
+        name, = names
+        return lambda env: (env[name],)
+    return itemgetter(*names) if names else lambda env: ()
+
+
+def _step(f):
+    """一条规则的执行步骤: (名称, 函数, 取依赖值, 是否展开为多个参数, 依赖名称)"""
+    if len(f.inputs) == 1:
+        return f.name, f.func, itemgetter(f.inputs[0]), False, f.inputs
+    return f.name, f.func, _getter(f.inputs), True, f.inputs
+
+
+# --- 运算实现 / Operation backends ---
+
+class ScalarOps:
+    """逐个计算: 与原计算器的 Python 内置运算完全一致"""
+
+    @staticmethod
+    def to_length(x):
+        return float(x)
+
+    to_factor = to_length
+
+    @staticmethod
+    def to_int(x):
+        return int(x)
+
+    @staticmethod
+    def to_value(x):
+        return x
+
+    @staticmethod
+    def align(values):
+        return values
+
+    @staticmethod
+    def trunc(x):
+        return int(x)
+
+    @staticmethod
+    def trunc_div(a, b):
+        """int(a / b)，除数 <= 0 时为 0"""
+        return int(a / b) if b > 0 else 0
+
+    @staticmethod
+    def maximum(a, b):
+        return max(a, b)
+
+    @staticmethod
+    def round2(x):
+        return round(x, 2)
+
+    @staticmethod
+    def unchanged(old, new):
+        return type(old) is type(new) and old == new
+
+    @staticmethod
+    def finish(x):
+        return x
+
+
+SCALAR_OPS = ScalarOps()
+
+
+def _two_product(np, a, b):
+    """Dekker 精确乘法: 返回 (p, e) 使 a*b == p + e 精确成立"""
+    split = 134217729.0  # 2**27 + 1
+    p = a * b
+    ca = split * a
+    a_hi = ca - (ca - a)
+    a_lo = a - a_hi
+    cb = split * b
+    b_hi = cb - (cb - b)
+    b_lo = b - b_hi
+    e = ((a_hi * b_hi - p) + a_hi * b_lo + a_lo * b_hi) + a_lo * b_lo
+    return p, e
+
+
+class VectorOps:
+    """整列计算: NumPy 数组运算，结果与 ScalarOps 逐元素一致"""
+
+    def __init__(self):
+        import numpy as np
+        self.np = np
+
+    def to_length(self, x):
+        return self.np.asarray(x, dtype=self.np.float64)
+
+    to_factor = to_length
+
+    def to_int(self, x):
+        return self.np.trunc(self.np.asarray(x, dtype=self.np.float64)).astype(self.np.int64)
+
+    def to_value(self, x):
+        return self.np.asarray(x, dtype=self.np.float64)
+
+    def align(self, values):
+        """把全部输入广播成同一形状，标量输入会扩展到所有行"""
+        names = list(values)
+        arrays = self.np.broadcast_arrays(*[values[n] for n in names])
+        return dict(zip(names, arrays))
+
+    def trunc(self, x):
+        return self.np.trunc(x).astype(self.np.int64)
+
+    def trunc_div(self, a, b):
+        np = self.np
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(b > 0, np.trunc(a / b), 0).astype(np.int64)
+
+    def maximum(self, a, b):
+        return self.np.maximum(a, b)
+
+    def round2(self, x):
+        """
+        向量化的 round(x, 2)，与 Python 内置 round 逐位一致。
+        np.round 先乘 100 再取整，乘法误差会把 2.675 这类值舍入错方向；
+        这里用精确乘积的误差项判断真实的小数部分，平局时取偶数。
+        """
+        np = self.np
+        y, err = _two_product(np, x, np.float64(100.0))
+        floor_y = np.floor(y)
+        frac = y - floor_y
+        above = (frac > 0.5) | ((frac == 0.5) & (err > 0))
+        tie = (frac == 0.5) & (err == 0)
+        scaled = floor_y + above + (tie & (np.fmod(floor_y, 2) != 0))
+        # 与 Python 相同: 超出 double 整数精度的数值原样返回
+        with np.errstate(invalid='ignore'):
+            return np.where(np.abs(y) < 2.0 ** 52, scaled / 100.0, x)
+
+    def unchanged(self, old, new):
+        return False
+
+    def finish(self, x):
+        return x
+
+
+# --- 定点运算 / Exact fixed-point arithmetic ---
+# 尺寸以整数毫米、系数以 1/10000 为单位表示；单元数量由整数整除得到，
+# 面积只在最后按四舍六入五成双舍入到 0.01 一次。3.3 / 1.1 (浮点结果为 2.9999999999999996) 这类浮点误差不会再丢单元。
+LENGTH_SCALE = 3  # 米 -> 毫米
+FACTOR_SCALE = 4  # 系数精度 0.0001
+
+
+class Fixed:
+    """定点数: 整数 value 表示 value / 10**scale；value 可以是 Python int 或 int64 数组"""
+
+    __slots__ = ('value', 'scale')
+
+    def __init__(self, value, scale):
+        self.value = value
+        self.scale = scale
+
+    def rescale(self, scale):
+        if scale < self.scale:
+            raise ValueError("Fixed.rescale cannot drop digits; use ops.round2")
+        return self.value * 10 ** (scale - self.scale)
+
+    @staticmethod
+    def _align(a, b):
+        if not isinstance(b, Fixed):
+            b = Fixed(b, 0)
+        scale = max(a.scale, b.scale)
+        return a.rescale(scale), b.rescale(scale), scale
+
+    def __add__(self, other):
+        a, b, scale = Fixed._align(self, other)
+        return Fixed(a + b, scale)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        a, b, scale = Fixed._align(self, other)
+        return Fixed(a - b, scale)
+
+    def __mul__(self, other):
+        if isinstance(other, Fixed):
+            return Fixed(self.value * other.value, self.scale + other.scale)
+        return Fixed(self.value * other, self.scale)
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        if not isinstance(other, Fixed):
+            return NotImplemented
+        a, b, _ = Fixed._align(self, other)
+        return a == b
+
+    __hash__ = None
+
+    def __float__(self):
+        return self.value / 10 ** self.scale
+
+    def __repr__(self):
+        return f"Fixed({self.value!r}, {self.scale})"
+
+
+class ExactOps:
+    """逐个计算的定点实现 (Python 整数，任意精度)"""
+
+    @staticmethod
+    def _parse(x, scale):
+        # 字符串按十进制精确解析；浮点数取最接近的整数刻度 (0.3 -> 300 毫米)
+        if isinstance(x, str):
+            from decimal import Decimal
+            return int((Decimal(x.strip()) * 10 ** scale).to_integral_value())
+        return int(round(x * 10 ** scale))
+
+    def to_length(self, x):
+        return Fixed(self._parse(x, LENGTH_SCALE), LENGTH_SCALE)
+
+    def to_factor(self, x):
+        return Fixed(self._parse(x, FACTOR_SCALE), FACTOR_SCALE)
+
+    @staticmethod
+    def to_int(x):
+        return int(x)
+
+    @staticmethod
+    def to_value(x):
+        return x
+
+    @staticmethod
+    def align(values):
+        return values
+
+    @staticmethod
+    def trunc(x):
+        if isinstance(x, Fixed):
+            d = 10 ** x.scale
+            return x.value // d if x.value >= 0 else -(-x.value // d)
+        return int(x)
+
+    @staticmethod
+    def trunc_div(a, b):
+        """a / b 向零截断，除数 <= 0 时为 0 (精确整数除法)"""
+        a, b, _ = Fixed._align(a, b)
+        if b <= 0:
+            return 0
+        return a // b if a >= 0 else -(-a // b)
+
+    @staticmethod
+    def maximum(a, b):
+        return max(a, b)
+
+    @staticmethod
+    def round2(x):
+        """舍入到 0.01 (四舍六入五成双)"""
+        if x.scale <= 2:
+            return Fixed(x.rescale(2), 2)
+        d = 10 ** (x.scale - 2)
+        q, r = divmod(x.value, d)
+        if r * 2 > d or (r * 2 == d and q % 2):
+            q += 1
+        return Fixed(q, 2)
+
+    @staticmethod
+    def unchanged(old, new):
+        return type(old) is type(new) and old == new
+
+    @staticmethod
+    def finish(x):
+        """输出转换: 定点数转为 float (整数刻度除以 10**scale，只舍入一次)"""
+        return float(x) if isinstance(x, Fixed) else x
+
+
+EXACT_OPS = ExactOps()
+
+
+class ExactVectorOps(ExactOps):
+    """整列计算的定点实现 (int64 数组)"""
+
+    def __init__(self):
+        import numpy as np
+        self.np = np
+
+    def _parse(self, x, scale):
+        np = self.np
+        arr = np.asarray(x)
+        if arr.dtype.kind in 'iu':
+            return arr.astype(np.int64) * 10 ** scale
+        if arr.dtype.kind in 'OUS':
+            return np.array([ExactOps._parse(str(v), scale) for v in arr.ravel()],
+                            dtype=np.int64).reshape(arr.shape)
+        return np.rint(arr.astype(np.float64) * 10 ** scale).astype(np.int64)
+
+    def to_int(self, x):
+        return self.np.trunc(self.np.asarray(x, dtype=self.np.float64)).astype(self.np.int64)
+
+    def to_value(self, x):
+        return self.np.asarray(x)
+
+    def align(self, values):
+        # 定点数的整数数组与普通数组一起广播到同一形状
+        np = self.np
+        names = list(values)
+        raw = [values[n].value if isinstance(values[n], Fixed) else values[n] for n in names]
+        arrays = np.broadcast_arrays(*raw)
+        return {n: Fixed(a, values[n].scale) if isinstance(values[n], Fixed) else a
+                for n, a in zip(names, arrays)}
+
+    def trunc(self, x):
+        np = self.np
+        if isinstance(x, Fixed):
+            d = 10 ** x.scale
+            return np.where(x.value >= 0, x.value // d, -(-x.value // d))
+        return np.trunc(x).astype(np.int64)
+
+    def trunc_div(self, a, b):
+        np = self.np
+        a, b, _ = Fixed._align(a, b)
+        safe = np.where(b > 0, b, 1)
+        q = np.where(a >= 0, a // safe, -(-a // safe))
+        return np.where(b > 0, q, 0).astype(np.int64)
+
+    def maximum(self, a, b):
+        return self.np.maximum(a, b)
+
+    def round2(self, x):
+        np = self.np
+        if x.scale <= 2:
+            return Fixed(x.rescale(2), 2)
+        d = 10 ** (x.scale - 2)
+        q, r = np.divmod(x.value, d)
+        up = (r * 2 > d) | ((r * 2 == d) & (q % 2 == 1))
+        return Fixed(q + up, 2)
+
+    def unchanged(self, old, new):
+        return False
+
+    def finish(self, x):
+        if isinstance(x, Fixed):
+            return x.value / 10 ** x.scale
+        return x
+
+
+_ops_cache = {}
+
+
+def get_ops(arithmetic='float', vector=False):
+    """
+    取运算实现
+    :param arithmetic: 'float' (与原计算器一致的浮点运算) 或 'exact' (整数毫米定点运算)
+    :param vector: True 表示批量 (NumPy) 实现，首次调用时才导入 NumPy
+    """
+    if arithmetic not in ('float', 'exact'):
+        raise ValueError(f"unknown arithmetic mode: {arithmetic!r}")
+    if not vector:
+        return SCALAR_OPS if arithmetic == 'float' else EXACT_OPS
+    ops = _ops_cache.get(arithmetic)
+    if ops is None:
+        ops = _ops_cache[arithmetic] = VectorOps() if arithmetic == 'float' else ExactVectorOps()
+    return ops
+
+
+def vector_ops():
+    """NumPy 浮点运算实现 (首次调用时才导入 NumPy)"""
+    return get_ops('float', vector=True)
+
+
+# --- 核心公式 / Core formulas (web_app) ---
+CORE_RULES = FormulaSet('core', {
+    'length': 'length',
+    'width': 'length',
+    'side_height': 'length',
+    'unit_length': 'length',
+    'gable_unit_length': 'length',
+    'holes_per_base': 'int',
+    'roof_pitch_factor': 'factor',
+})
+_core = CORE_RULES.add
+
+# 1. Basic Parameters
+_core('num_units', ('length', 'unit_length'), lambda o, l, u: o.trunc_div(l, u), output=False)
+_core('gable_bays', ('width', 'gable_unit_length'), lambda o, w, g: o.trunc_div(w, g), output=False)
+_core('area', ('length', 'width'), lambda o, l, w: l * w, output=False)
+_core('perimeter', ('length', 'width'), lambda o, l, w: (l + w) * 2, output=False)
+
+# 2. Structural Components
+# Upright Support: (Units + 1) * 2
+_core('upright_support', ('num_units',), lambda o, n: (n + 1) * 2)
+# Gable Columns: (Width / Gable_Unit - 1) * 2，max(0, ...) 避免宽度小于间隔时为负
+_core('gable_post', ('gable_bays',), lambda o, g: o.maximum(0, (g - 1) * 2))
+# 奇数间隔无中柱，偶数有中柱
+_core('has_mid_post', ('gable_bays',), lambda o, g: (g % 2 == 0) & (g > 0))
+
+# 3. Connections & Aux
+_core('roof_beam', ('num_units',), lambda o, n: n + 1)
+_core('ridge_conn', ('num_units',), lambda o, n: n + 1)
+_core('eave_conn', ('num_units',), lambda o, n: (n + 1) * 2)
+# Bearing Count (Total Columns) = uprights + gable posts
+_core('bearing_count', ('upright_support', 'gable_post'), lambda o, u, g: u + g)
+_core('main_comp_total', ('upright_support', 'gable_post', 'roof_beam'), lambda o, u, g, b: u + g + b)
+_core('expansion_screw', ('bearing_count', 'holes_per_base'), lambda o, b, h: b * h)
+_core('drilling_steel', ('bearing_count', 'holes_per_base'), lambda o, b, h: b * h)
+
+# 4. Cover & Decoration
+_core('roof_canvas', ('area', 'roof_pitch_factor'), lambda o, a, p: o.round2(a * p))
+_core('roof_liner', ('roof_canvas',), lambda o, c: c)
+_core('glass_wall_m', ('perimeter',), lambda o, p: o.round2(p))
+_core('glass_wall_sqm', ('perimeter', 'side_height'), lambda o, p, h: o.round2(p * h))
+_core('roof_cover', ('roof_canvas', 'roof_liner', 'glass_wall_sqm'), lambda o, c, l, g: o.round2(c + l + g))
+_core('basic_lighting', ('num_units',), lambda o, n: o.maximum(0, (n - 1) * 2))
+_core('roof_stretcher', ('num_units',), lambda o, n: n * 2)
+
+
+# --- 4.0 版配件公式 / Accessory formulas (篷房配件计算系统.py) ---
+# 输入保持原样 (不转换类型)，以便整数尺寸的输出格式与 4.0 版一致
+ACCESSORY_RULES = FormulaSet('accessory', {
+    'length': None,
+    'width': None,
+    'side_height': None,
+    'unit_length': None,
+    'triangle_angle_ratio': None,
+})
+_acc = ACCESSORY_RULES.add
+
+LIGHTS_PER_BEAM = 2  # 每组斜梁2个照明
+GABLE_POSTS = 6      # 每个山墙3柱(1中柱+2侧柱)，两个山墙共6柱
+
+_acc('tent_area', ('length', 'width'), lambda o, l, w: l * w, output=False)
+_acc('perimeter', ('length', 'width'), lambda o, l, w: 2 * (l + w), output=False)
+_acc('units', ('length', 'unit_length'), lambda o, l, u: l / u, output=False)
+
+# 1. 顶篷: 篷房面积 × 三角型角度系数；2. 顶幔: 同顶篷
+_acc('roof_canvas', ('tent_area', 'triangle_angle_ratio'), lambda o, a, r: o.round2(a * r))
+_acc('roof_liner', ('roof_canvas',), lambda o, c: c)
+# 3. 四周篷布: 周长 × 边高；4. 四周边幔: 同四周篷布
+_acc('side_canvas', ('perimeter', 'side_height'), lambda o, p, h: o.round2(p * h))
+_acc('side_liner', ('side_canvas',), lambda o, c: c)
+# 5. 基础照明: (单元数量-1) × 每组斜梁照明数量
+_acc('lighting', ('units',), lambda o, u: o.trunc((u - 1) * LIGHTS_PER_BEAM))
+# 6. 锚固系统: (单元数量+1)×2 + 山墙柱数量×2
+_acc('anchoring', ('units',), lambda o, u: o.trunc((u + 1) * 2 + GABLE_POSTS * 2))
+# 7. 承重地板: 等于篷房面积
+_acc('flooring', ('length', 'width'), lambda o, l, w: o.round2(l * w))
+# 8. 玻璃墙: 两侧长边玻璃墙长度 × 边高
+_acc('glass_wall', ('length', 'side_height'), lambda o, l, h: o.round2(2 * l * h))
+
+RULE_SETS = {
+    CORE_RULES.name: CORE_RULES,
+    ACCESSORY_RULES.name: ACCESSORY_RULES,
+}
@@ -0,0 +1,283 @@
+"""
+Streamlit 界面并发负载测试 (无需网络)
+用 Streamlit 的 AppTest 在同一进程内模拟 N 个并发会话，每个会话按脚本操作界面:
+修改长度/宽度、切换语言、打开图表标签页、展开导出面板并点击下载。
+统计每次重跑的延迟 p50/p95/p99、吞吐量 (重跑/秒) 与峰值内存，并可对比不同配置。
+
+用法:
+    python tent_load.py --users 8 --steps 20
+    python tent_load.py --users 8 --compare                 # 对比缓存/局部刷新开关与进程数
+    python tent_load.py --users 8 --config nocache:TENT_CACHE_SIZE=0 --config p2:processes=2
+    python tent_load.py --users 8 --json load.json          # 同时保存 JSON 结果
+
+每个配置在独立子进程中运行 (缓存与内存互不影响)；processes=W 表示把 N 个用户分给 W 个进程，
+模拟多个 Streamlit 工作进程，峰值内存为各进程之和。
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(HERE, 'web_app.py')
+PERCENTILES = (50, 95, 99)
+LANGUAGES = ('中文', 'English')
+
+# 标准对比配置: 名称 -> {环境变量或 processes: 值}
+COMPARE_CONFIGS = {
+    'default': {},
+    'cache_off': {'TENT_CACHE_SIZE': '0'},
+    'fragments_off': {'TENT_FRAGMENTS': '0'},
+    'processes_2': {'processes': '2'},
+}
+
+
+# --- 操作 / Actions ---
+# 每个操作修改一个 AppTest 会话的控件状态，之后由调用方执行一次重跑并计时
+
+def _set_length(at, rng):
+    at.number_input(key='length').set_value(float(rng.choice(range(10, 61, 5))))
+
+
+def _set_width(at, rng):
+    at.number_input(key='width').set_value(float(rng.choice(range(10, 41, 2))))
+
+
+def _toggle_language(at, rng):
+    radio = at.sidebar.radio[0]
+    radio.set_value(LANGUAGES[1] if radio.value == LANGUAGES[0] else LANGUAGES[0])
+
+
+def _open_tab(at, rng):
+    # 标签页状态的值为当前打开的标签名
+    labels = [tab.label for tab in at.tabs]
+    if labels:
+        at.session_state['chart_tabs'] = rng.choice(labels)
+
+
+def _open_export(at, rng):
+    at.session_state['export_panel'] = True
+
+
+def _download(at, rng):
+    buttons = at.get('download_button')
+    if not buttons:
+        _open_export(at, rng)
+        return
+    buttons[0].click()
+
+
+ACTIONS = {
+    'length': _set_length,
+    'width': _set_width,
+    'language': _toggle_language,
+    'tab': _open_tab,
+    'export': _open_export,
+    'download': _download,
+}
+
+# 场景: 各操作的权重
+SCENARIOS = {
+    # 销售现场: 以改尺寸为主，偶尔看图、切语言和导出
+    'mixed': {'length': 4, 'width': 4, 'language': 1, 'tab': 2, 'export': 1, 'download': 1},
+    'resize': {'length': 1, 'width': 1},
+    'browse': {'language': 1, 'tab': 2, 'export': 1, 'download': 1},
+}
+
+
+def _user(AppTest, user_id, scenario, steps, seed, think, samples, errors):
+    """单个模拟用户: 打开页面后按场景权重执行 steps 次操作"""
+    rng = random.Random(seed + user_id)
+    names = list(SCENARIOS[scenario])
+    weights = [SCENARIOS[scenario][n] for n in names]
+    try:
+        at = AppTest.from_file(APP_PATH, default_timeout=120)
+        started = time.perf_counter()
+        at.run()
+        samples.append(('load', time.perf_counter() - started))
+        for _ in range(steps):
+            if think:
+                time.sleep(rng.uniform(0, 2 * think))
+            action = rng.choices(names, weights)[0]
+            ACTIONS[action](at, rng)
+            started = time.perf_counter()
+            at.run()
+            samples.append((action, time.perf_counter() - started))
+            if at.exception:
+                errors.append(f"user {user_id} {action}: {at.exception[0].message}")
+                return
+    except Exception as e:  # 记录并继续其他用户
+        errors.append(f"user {user_id}: {e!r}")
+
+
+def _peak_rss_mb():
+    """当前进程的峰值常驻内存 (MB)，不支持的平台返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_users(users, steps, scenario='mixed', seed=0, think=0.0):
+    """
+    在当前进程内并发运行 users 个模拟用户
+    :return: {'samples': [(操作, 秒)], 'errors': [...], 'wall': 秒, 'peak_rss_mb': MB}
+    """
+    import logging
+
+    # 在主线程中完成导入，避免多个线程同时首次导入 Streamlit 时互相等待导入锁
+    from streamlit.testing.v1 import AppTest
+
+    # AppTest 在非主线程运行时会反复警告缺少 ScriptRunContext
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    samples, errors = [], []
+    threads = [threading.Thread(target=_user, args=(AppTest, i, scenario, steps, seed, think, samples, errors))
+               for i in range(users)]
+    started = time.perf_counter()
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    return {'samples': samples, 'errors': errors, 'wall': time.perf_counter() - started,
+            'peak_rss_mb': _peak_rss_mb()}
+
+
+def percentile(ordered, p):
+    """最近秩法分位数"""
+    if not ordered:
+        return None
+    return ordered[max(0, -(-p * len(ordered) // 100) - 1)]
+
+
+def summarize(samples, wall, peak_rss_mb):
+    """汇总延迟分位数 (毫秒)、吞吐量与峰值内存；页面首次加载单独统计"""
+    reruns = sorted(s for a, s in samples if a != 'load')
+    loads = sorted(s for a, s in samples if a == 'load')
+    summary = {'reruns': len(reruns), 'throughput': round(len(reruns) / wall, 2) if wall else None}
+    for p in PERCENTILES:
+        value = percentile(reruns, p)
+        summary[f'p{p}_ms'] = round(value * 1000, 1) if value is not None else None
+    summary['load_p50_ms'] = round(percentile(loads, 50) * 1000, 1) if loads else None
+    by_action = {}
+    for action, seconds in samples:
+        by_action.setdefault(action, []).append(seconds)
+    summary['actions'] = {a: {'count': len(v), 'p50_ms': round(percentile(sorted(v), 50) * 1000, 1)}
+                          for a, v in by_action.items()}
+    summary['peak_rss_mb'] = round(peak_rss_mb, 1) if peak_rss_mb is not None else None
+    return summary
+
+
+def run_config(name, config, users, steps, scenario, seed, think):
+    """
+    在子进程中运行一个配置
+    :param config: 环境变量覆盖，其中 'processes' 表示把用户分给多少个进程
+    """
+    config = dict(config)
+    processes = max(1, int(config.pop('processes', 1)))
+    env = dict(os.environ)
+    env.update(config)
+    counts = [users // processes + (1 if i < users % processes else 0) for i in range(processes)]
+    children = [
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), '_worker', '--users', str(n),
+                          '--steps', str(steps), '--scenario', scenario, '--seed', str(seed + 1000 * i),
+                          '--think', str(think)],
+                         cwd=HERE, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        for i, n in enumerate(counts) if n
+    ]
+    samples, errors, rss, wall = [], [], 0.0, 0.0
+    for child in children:
+        out, err = child.communicate()
+        if child.returncode:
+            tail = err.strip().splitlines()[-1:] or ['']
+            errors.append(f"worker exited with {child.returncode}: {tail[0]}")
+            continue
+        part = json.loads(out.strip().splitlines()[-1])
+        samples.extend(tuple(s) for s in part['samples'])
+        errors.extend(part['errors'])
+        rss += part['peak_rss_mb'] or 0.0
+        # 吞吐量按各进程内的运行时间计算，不含解释器启动
+        wall = max(wall, part['wall'])
+    summary = summarize(samples, wall, rss or None)
+    summary.update(config=name, users=users, processes=processes, errors=errors)
+    return summary
+
+
+def _parse_config(text):
+    """'名称:KEY=VAL,KEY=VAL' -> (名称, {KEY: VAL})"""
+    name, _, body = text.partition(':')
+    config = {}
+    for item in filter(None, body.split(',')):
+        key, sep, value = item.partition('=')
+        if not sep:
+            raise argparse.ArgumentTypeError(f"bad config item {item!r}, expected KEY=VALUE")
+        config[key.strip()] = value.strip()
+    return name, config
+
+
+def _print_table(results):
+    print(f"{'config':<16}{'users':>6}{'proc':>5}{'reruns':>8}{'rerun/s':>9}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'load ms':>9}{'RSS MB':>9}{'errors':>7}")
+    for r in results:
+        cells = [r['p50_ms'], r['p95_ms'], r['p99_ms'], r['load_p50_ms'], r['peak_rss_mb']]
+        print(f"{r['config']:<16}{r['users']:>6}{r['processes']:>5}{r['reruns']:>8}{r['throughput'] or 0:>9.2f}"
+              + ''.join(f"{c if c is not None else '-':>9}" for c in cells) + f"{len(r['errors']):>7}")
+    for r in results:
+        for e in r['errors'][:5]:
+            print(f"[{r['config']}] {e}", file=sys.stderr)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="篷房界面并发负载测试 / Concurrent-session load test")
+    parser.add_argument('--users', type=int, default=8, help="并发用户数")
+    parser.add_argument('--steps', type=int, default=20, help="每个用户的操作次数 (不含首次加载)")
+    parser.add_argument('--scenario', choices=SCENARIOS, default='mixed')
+    parser.add_argument('--think', type=float, default=0.0, help="平均思考时间 (秒)，0 表示连续操作")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--processes', type=int, default=1, help="默认配置下的进程数")
+    parser.add_argument('--config', action='append', type=_parse_config, metavar='NAME:KEY=VAL,...',
+                        help="对比配置 (可重复)，KEY 为环境变量或 processes")
+    parser.add_argument('--compare', action='store_true',
+                        help="运行标准对比: " + ', '.join(COMPARE_CONFIGS))
+    parser.add_argument('--json', help="把结果另存为 JSON 文件")
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['_worker']:
+        # 子进程: 运行一组用户，把原始样本以 JSON 输出到标准输出
+        args = build_parser().parse_args(argv[1:])
+        result = run_users(args.users, args.steps, args.scenario, args.seed, args.think)
+        print(json.dumps(result))
+        return 0
+
+    args = build_parser().parse_args(argv)
+    if args.users < 1 or args.steps < 0:
+        print("--users must be >= 1 and --steps >= 0", file=sys.stderr)
+        return 2
+    configs = list(args.config or [])
+    if args.compare:
+        configs = list(COMPARE_CONFIGS.items()) + configs
+    if not configs:
+        configs = [('default', {'processes': str(args.processes)})]
+
+    results = []
+    for name, config in configs:
+        print(f"running {name} ({args.users} users × {args.steps} steps)...", file=sys.stderr)
+        results.append(run_config(name, config, args.users, args.steps, args.scenario, args.seed, args.think))
+    _print_table(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=1)
+    return 1 if any(r['errors'] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
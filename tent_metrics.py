@@ -0,0 +1,203 @@
+"""
+分阶段耗时统计 (无第三方依赖)
+用 span('阶段名') 包住热点代码，按阶段汇总最近若干次耗时的 p50/p95/p99。
+默认关闭，关闭时 span() 返回同一个空上下文，开销只有一次函数调用。
+
+开启方式:
+    TENT_METRICS=1                       整个进程开启统计 (界面侧边栏调试面板需另设 TENT_DEBUG=1 或 ?debug=1)
+    with scoped():                       只在当前上下文 (如一个界面会话的一次重跑) 内开启
+    TENT_METRICS_FILE=metrics.jsonl      开启统计，并定期把快照追加写入 JSON lines 文件
+    TENT_METRICS_INTERVAL=60             写文件的最小间隔 (秒)
+
+查看文件中每个进程最近一次快照:
+    python tent_metrics.py metrics.jsonl
+"""
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+DEFAULT_WINDOW = 1024
+PERCENTILES = (50, 95, 99)
+
+
+class _NullSpan:
+    """统计关闭时使用的空上下文"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'started')
+
+    def __init__(self, name):
+        self.name = name
+        self.started = 0
+
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, (time.perf_counter_ns() - self.started) / 1e6)
+        return False
+
+
+class Histogram:
+    """单个阶段的滚动窗口 (最近 window 次耗时，毫秒) 与累计次数"""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def add(self, ms):
+        self.samples.append(ms)
+        self.count += 1
+        self.total_ms += ms
+
+    def summary(self):
+        """返回 {count, mean, max, p50, p95, p99} (窗口内，毫秒)"""
+        ordered = sorted(self.samples)
+        n = len(ordered)
+        result = {'count': self.count}
+        if not n:
+            return result
+        result['mean'] = round(sum(ordered) / n, 3)
+        result['max'] = round(ordered[-1], 3)
+        for p in PERCENTILES:
+            # 最近秩法: 第 ceil(p/100 * n) 个样本
+            result[f'p{p}'] = round(ordered[max(0, -(-p * n // 100) - 1)], 3)
+        return result
+
+
+# --- 进程级状态 / Process-wide state ---
+_enabled = bool(os.environ.get('TENT_METRICS', '0') not in ('', '0') or os.environ.get('TENT_METRICS_FILE'))
+# 上下文级开关 (scoped)，不影响其他线程/会话
+_scoped = contextvars.ContextVar('tent_metrics.scoped', default=False)
+_histograms = {}
+_lock = threading.Lock()
+_last_dump = 0.0
+
+
+def enabled():
+    return _enabled or _scoped.get()
+
+
+def enable(flag=True):
+    """运行时开启/关闭整个进程的统计 (例如基准测试)"""
+    global _enabled
+    _enabled = bool(flag)
+
+
+class scoped:
+    """
+    只在当前上下文内开启 (flag 为假时不改变状态):
+        with scoped(debug):
+            ...
+    界面每个会话的脚本各自运行，调试会话开启统计不会让其他会话付出计时开销。
+    """
+
+    __slots__ = ('flag', 'token')
+
+    def __init__(self, flag=True):
+        self.flag = bool(flag)
+        self.token = None
+
+    def __enter__(self):
+        if self.flag:
+            self.token = _scoped.set(True)
+        return self
+
+    def __exit__(self, *exc):
+        if self.token is not None:
+            _scoped.reset(self.token)
+            self.token = None
+        return False
+
+
+def span(name):
+    """
+    计时上下文:
+        with span('calculate_all'):
+            ...
+    统计关闭时不计时。
+    """
+    return _Span(name) if _enabled or _scoped.get() else _NULL_SPAN
+
+
+def record(name, ms):
+    """记录一次耗时 (毫秒)"""
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram()
+        hist.add(ms)
+
+
+def snapshot():
+    """所有阶段的汇总 {阶段: summary()}，按首次出现顺序"""
+    with _lock:
+        return {name: hist.summary() for name, hist in _histograms.items()}
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def dump(path):
+    """把当前快照作为一行 JSON 追加到文件"""
+    line = {'ts': round(time.time(), 3), 'pid': os.getpid(), 'stages': snapshot()}
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(line, ensure_ascii=False) + '\n')
+
+
+def maybe_dump():
+    """设置了 TENT_METRICS_FILE 且距上次写入超过 TENT_METRICS_INTERVAL 秒时写入一次快照"""
+    global _last_dump
+    path = os.environ.get('TENT_METRICS_FILE')
+    if not path or not _enabled:
+        return False
+    now = time.monotonic()
+    if now - _last_dump < float(os.environ.get('TENT_METRICS_INTERVAL', 60)):
+        return False
+    _last_dump = now
+    dump(path)
+    return True
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("usage: python tent_metrics.py metrics.jsonl", file=sys.stderr)
+        return 2
+    latest = {}
+    with open(argv[0], encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                snap = json.loads(line)
+                latest[snap['pid']] = snap
+    for pid, snap in latest.items():
+        stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(snap['ts']))
+        print(f"pid {pid} @ {stamp}")
+        print(f"  {'stage':<16}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  (ms)")
+        for name, s in snap['stages'].items():
+            print(f"  {name:<16}{s['count']:>8}" + ''.join(f"{s.get(k, 0):>10.3f}" for k in ('p50', 'p95', 'p99', 'max')))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+报价: 价格表与构件数量关联，计算行金额与总价
+价格表 (CSV 或 JSON 记录列表) 每行一个价格档:
+    component   calculate_all 的输出名 (或 num_units / area / perimeter)
+    series      系列 (BT = 5 米单元, PT = 3 米单元)，留空为默认价；某系列有专门的行时整体覆盖默认价
+    min_qty     该档起始数量，每个 (构件, 系列) 的第一档必须从 0 开始
+    unit_price  单价
+    unit        计价单位 (仅用于显示)
+    currency    币种，整张表必须一致
+    mode        volume = 按达到的档位单价计全部数量 (默认)；tiered = 分段累进计价
+载入后按 构件 → 系列 → 档位数组 建立索引，单顶或成批配置都用同一条向量化路径:
+档位用 searchsorted 定位，累进价预先算好每档起点的累计金额，整批一次计算。
+
+用法:
+    python tent_pricing.py prices.csv orders.csv -o quotes.csv    # 规格清单格式同 tent_project.py
+    python tent_pricing.py prices.csv --catalog -o catalog_prices.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+
+from tent_core import BATCH_INPUTS, TentCalculator
+
+# 单元长度 → 系列
+SERIES = {5.0: 'BT', 3.0: 'PT'}
+MODES = ('volume', 'tiered')
+BASIC_FIELDS = ('num_units', 'area', 'perimeter')
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prices.csv')
+
+
+def series_of(unit_length):
+    """单元长度对应的系列名 (数组)，不在 SERIES 中的为 '' (只用默认价)"""
+    import numpy as np
+
+    unit_length = np.asarray(unit_length, dtype=float)
+    series = np.full(unit_length.shape, '', dtype=object)
+    for length, name in SERIES.items():
+        series[unit_length == length] = name
+    return series
+
+
+class _Tiers:
+    """一个 (构件, 系列) 的价格档"""
+
+    __slots__ = ('breaks', 'prices', 'base', 'mode', 'unit')
+
+    def __init__(self, tiers, mode, unit):
+        import numpy as np
+
+        tiers = sorted(tiers)
+        self.breaks = np.array([q for q, _ in tiers], dtype=float)
+        self.prices = np.array([p for _, p in tiers], dtype=float)
+        # 累进计价: 每档起点之前的累计金额
+        self.base = np.concatenate(([0.0], np.cumsum(np.diff(self.breaks) * self.prices[:-1])))
+        self.mode = mode
+        self.unit = unit
+
+    def total(self, qty):
+        import numpy as np
+
+        i = np.searchsorted(self.breaks, qty, side='right') - 1
+        if self.mode == 'volume':
+            return qty * self.prices[i]
+        return self.base[i] + (qty - self.breaks[i]) * self.prices[i]
+
+
+class Quote:
+    """单顶篷房的报价"""
+
+    def __init__(self, lines, total, currency):
+        self.lines = lines          # {构件: (数量, 计价单位, 折合单价, 金额)}
+        self.total = total
+        self.currency = currency
+
+
+class PriceList:
+    """索引后的价格表 {构件: {系列: _Tiers}}"""
+
+    def __init__(self, entries, currency):
+        self.entries = entries
+        self.currency = currency
+
+    @property
+    def components(self):
+        return tuple(self.entries)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        校验并索引价格表
+        :param records: 字典列表 (CSV 中为字符串)
+        :raises ValueError: 字段缺失、数值非法、构件名未知、币种/计价方式不一致，消息中带行号 (从 1 开始)
+        """
+        known = set(TentCalculator.rules.compile().outputs) | set(BASIC_FIELDS)
+        groups = {}
+        currency = None
+        for i, record in enumerate(records, 1):
+            component = (record.get('component') or '').strip()
+            if component not in known:
+                raise ValueError(f"row {i}: unknown component {component!r}")
+            series = (record.get('series') or '').strip()
+            try:
+                min_qty = float(record.get('min_qty') or 0)
+                unit_price = float(record['unit_price'])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"row {i}: invalid min_qty/unit_price") from None
+            if min_qty < 0 or unit_price < 0:
+                raise ValueError(f"row {i}: min_qty and unit_price must be >= 0")
+            mode = (record.get('mode') or 'volume').strip()
+            if mode not in MODES:
+                raise ValueError(f"row {i}: mode must be one of {', '.join(MODES)}, got {mode!r}")
+            row_currency = (record.get('currency') or '').strip()
+            if currency is None:
+                currency = row_currency
+            elif row_currency != currency:
+                raise ValueError(f"row {i}: currency {row_currency!r} differs from {currency!r}")
+            group = groups.setdefault((component, series), {'tiers': [], 'mode': mode,
+                                                            'unit': (record.get('unit') or '').strip()})
+            if group['mode'] != mode:
+                raise ValueError(f"row {i}: mixed pricing modes for {component}/{series or 'default'}")
+            group['tiers'].append((min_qty, unit_price))
+
+        entries = {}
+        for (component, series), group in groups.items():
+            if min(q for q, _ in group['tiers']) != 0:
+                raise ValueError(f"{component}/{series or 'default'}: first tier must start at min_qty 0")
+            entries.setdefault(component, {})[series] = _Tiers(group['tiers'], group['mode'], group['unit'])
+        return cls(entries, currency or '')
+
+    @classmethod
+    def load(cls, path):
+        """从 .csv 或 .json (记录列表) 载入价格表"""
+        if path.endswith('.json'):
+            with open(path, encoding='utf-8') as f:
+                return cls.from_records(json.load(f))
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            return cls.from_records(csv.DictReader(f))
+
+    def price(self, quantities, unit_length):
+        """
+        向量化计价
+        :param quantities: {构件: 数量数组}，如 calculate_batch 的结果或预计算表的列
+        :param unit_length: 单元长度数组 (决定系列) 或标量
+        :return: {构件: 金额数组, 'total': 总价数组}，金额保留两位小数；
+                 价格表中有、数量中没有的构件不计
+        """
+        import numpy as np
+
+        series = series_of(unit_length)
+        out = {}
+        total = None
+        for component, by_series in self.entries.items():
+            if component not in quantities:
+                continue
+            qty = np.asarray(quantities[component], dtype=float)
+            default = by_series.get('')
+            amount = default.total(qty) if default is not None else np.zeros_like(qty)
+            for name, tiers in by_series.items():
+                if not name:
+                    continue
+                mask = np.broadcast_to(series == name, qty.shape)
+                if mask.any():
+                    amount = np.where(mask, tiers.total(qty), amount)
+            out[component] = amount = np.round(amount, 2)
+            total = amount if total is None else total + amount
+        out['total'] = np.round(total, 2) if total is not None else np.zeros(np.shape(unit_length))
+        return out
+
+    def quote(self, res, unit_length):
+        """单顶报价: res 为 calculate_all 的结果 (可含 num_units/area/perimeter)"""
+        import numpy as np
+
+        quantities = {k: np.array([float(v)]) for k, v in res.items() if k in self.entries}
+        amounts = self.price(quantities, np.array([float(unit_length)]))
+        series = series_of(float(unit_length)).item()
+        lines = {}
+        for component in self.entries:
+            if component not in quantities:
+                continue
+            qty = quantities[component][0].item()
+            amount = amounts[component][0].item()
+            tiers = self.entries[component].get(series) or self.entries[component].get('')
+            unit = tiers.unit if tiers is not None else ''
+            lines[component] = (res[component], unit, round(amount / qty, 2) if qty else 0.0, amount)
+        return Quote(lines, amounts['total'][0].item(), self.currency)
+
+
+def quote_batch(prices, data):
+    """
+    批量报价: 先 calculate_batch，再一次向量化计价
+    :param data: {列名: 数组} 或 DataFrame，列名见 BATCH_INPUTS
+    :return: {构件: 金额数组, 'total': 总价数组}
+    """
+    results = TentCalculator.calculate_batch({k: data[k] for k in BATCH_INPUTS})
+    return prices.price(results, data['unit_length'])
+
+
+_default = None
+_default_lock = threading.Lock()
+_default_loaded = False
+
+
+def default_price_list():
+    """
+    进程级共享的价格表 (环境变量 TENT_PRICES 指定路径，默认 prices.csv)。
+    文件不存在时返回 None，界面不显示价格列。
+    """
+    global _default, _default_loaded
+    if _default_loaded:
+        return _default
+    with _default_lock:
+        if not _default_loaded:
+            path = os.environ.get('TENT_PRICES', DEFAULT_PATH)
+            try:
+                _default = PriceList.load(path)
+            except FileNotFoundError:
+                _default = None
+            except ValueError as e:
+                print(f"⚠️ ignoring invalid price list {path}: {e}", file=sys.stderr)
+                _default = None
+            _default_loaded = True
+    return _default
+
+
+# --- 命令行 / Command line ---
+
+def _write(path, columns, fields):
+    import numpy as np
+
+    out = open(path, 'w', encoding='utf-8-sig', newline='') if path else sys.stdout
+    try:
+        writer = csv.writer(out, lineterminator='\n')
+        writer.writerow(fields)
+        # 按列转成 Python 标量后逐行写出
+        values = [np.asarray(columns[f]).tolist() for f in fields]
+        writer.writerows(zip(*values))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def main(argv=None):
+    import time
+
+    import numpy as np
+
+    parser = argparse.ArgumentParser(description="价格表报价 / Quote totals from a price list")
+    parser.add_argument('prices', help="价格表 (.csv 或 .json)")
+    parser.add_argument('input', nargs='?', help="规格清单 CSV (格式同 tent_project.py)，'-' 表示标准输入")
+    parser.add_argument('--catalog', action='store_true', help="为整张目录预计算表报价 (见 tent_catalog.py)")
+    parser.add_argument('-o', '--output', help="输出 CSV 文件 (默认打印到标准输出)")
+    args = parser.parse_args(argv)
+    if bool(args.input) == args.catalog:
+        parser.error("give either an input file or --catalog")
+
+    try:
+        prices = PriceList.load(args.prices)
+        if args.catalog:
+            from tent_catalog import Catalog
+
+            catalog = Catalog()
+            table = catalog.table
+            inputs = catalog.inputs()
+            data = {k: inputs[k] for k in BATCH_INPUTS}
+            start = time.perf_counter()
+            amounts = prices.price({k: table[k] for k in prices.components if k in table.dtype.names},
+                                   data['unit_length'])
+        else:
+            import tent_project
+
+            stream = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8-sig', newline='')
+            try:
+                tents = tent_project.parse_tents(csv.DictReader(stream))
+            finally:
+                if stream is not sys.stdin:
+                    stream.close()
+            data = {k: np.array([t.params[i] for t in tents]) for i, k in enumerate(BATCH_INPUTS)}
+            data['quantity'] = np.array([t.quantity for t in tents])
+            start = time.perf_counter()
+            amounts = quote_batch(prices, data)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    columns = dict(data, **amounts)
+    fields = list(data) + [k for k in prices.components if k in amounts] + ['total']
+    _write(args.output, columns, fields)
+    rows = len(amounts['total'])
+    grand = (amounts['total'] * data.get('quantity', 1)).sum()
+    print(f"priced {rows:,} configurations in {elapsed:.2f}s ({prices.currency} {grand:,.2f} total)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
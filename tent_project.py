@@ -0,0 +1,323 @@
+"""
+多篷房项目汇总
+一个活动项目通常包含 20–500 顶不同尺寸的篷房。输入篷房清单 (每行一组构造参数与数量)，
+相同规格只计算一次，已算过的规格从进程级缓存中复用，大项目分块交给进程池并行计算；
+输出汇总物料清单 (件数与面积按数量累加) 以及逐顶明细。
+
+用法:
+    python tent_project.py tents.csv                  # 打印汇总物料清单
+    python tent_project.py tents.csv --per-tent -o detail.csv
+    python tent_project.py tents.csv --per-tent -o detail.parquet   # 也支持 .arrow / .xlsx
+
+CSV 字段: length, width (必填)，side_height, unit_length, gable_unit_length, holes_per_base,
+roof_pitch_factor (可选，默认同界面)，quantity (默认 1)，name (可选)。
+"""
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import tent_export
+from tent_cache import DEFAULT_MAXSIZE, shared_cache
+from tent_core import BATCH_INPUTS, INPUT_DEFAULTS, REQUIRED_INPUTS, TRANSLATIONS, spec_key
+from tent_results import ResultTable, record_type
+
+# 参数上限 (米 / 个 / 系数)：1e308 这类输入会算出 Infinity 或上百位的整数
+MAX_VALUES = {'length': 10000.0, 'width': 10000.0, 'side_height': 100.0, 'unit_length': 100.0,
+              'gable_unit_length': 100.0, 'holes_per_base': 1000, 'roof_pitch_factor': 10.0}
+# 单元长度下限 (1 毫米)，单元数量因此不超过 1000 万
+MIN_UNIT_LENGTH = 0.001
+# 物料清单字段与单位 (TRANSLATIONS 中的单位键)；has_mid_post 汇总为带中柱的篷房数
+BOM_FIELDS = (
+    ('num_units', 'unit_sets'),
+    ('area', 'unit_area'),
+    ('perimeter', 'unit_m'),
+    ('upright_support', 'unit_pcs'),
+    ('gable_post', 'unit_pcs'),
+    ('has_mid_post', 'unit_tents'),
+    ('roof_beam', 'unit_sets'),
+    ('ridge_conn', 'unit_pcs'),
+    ('eave_conn', 'unit_pcs'),
+    ('bearing_count', 'unit_pcs'),
+    ('main_comp_total', 'unit_pcs'),
+    ('expansion_screw', 'unit_pcs'),
+    ('drilling_steel', 'unit_pcs'),
+    ('roof_canvas', 'unit_area'),
+    ('roof_liner', 'unit_area'),
+    ('roof_cover', 'unit_area'),
+    ('glass_wall_m', 'unit_m'),
+    ('glass_wall_sqm', 'unit_area'),
+    ('basic_lighting', 'unit_pcs'),
+    ('roof_stretcher', 'unit_pcs'),
+)
+# 不同规格数超过该值时才启动进程池；更小的项目单进程批量计算更快
+PARALLEL_MIN_SPECS = 20000
+CHUNK_SIZE = 8192
+# 规格缓存按条目计，项目清单比单个界面会话大得多
+SPEC_CACHE_FACTOR = 16
+
+
+class Tent:
+    """清单中的一行: 名称、规范化后的构造参数元组与数量"""
+
+    __slots__ = ('name', 'params', 'quantity')
+
+    def __init__(self, name, params, quantity):
+        self.name = name
+        self.params = params
+        self.quantity = quantity
+
+    def __repr__(self):
+        return f"Tent({self.name!r}, {self.params!r}, quantity={self.quantity})"
+
+
+def _blank(value):
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value.strip()
+    return value != value  # NaN (pandas 空单元格)
+
+
+def parse_params(record):
+    """
+    校验一条规格记录的构造参数，可选参数缺省时取 tent_core.INPUT_DEFAULTS
+    :param record: 字典 (值可为字符串或数字)
+    :return: spec_key 规范化后的参数元组
+    :raises ValueError: 缺少必填字段、数值非法或超出 MAX_VALUES 范围
+    """
+    values = {}
+    for name in BATCH_INPUTS:
+        raw = record.get(name)
+        if _blank(raw):
+            if name in REQUIRED_INPUTS:
+                raise ValueError(f"missing '{name}'")
+            raw = INPUT_DEFAULTS[name]
+        try:
+            value = float(raw)
+        except (TypeError, ValueError):
+            raise ValueError(f"invalid {name}={raw!r}") from None
+        if not value > 0 or value == float('inf'):
+            raise ValueError(f"{name} must be a positive number, got {raw!r}")
+        if value > MAX_VALUES[name]:
+            raise ValueError(f"{name} must be at most {MAX_VALUES[name]:g}, got {raw!r}")
+        if name in ('unit_length', 'gable_unit_length') and value < MIN_UNIT_LENGTH:
+            raise ValueError(f"{name} must be at least {MIN_UNIT_LENGTH:g}, got {raw!r}")
+        if name == 'holes_per_base' and value != int(value):
+            raise ValueError(f"holes_per_base must be an integer, got {raw!r}")
+        values[name] = value
+    return spec_key(**values)
+
+
+def parse_tents(records):
+    """
+    校验并规范化篷房清单
+    :param records: 字典列表 (CSV 中为字符串) 或 pandas DataFrame
+    :return: [Tent]；数量为 0 的行会被跳过
+    :raises ValueError: 缺少必填字段或数值非法，消息中带行号 (从 1 开始)
+    """
+    if hasattr(records, 'to_dict'):
+        records = records.to_dict('records')
+    tents = []
+    for i, record in enumerate(records, 1):
+        try:
+            params = parse_params(record)
+        except ValueError as e:
+            raise ValueError(f"row {i}: {e}") from None
+        raw = record.get('quantity')
+        try:
+            quantity = 1 if _blank(raw) else float(raw)
+        except (TypeError, ValueError):
+            raise ValueError(f"row {i}: invalid quantity={raw!r}") from None
+        # 数量与 holes_per_base 一样必须是整数: "1.5" 不能悄悄截成 1 顶
+        if not 0 <= quantity < float('inf') or quantity != int(quantity):
+            raise ValueError(f"row {i}: quantity must be a non-negative integer, got {raw!r}")
+        quantity = int(quantity)
+        if quantity == 0:
+            continue
+        name = record.get('name')
+        name = f"#{i}" if _blank(name) else str(name)
+        tents.append(Tent(name, params, quantity))
+    return tents
+
+
+def _spec_cache():
+    size = int(os.environ.get('TENT_CACHE_SIZE', DEFAULT_MAXSIZE))
+    return shared_cache('tent_project.specs', maxsize=size * SPEC_CACHE_FACTOR)
+
+
+def _compute_specs(specs):
+    """
+    批量计算一组规格 (进程池任务)，返回与 specs 对齐的结果记录列表。
+    批量结果经 ResultTable 统一列类型 (见 tent_results.py) 后逐行转成定长的 __slots__ 记录：
+    缓存中每个规格只占自己的一条记录，不会像行视图那样把整块结果表一直留在内存中
+    """
+    cols = {name: [s[i] for s in specs] for i, name in enumerate(BATCH_INPUTS)}
+    table = ResultTable.calculate(cols)
+    return list(map(record_type(table.fields), *(table.column(name).tolist() for name in table.fields)))
+
+
+def evaluate_specs(specs, workers=None):
+    """
+    计算不重复的规格，已缓存的直接复用
+    :param specs: 规范化参数元组的可迭代对象 (可含重复)
+    :param workers: 进程数，默认 CPU 核数；只有待计算规格超过 PARALLEL_MIN_SPECS 时才启用进程池
+    :return: ({规格: 结果字典}, 本次实际计算的规格数)
+    """
+    cache = _spec_cache()
+    results = {}
+    missing = []
+    for spec in dict.fromkeys(specs):
+        row = cache.get(spec)
+        if row is None:
+            missing.append(spec)
+        else:
+            results[spec] = row
+
+    if missing:
+        chunks = [missing[i:i + CHUNK_SIZE] for i in range(0, len(missing), CHUNK_SIZE)]
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(missing) > PARALLEL_MIN_SPECS:
+            import multiprocessing
+
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+                parts = list(pool.map(_compute_specs, chunks))
+        else:
+            parts = [_compute_specs(chunk) for chunk in chunks]
+        for chunk, rows in zip(chunks, parts):
+            for spec, row in zip(chunk, rows):
+                results[spec] = row
+                cache.put(spec, row)
+    return results, len(missing)
+
+
+class ProjectResult:
+    """项目计算结果: 逐顶明细与汇总物料清单"""
+
+    def __init__(self, tents, results, computed):
+        self.tents = tents
+        self.results = results          # {规格: 单顶结果}
+        self.computed = computed        # 本次实际计算的规格数 (其余来自缓存)
+
+    @property
+    def unique(self):
+        return len(self.results)
+
+    @property
+    def total_tents(self):
+        return sum(tent.quantity for tent in self.tents)
+
+    def per_tent(self):
+        """逐行明细: [(Tent, 单顶结果)]"""
+        return [(tent, self.results[tent.params]) for tent in self.tents]
+
+    def bom(self):
+        """汇总物料清单 {字段: 合计}；面积与长度保留两位小数，has_mid_post 为带山墙中柱的篷房数"""
+        totals = dict.fromkeys((name for name, _ in BOM_FIELDS), 0)
+        for tent in self.tents:
+            row = self.results[tent.params]
+            for name in totals:
+                totals[name] += row[name] * tent.quantity
+        for name, unit in BOM_FIELDS:
+            if unit in ('unit_area', 'unit_m'):
+                totals[name] = round(totals[name], 2)
+        return totals
+
+
+def evaluate(tents, workers=None):
+    """计算篷房清单 (Tent 列表或 parse_tents 可接受的记录)，返回 ProjectResult"""
+    if not all(isinstance(t, Tent) for t in tents):
+        tents = parse_tents(tents)
+    results, computed = evaluate_specs((t.params for t in tents), workers)
+    return ProjectResult(tents, results, computed)
+
+
+def bom_label(t, name):
+    """物料清单字段在界面/报告中的名称"""
+    return {'area': t['tent_area'], 'has_mid_post': t['bom_mid_post_tents']}.get(name, t.get(name, name))
+
+
+# --- 导出 / Export ---
+BOM_EXPORT_FIELDS = [('item', 'str', ''), ('label', 'str', ''), ('value', 'float', ''), ('unit', 'str', '')]
+
+
+def bom_columns(project, t):
+    """汇总物料清单的列 (配合 BOM_EXPORT_FIELDS 交给 tent_export 写出)"""
+    bom = project.bom()
+    return {
+        'item': [name for name, _ in BOM_FIELDS],
+        'label': [bom_label(t, name) for name, _ in BOM_FIELDS],
+        'value': [bom[name] for name, _ in BOM_FIELDS],
+        'unit': [t[unit] for _, unit in BOM_FIELDS],
+    }
+
+
+def per_tent_fields():
+    """逐顶明细的列定义: 名称、数量、构造参数与单顶结果"""
+    inputs = [(name, 'int' if name == 'holes_per_base' else 'float', '') for name in BATCH_INPUTS]
+    return [('name', 'str', ''), ('quantity', 'int', '')] + inputs + tent_export.core_fields()
+
+
+def per_tent_chunks(project, size=CHUNK_SIZE):
+    """逐顶明细按块产出 {列: 列表}，写大项目时不必一次展开全部行"""
+    names = [name for name, _, _ in per_tent_fields()]
+    rows = project.per_tent()
+    for start in range(0, len(rows), size):
+        columns = {name: [] for name in names}
+        for tent, row in rows[start:start + size]:
+            columns['name'].append(tent.name)
+            columns['quantity'].append(tent.quantity)
+            for name, value in zip(BATCH_INPUTS, tent.params):
+                columns[name].append(value)
+            for name, _ in BOM_FIELDS:
+                columns[name].append(row[name])
+        yield columns
+
+
+# --- 命令行 / Command line ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多篷房项目物料汇总 / Multi-tent project bill of materials")
+    parser.add_argument('input', help="篷房清单 CSV，'-' 表示标准输入")
+    parser.add_argument('-o', '--output', help="输出 CSV 文件 (默认打印到标准输出)")
+    parser.add_argument('--per-tent', action='store_true', help="输出逐顶明细而不是汇总")
+    parser.add_argument('--format', choices=tent_export.FORMATS,
+                        help="输出格式，默认按输出文件扩展名判断 (标准输出为 csv)")
+    parser.add_argument('--lang', choices=('zh', 'en'), default='zh')
+    parser.add_argument('--workers', type=int, help="进程数 (默认 CPU 核数)")
+    args = parser.parse_args(argv)
+
+    stream = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8-sig', newline='')
+    try:
+        project = evaluate(parse_tents(csv.DictReader(stream)), args.workers)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    t = TRANSLATIONS['中文' if args.lang == 'zh' else 'English']
+    fmt = args.format or os.path.splitext(args.output or '')[1].lstrip('.') or 'csv'
+    if fmt not in tent_export.FORMATS:
+        print(f"❌ unknown output format {fmt!r}, use --format", file=sys.stderr)
+        return 2
+    try:
+        with tent_export.open_writer(fmt, args.output or sys.stdout.buffer,
+                                     per_tent_fields() if args.per_tent else BOM_EXPORT_FIELDS) as writer:
+            if args.per_tent:
+                for columns in per_tent_chunks(project):
+                    writer.write(columns)
+            else:
+                writer.write(bom_columns(project, t))
+    except ImportError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    print(f"{project.total_tents} tents, {project.unique} unique specs, {project.computed} computed",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""
+紧凑的计算结果存储
+单个结果: record_type() 生成的 __slots__ 记录类，字段顺序固定，没有逐个实例的 __dict__；
+    支持字典式访问 (res['roof_canvas'])、属性访问 (res.roof_canvas) 与 Mapping 的全部方法。
+大量结果: ResultTable 按列存储 (计数 int32、面积等 float64、布尔标志按位压缩)，
+    每行只占 4/8 字节或 1 bit，而不是一个约 20 个键的字典；
+    可零拷贝地转为 NumPy 数组、pandas DataFrame 或 Arrow 表，迭代时产生轻量的行视图。
+"""
+from collections.abc import Mapping
+from functools import lru_cache
+
+
+class Record(Mapping):
+    """定长结果记录的基类；具体字段由 record_type() 生成的子类以 __slots__ 声明"""
+
+    __slots__ = ()
+    _fields = ()
+    _index = {}
+
+    def __getitem__(self, key):
+        if key not in self._index:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __repr__(self):
+        items = ', '.join(f"{k}={getattr(self, k)!r}" for k in self._fields)
+        return f"{type(self).__name__}({items})"
+
+    def __reduce__(self):
+        # 生成的类不能按名字导入，序列化时记录字段名，反序列化时重新生成
+        return _rebuild, (type(self).__name__, self._fields, tuple(getattr(self, k) for k in self._fields))
+
+    def to_dict(self):
+        return {k: getattr(self, k) for k in self._fields}
+
+
+@lru_cache(maxsize=None)
+def record_type(fields, name='TentResult'):
+    """
+    按字段元组生成 (并缓存) 记录类
+    :param fields: 字段名元组，顺序即记录的迭代顺序
+    """
+    fields = tuple(fields)
+    bad = [k for k in fields if not k.isidentifier() or k.startswith('_')]
+    if bad:
+        raise ValueError(f"invalid field names: {', '.join(bad)}")
+    # 与 namedtuple/dataclasses 相同，生成逐字段赋值的 __init__，比循环 setattr 快一倍
+    args = ', '.join(fields)
+    body = ''.join(f"\n    self.{k} = {k}" for k in fields) or "\n    pass"
+    namespace = {}
+    exec(f"def __init__(self, {args}):{body}" if fields else f"def __init__(self):{body}", namespace)
+    return type(name, (Record,), {
+        '__slots__': fields,
+        '__init__': namespace['__init__'],
+        '_fields': fields,
+        '_index': {k: i for i, k in enumerate(fields)},
+    })
+
+
+def _rebuild(name, fields, values):
+    return record_type(fields, name)(*values)
+
+
+class RowView(Mapping):
+    """ResultTable 中一行的只读视图 (只保存表引用与行号)，取值时返回 Python 标量"""
+
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, key):
+        return self._table.value(key, self._row)
+
+    def __iter__(self):
+        return iter(self._table.fields)
+
+    def __len__(self):
+        return len(self._table.fields)
+
+    def __contains__(self, key):
+        return key in self._table.kinds
+
+    def __repr__(self):
+        return f"RowView({self._row}, {dict(self)!r})"
+
+
+class ResultTable:
+    """
+    列式结果容器: {字段: 数组}，字段顺序与 calculate_batch 的输出一致。
+    计数列为 int32，其余数值列为 float64，布尔列按位压缩 (与 Arrow 的位图布局相同: 低位在前)。
+    """
+
+    def __init__(self, columns, length, flags=()):
+        self.columns = columns          # {字段: ndarray}；布尔列为压缩后的 uint8
+        self.length = length
+        self.fields = tuple(columns)
+        self.kinds = {name: 'flag' if name in flags else values.dtype.kind for name, values in columns.items()}
+
+    @classmethod
+    def from_batch(cls, results):
+        """
+        由 calculate_batch 的结果 (或同样结构的 {字段: 数组}) 构建
+        :raises OverflowError: 整数列超出 int32 范围
+        """
+        import numpy as np
+
+        columns = {}
+        flags = []
+        length = None
+        for name, values in results.items():
+            values = np.asarray(values)
+            length = len(values) if length is None else length
+            if values.dtype == np.bool_:
+                columns[name] = np.packbits(values, bitorder='little')
+                flags.append(name)
+            elif values.dtype.kind in 'iu':
+                info = np.iinfo(np.int32)
+                if len(values) and (values.max() > info.max or values.min() < info.min):
+                    raise OverflowError(f"column '{name}' does not fit in int32")
+                columns[name] = values.astype(np.int32, copy=False)
+            else:
+                columns[name] = values.astype(np.float64, copy=False)
+        return cls(columns, length or 0, flags)
+
+    @classmethod
+    def calculate(cls, data, arithmetic='float'):
+        """对列式输入批量计算 (见 TentCalculator.calculate_batch) 并直接按列存储"""
+        from tent_core import TentCalculator
+
+        return cls.from_batch(TentCalculator.calculate_batch(data, arithmetic))
+
+    @classmethod
+    def from_records(cls, records, fields=None):
+        """由一组记录 (字典或 Record) 构建；fields 缺省取第一条记录的键"""
+        import numpy as np
+
+        records = list(records)
+        if fields is None:
+            fields = tuple(records[0]) if records else ()
+        return cls.from_batch({k: np.array([r[k] for r in records]) for k in fields})
+
+    @classmethod
+    def concat(cls, tables):
+        """按行拼接多个字段相同的表"""
+        import numpy as np
+
+        tables = list(tables)
+        return cls.from_batch({k: np.concatenate([t.column(k) for t in tables]) for k in tables[0].fields})
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += self.length
+        if not 0 <= row < self.length:
+            raise IndexError(row)
+        return RowView(self, row)
+
+    def __iter__(self):
+        for row in range(self.length):
+            yield RowView(self, row)
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self.columns.values())
+
+    def value(self, name, row):
+        """单个值 (Python 标量)"""
+        values = self.columns[name]
+        if self.kinds[name] == 'flag':
+            return bool((values[row >> 3] >> (row & 7)) & 1)
+        return values[row].item()
+
+    def column(self, name):
+        """一列的 NumPy 数组: 数值列为零拷贝视图，布尔列需要解压 (新数组)"""
+        values = self.columns[name]
+        if self.kinds[name] == 'flag':
+            import numpy as np
+
+            return np.unpackbits(values, count=self.length, bitorder='little').view(np.bool_)
+        return values
+
+    def to_numpy(self):
+        """{字段: 数组}；数值列不复制"""
+        return {name: self.column(name) for name in self.fields}
+
+    def to_pandas(self):
+        """pandas DataFrame；数值列不复制 (每列单独成块)"""
+        import pandas as pd
+
+        return pd.DataFrame(self.to_numpy(), copy=False)
+
+    def to_arrow(self):
+        """pyarrow Table；数值列与压缩的布尔位图都直接作为 Arrow 缓冲区，不复制"""
+        import pyarrow as pa
+
+        arrays = []
+        for name in self.fields:
+            values = self.columns[name]
+            if self.kinds[name] == 'flag':
+                arrays.append(pa.Array.from_buffers(pa.bool_(), self.length, [None, pa.py_buffer(values)]))
+            else:
+                arrays.append(pa.array(values))
+        return pa.Table.from_arrays(arrays, names=list(self.fields))
@@ -0,0 +1,419 @@
+"""
+租赁库存排期
+仓库按件出租 calculate_all 统计的构件 (边柱、山墙柱、斜梁、连接角、篷布面积等)。
+这里保存各构件库存与已预订的活动 (起止日期 + 篷房清单 → 物料清单)，
+按天建立区间索引 (线段树: 区间加、区间最大值)，
+“新活动能否接单、[起, 止] 内各构件峰值占用多少”都在 O(log 天数) 内得到，而不是逐条扫描预订。
+
+用法:
+    python tent_schedule.py --db schedule.json stock upright_support=400 roof_beam=200 roof_canvas=20000
+    python tent_schedule.py --db schedule.json check 2024-06-01 2024-06-05 --length 25 --width 20 --quantity 4
+    python tent_schedule.py --db schedule.json book expo-2024 2024-06-01 2024-06-05 --length 25 --width 20 --quantity 4
+    python tent_schedule.py --db schedule.json peak 2024-06-01 2024-06-30
+    python tent_schedule.py --db schedule.json cancel expo-2024
+
+日期按天计，起止两天都算占用 (含搭建与拆除)。
+
+命令行是逐条操作的批处理工具: 每次调用都读入整个排期文件并重建一次索引 (O(活动数 + 天数))，
+上面的 O(log 天数) 指的是载入之后的每次查询。需要连续大量查询或预订时，
+在同一进程内 Schedule.load 一次后反复调用 check / peak / book，最后 save。
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+
+import tent_project
+from tent_core import BATCH_INPUTS, INPUT_DEFAULTS, REQUIRED_INPUTS
+
+# 参与排期的可租赁构件 (膨胀螺丝、钢钎等耗材不计)
+STOCK_FIELDS = ('upright_support', 'gable_post', 'roof_beam', 'ridge_conn', 'eave_conn',
+                'roof_stretcher', 'basic_lighting', 'roof_canvas', 'roof_liner', 'glass_wall_sqm')
+AREA_FIELDS = ('roof_canvas', 'roof_liner', 'glass_wall_sqm')
+# 面积保留两位小数，内部统一以 1/100 为单位的整数存储，预订与取消反复加减不会累积误差
+SCALE = 100
+MIN_DAYS = 1024
+
+
+class InsufficientStock(Exception):
+    """库存不足以接下该活动"""
+
+    def __init__(self, availability):
+        self.availability = availability
+        short = ', '.join(f"{k} -{v}" for k, v in availability.shortfall.items())
+        super().__init__(f"insufficient stock: {short}")
+
+
+def to_day(value):
+    """date / datetime / 'YYYY-MM-DD' -> 日序号"""
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value)
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return value.toordinal()
+
+
+def from_day(day):
+    return datetime.date.fromordinal(day).isoformat()
+
+
+def _tent_records(tents):
+    """Tent 列表 -> 可写入 JSON 的清单记录 (名称、数量与规范化后的构造参数)"""
+    return [{'name': t.name, 'quantity': t.quantity, **dict(zip(BATCH_INPUTS, t.params))} for t in tents]
+
+
+def event_bom(tents):
+    """活动所需构件 {构件: 数量}，tents 为 tent_project.parse_tents 可接受的清单"""
+    bom = tent_project.evaluate(tents).bom()
+    return {k: bom[k] for k in STOCK_FIELDS}
+
+
+class _MaxAddTree:
+    """
+    按天的多构件线段树: 区间加 (预订/取消)、区间最大值 (峰值占用)。
+    每个节点保存一个长度为构件数的 int64 向量，操作均为 O(log 天数)。
+    """
+
+    def __init__(self, days, width, usage=None):
+        import numpy as np
+
+        self.np = np
+        self.size = 1
+        self.log = 0
+        while self.size < days:
+            self.size *= 2
+            self.log += 1
+        self.d = np.zeros((2 * self.size, width), dtype=np.int64)
+        self.lz = np.zeros((self.size, width), dtype=np.int64)
+        if usage is not None:
+            # 由逐日占用自底向上建树，O(天数)
+            self.d[self.size:self.size + len(usage)] = usage
+            for k in range(self.size - 1, 0, -1):
+                np.maximum(self.d[2 * k], self.d[2 * k + 1], out=self.d[k])
+
+    def _apply(self, k, v):
+        self.d[k] += v
+        if k < self.size:
+            self.lz[k] += v
+
+    def _push(self, k):
+        v = self.lz[k]
+        if v.any():
+            self._apply(2 * k, v)
+            self._apply(2 * k + 1, v)
+            self.lz[k] = 0
+
+    def _pull(self, k):
+        # 路径上的懒标记已下推，节点值即两个子节点的最大值
+        self.np.maximum(self.d[2 * k], self.d[2 * k + 1], out=self.d[k])
+
+    def _push_path(self, l, r):
+        for i in range(self.log, 0, -1):
+            if ((l >> i) << i) != l:
+                self._push(l >> i)
+            if ((r >> i) << i) != r:
+                self._push((r - 1) >> i)
+
+    def add(self, l, r, v):
+        """[l, r) 内每天加上向量 v"""
+        if l >= r:
+            return
+        l += self.size
+        r += self.size
+        self._push_path(l, r)
+        l2, r2 = l, r
+        while l2 < r2:
+            if l2 & 1:
+                self._apply(l2, v)
+                l2 += 1
+            if r2 & 1:
+                r2 -= 1
+                self._apply(r2, v)
+            l2 >>= 1
+            r2 >>= 1
+        for i in range(1, self.log + 1):
+            if ((l >> i) << i) != l:
+                self._pull(l >> i)
+            if ((r >> i) << i) != r:
+                self._pull((r - 1) >> i)
+
+    def max(self, l, r):
+        """[l, r) 内每个构件的最大值"""
+        np = self.np
+        result = np.zeros(self.d.shape[1], dtype=np.int64)
+        if l >= r:
+            return result
+        l += self.size
+        r += self.size
+        self._push_path(l, r)
+        first = True
+        while l < r:
+            if l & 1:
+                result = self.d[l].copy() if first else np.maximum(result, self.d[l])
+                first = False
+                l += 1
+            if r & 1:
+                r -= 1
+                result = self.d[r].copy() if first else np.maximum(result, self.d[r])
+                first = False
+            l >>= 1
+            r >>= 1
+        return result
+
+
+class Availability:
+    """可用性检查结果"""
+
+    __slots__ = ('feasible', 'peak', 'required', 'stock', 'shortfall')
+
+    def __init__(self, peak, required, stock):
+        self.peak = peak
+        self.required = required
+        self.stock = stock
+        self.shortfall = {}
+        for k, need in required.items():
+            limit = stock.get(k)
+            if limit is not None and peak[k] + need > limit:
+                self.shortfall[k] = round(peak[k] + need - limit, 2)
+        self.feasible = not self.shortfall
+
+
+class Schedule:
+    """
+    库存与预订。stock 中未列出的构件视为不限量。
+    日期范围随预订自动扩展 (重建索引，均摊 O(1))。
+    """
+
+    def __init__(self, stock=None):
+        self.stock = dict(stock or {})
+        self.events = {}                # id -> {'start', 'end', 'tents' (规范化后的清单记录), 'bom'}
+        self._origin = None             # 索引第 0 天对应的日序号
+        self._tree = None
+
+    # --- 内部 / Internal ---
+
+    @staticmethod
+    def _vector(bom):
+        import numpy as np
+
+        return np.array([round(bom[k] * SCALE) for k in STOCK_FIELDS], dtype=np.int64)
+
+    def _rebuild(self, first, last):
+        """以 [first, last] 为最小覆盖范围重建索引 (两端各留余量)"""
+        import numpy as np
+
+        days = max(MIN_DAYS, 2 * (last - first + 1))
+        self._origin = first - (days - (last - first + 1)) // 2
+        diff = np.zeros((days + 1, len(STOCK_FIELDS)), dtype=np.int64)
+        for ev in self.events.values():
+            v = self._vector(ev['bom'])
+            diff[ev['start'] - self._origin] += v
+            diff[ev['end'] - self._origin + 1] -= v
+        self._tree = _MaxAddTree(days, len(STOCK_FIELDS), np.cumsum(diff[:-1], axis=0))
+
+    def _ensure(self, start, end):
+        if self._tree is None:
+            self._rebuild(start, end)
+            return
+        lo, hi = self._origin, self._origin + self._tree.size - 1
+        if start < lo or end > hi:
+            self._rebuild(min(start, lo), max(end, hi))
+
+    def _span(self, start, end):
+        start, end = to_day(start), to_day(end)
+        if end < start:
+            raise ValueError(f"end {from_day(end)} is before start {from_day(start)}")
+        return start, end
+
+    # --- 查询与预订 / Queries and bookings ---
+
+    def peak(self, start, end):
+        """[start, end] 内各构件的峰值占用 {构件: 数量}"""
+        start, end = self._span(start, end)
+        if self._tree is None:
+            return dict.fromkeys(STOCK_FIELDS, 0)
+        lo = max(start, self._origin) - self._origin
+        hi = min(end, self._origin + self._tree.size - 1) - self._origin
+        values = self._tree.max(lo, hi + 1) if lo <= hi else self._vector(dict.fromkeys(STOCK_FIELDS, 0))
+        return {k: int(v) / SCALE if k in AREA_FIELDS else int(v) // SCALE for k, v in zip(STOCK_FIELDS, values)}
+
+    def check(self, start, end, tents):
+        """新活动在 [start, end] 能否接单，返回 Availability"""
+        required = event_bom(tents)
+        return Availability(self.peak(start, end), required, self.stock)
+
+    def book(self, event_id, start, end, tents, force=False):
+        """
+        预订活动
+        :param tents: 篷房清单 (tent_project.parse_tents 可接受的记录)
+        :param force: 为 True 时即使超出库存也登记 (例如补录历史数据)
+        :raises InsufficientStock: 库存不足
+        :raises KeyError: 活动编号已存在
+        """
+        if event_id in self.events:
+            raise KeyError(f"event {event_id!r} already booked")
+        tents = tent_project.parse_tents(tents)
+        availability = self.check(start, end, tents)
+        if not availability.feasible and not force:
+            raise InsufficientStock(availability)
+        start, end = self._span(start, end)
+        self._ensure(start, end)
+        self.events[event_id] = {'start': start, 'end': end, 'tents': _tent_records(tents),
+                                 'bom': availability.required}
+        self._tree.add(start - self._origin, end - self._origin + 1, self._vector(availability.required))
+        return availability
+
+    def cancel(self, event_id):
+        ev = self.events.pop(event_id)
+        self._tree.add(ev['start'] - self._origin, ev['end'] - self._origin + 1, -self._vector(ev['bom']))
+
+    # --- 持久化 / Persistence ---
+
+    def to_dict(self):
+        return {
+            'stock': self.stock,
+            'events': [
+                {'id': eid, 'start': from_day(ev['start']), 'end': from_day(ev['end']),
+                 'tents': ev['tents'],
+                 'bom': ev['bom']}
+                for eid, ev in self.events.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        载入后一次性重建索引 (差分数组 + 自底向上建树)。
+        索引只用到文件中保存的物料清单，篷房清单在预订时已校验过，载入时原样保留不再解析
+        """
+        schedule = cls(data.get('stock'))
+        for ev in data.get('events', []):
+            schedule.events[ev['id']] = {
+                'start': to_day(ev['start']), 'end': to_day(ev['end']),
+                'tents': ev['tents'],
+                'bom': {k: ev['bom'][k] for k in STOCK_FIELDS},
+            }
+        if schedule.events:
+            schedule._rebuild(min(e['start'] for e in schedule.events.values()),
+                              max(e['end'] for e in schedule.events.values()))
+        return schedule
+
+    def save(self, path):
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+# --- 命令行 / Command line ---
+
+def _add_tent_args(parser):
+    for name, default in INPUT_DEFAULTS.items():
+        if name in REQUIRED_INPUTS:
+            parser.add_argument('--' + name, type=float, required=True)
+        else:
+            parser.add_argument('--' + name.replace('_', '-'), type=float, default=default)
+    parser.add_argument('--quantity', type=int, default=1)
+
+
+def _tents_from_args(args):
+    record = {name: getattr(args, name) for name in BATCH_INPUTS}
+    record['quantity'] = args.quantity
+    return [record]
+
+
+def _print_usage(title, values, stock=None):
+    print(title)
+    for k in STOCK_FIELDS:
+        limit = stock.get(k) if stock else None
+        suffix = f" / {limit}" if limit is not None else ''
+        print(f"  {k:<18}{values[k]:>12}{suffix}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="租赁库存排期 / Rental inventory scheduling")
+    parser.add_argument('--db', default='schedule.json', help="排期数据文件 (JSON)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('stock', help="设置库存，如 upright_support=400")
+    p.add_argument('levels', nargs='+')
+    for name in ('check', 'book'):
+        p = sub.add_parser(name, help="检查可用性" if name == 'check' else "预订活动")
+        if name == 'book':
+            p.add_argument('event_id')
+        p.add_argument('start')
+        p.add_argument('end')
+        _add_tent_args(p)
+        if name == 'book':
+            p.add_argument('--force', action='store_true', help="超出库存也登记")
+    p = sub.add_parser('peak', help="区间内各构件峰值占用")
+    p.add_argument('start')
+    p.add_argument('end')
+    p = sub.add_parser('cancel', help="取消活动")
+    p.add_argument('event_id')
+    sub.add_parser('list', help="列出活动")
+    args = parser.parse_args(argv)
+
+    schedule = Schedule.load(args.db)
+    if args.command == 'stock':
+        for item in args.levels:
+            key, _, value = item.partition('=')
+            if key not in STOCK_FIELDS:
+                parser.error(f"unknown component {key!r}; choose from {', '.join(STOCK_FIELDS)}")
+            try:
+                schedule.stock[key] = float(value) if '.' in value else int(value)
+            except ValueError:
+                print(f"❌ invalid stock level {item!r}, expected NAME=NUMBER", file=sys.stderr)
+                return 1
+        schedule.save(args.db)
+        return 0
+    try:
+        if args.command == 'peak':
+            usage = schedule.peak(args.start, args.end)
+        elif args.command == 'check':
+            availability = schedule.check(args.start, args.end, _tents_from_args(args))
+    except ValueError as e:
+        # 日期格式错误、结束早于开始或篷房参数非法
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    if args.command == 'peak':
+        _print_usage(f"peak usage {args.start} .. {args.end}", usage, schedule.stock)
+        return 0
+    if args.command == 'check':
+        _print_usage("required", availability.required)
+        _print_usage("peak booked", availability.peak, schedule.stock)
+        print("✅ feasible" if availability.feasible else f"❌ short: {availability.shortfall}")
+        return 0 if availability.feasible else 1
+    if args.command == 'book':
+        try:
+            schedule.book(args.event_id, args.start, args.end, _tents_from_args(args), force=args.force)
+        except (InsufficientStock, KeyError, ValueError) as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        schedule.save(args.db)
+        print(f"booked {args.event_id}")
+        return 0
+    if args.command == 'cancel':
+        try:
+            schedule.cancel(args.event_id)
+        except KeyError:
+            print(f"❌ unknown event {args.event_id!r}", file=sys.stderr)
+            return 1
+        schedule.save(args.db)
+        return 0
+    for eid, ev in sorted(schedule.events.items(), key=lambda kv: kv[1]['start']):
+        tents = sum(t['quantity'] for t in ev['tents'])
+        print(f"{eid:<24}{from_day(ev['start'])} .. {from_day(ev['end'])}  {tents} tents")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
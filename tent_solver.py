@@ -0,0 +1,206 @@
+"""
+反向求解: 给定剩余构件库存，求能搭建的最大篷房
+长度取单元长度的整数倍 (num_units 个单元)，宽度取山墙间隔的整数倍 (gable_bays 个间隔)。
+calculate_all 中的每个数量与面积都随 num_units、gable_bays 单调不减，因此:
+    对每个间隔数 g，可行的单元数是一个前缀 [1, n_max(g)]；
+    g 增大时 n_max(g) 只会减小 (阶梯形)。
+从 g = 1 的 n_max 出发沿阶梯走一遍 (每个台阶二分查找) 即得全部 Pareto 最优的 (长度, 宽度)，
+计算次数约为 前沿点数 × log(n_max)，而不是枚举全部组合；界面侧边栏中可实时运行。
+
+用法:
+    python tent_solver.py upright_support=40 gable_post=12 expansion_screw=800 --unit-length 5
+"""
+import argparse
+import sys
+
+from tent_core import BATCH_INPUTS, INPUT_DEFAULTS, REQUIRED_INPUTS, TentCalculator
+from tent_formulas import LENGTH_SCALE
+
+# 单元数/间隔数的搜索上限 (防止库存只限制了部分构件时无限增长)
+MAX_UNITS = 400
+MAX_BAYS = 200
+BASIC_FIELDS = ('num_units', 'area', 'perimeter')
+
+
+def _mm(x):
+    return int(round(x * 10 ** LENGTH_SCALE))
+
+
+class Solution:
+    """求解结果: Pareto 前沿 (按宽度升序) 与其中面积最大者"""
+
+    def __init__(self, front, evaluations, capped=False):
+        self.front = front              # [{'length', 'width', 'num_units', 'gable_bays', 'area', 'results'}]
+        self.evaluations = evaluations  # 调用 TentCalculator 的次数
+        self.capped = capped            # 有方案停在 MAX_UNITS / MAX_BAYS 上: 库存可能还能搭更大的篷房
+
+    @property
+    def best(self):
+        """面积最大的方案 (同面积取较长者)，无可行方案时为 None"""
+        if not self.front:
+            return None
+        return max(self.front, key=lambda p: (p['area'], p['length']))
+
+
+class _Feasibility:
+    """可行性判断 (带缓存)，统计 TentCalculator 调用次数"""
+
+    def __init__(self, stock, side_height, unit_length, gable_unit_length, holes_per_base, roof_pitch_factor,
+                 max_length=None, max_width=None):
+        outputs = set(TentCalculator.rules.compile().outputs) | set(BASIC_FIELDS)
+        unknown = [k for k in stock if k not in outputs]
+        if unknown:
+            raise KeyError(f"unknown components: {', '.join(unknown)}")
+        if unit_length <= 0 or gable_unit_length <= 0:
+            raise ValueError("unit_length and gable_unit_length must be positive")
+        self.stock = stock
+        self.fixed = (side_height, unit_length, gable_unit_length, holes_per_base, roof_pitch_factor)
+        self.unit_length = unit_length
+        self.gable_unit_length = gable_unit_length
+        # 场地上限按整数毫米整除: 3.3 米 / 1.1 米 是 3 个单元
+        site_units = None if max_length is None else _mm(max_length) // _mm(unit_length)
+        site_bays = None if max_width is None else _mm(max_width) // _mm(gable_unit_length)
+        self.max_units = MAX_UNITS if site_units is None else min(MAX_UNITS, site_units)
+        self.max_bays = MAX_BAYS if site_bays is None else min(MAX_BAYS, site_bays)
+        # 搜索上限比场地更紧时，停在上限的方案不一定是库存允许的最大尺寸
+        self.units_capped = site_units is None or site_units > MAX_UNITS
+        self.bays_capped = site_bays is None or site_bays > MAX_BAYS
+        self.evaluations = 0
+        self._memo = {}
+
+    def length(self, n):
+        """n 个单元的长度，取整到毫米 (1.1 × 3 得到 3.3 而不是 3.3000000000000003)"""
+        return n * _mm(self.unit_length) / 10 ** LENGTH_SCALE
+
+    def width(self, g):
+        """g 个山墙间隔的宽度，取整到毫米"""
+        return g * _mm(self.gable_unit_length) / 10 ** LENGTH_SCALE
+
+    def evaluate(self, n, g):
+        key = (n, g)
+        row = self._memo.get(key)
+        if row is None:
+            side_height, unit_length, gable_unit_length, holes_per_base, roof_pitch_factor = self.fixed
+            # 定点运算: 浮点下 4.2 / 0.7 这类整除会少算一个单元，库存检查就对错了物料清单
+            calc = TentCalculator(self.length(n), self.width(g), side_height, unit_length,
+                                  gable_unit_length, holes_per_base, roof_pitch_factor, arithmetic='exact')
+            row = {'num_units': calc.num_units, 'area': calc.area, 'perimeter': calc.perimeter}
+            row.update(calc.calculate_all())
+            if row['num_units'] != n:
+                # 按毫米取整的长度必须正好是 n 个单元，否则库存检查的不是前沿上报告的方案
+                raise ValueError(f"{self.length(n)}m / {unit_length}m gives {row['num_units']} units, not {n}")
+            self._memo[key] = row
+            self.evaluations += 1
+        return row
+
+    def __call__(self, n, g):
+        if n < 1 or g < 1 or n > self.max_units or g > self.max_bays:
+            return False
+        row = self.evaluate(n, g)
+        return all(row[k] <= limit for k, limit in self.stock.items())
+
+
+def _largest(feasible, low, high):
+    """单调谓词在 [low, high] 上为真的最大值 (feasible(low) 须为真)，指数扩展后二分"""
+    step = 1
+    while low + step <= high and feasible(low + step):
+        low += step
+        step *= 2
+    high = min(high, low + step - 1)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if feasible(mid):
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def solve(stock, side_height=3.0, unit_length=5.0, gable_unit_length=5.0, holes_per_base=4,
+          roof_pitch_factor=1.15, max_length=None, max_width=None):
+    """
+    求能用现有库存搭建的篷房
+    :param stock: {构件: 可用数量}，键为 calculate_all 的输出名 (或 num_units/area/perimeter)；未列出的不限
+    :param max_length: 场地长度上限 (米)，None 表示不限
+    :param max_width: 场地宽度上限 (米)，None 表示不限
+    :return: Solution，front 为 (长度, 宽度) 的 Pareto 前沿，按宽度升序
+    """
+    feasible = _Feasibility(stock, side_height, unit_length, gable_unit_length, holes_per_base, roof_pitch_factor,
+                            max_length, max_width)
+    front = []
+    if feasible(1, 1):
+        # g = 1 时的最大单元数，之后沿阶梯向右下走: g 每加 1，n 只减不增
+        n = _largest(lambda k: feasible(k, 1), 1, feasible.max_units)
+        g = 1
+        while n >= 1:
+            # 当前 n 下尽量加宽
+            g = _largest(lambda k: feasible(n, k), g, feasible.max_bays)
+            row = feasible.evaluate(n, g)
+            front.append({
+                'length': feasible.length(n),
+                'width': feasible.width(g),
+                'num_units': n,
+                'gable_bays': g,
+                'area': row['area'],
+                'results': row,
+            })
+            # 再加宽一个间隔需要减少单元数: 在 [1, n - 1] 上二分
+            g += 1
+            if not feasible(1, g):
+                break
+            low, high = 1, n - 1
+            while low < high:
+                mid = (low + high + 1) // 2
+                if feasible(mid, g):
+                    low = mid
+                else:
+                    high = mid - 1
+            n = low
+    capped = any((feasible.units_capped and p['num_units'] == MAX_UNITS)
+                 or (feasible.bays_capped and p['gable_bays'] == MAX_BAYS) for p in front)
+    return Solution(front, feasible.evaluations, capped)
+
+
+def _parse_stock(items):
+    stock = {}
+    for item in items:
+        key, sep, value = item.partition('=')
+        if not sep:
+            raise argparse.ArgumentTypeError(f"bad stock item {item!r}, expected NAME=VALUE")
+        stock[key] = float(value)
+    return stock
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="反向求解: 现有库存能搭建的最大篷房 / Largest buildable tent")
+    parser.add_argument('stock', nargs='+', help="库存，如 upright_support=40 gable_post=12 roof_canvas=800")
+    for name in BATCH_INPUTS:
+        if name not in REQUIRED_INPUTS:
+            parser.add_argument('--' + name.replace('_', '-'), type=int if name == 'holes_per_base' else float,
+                                default=INPUT_DEFAULTS[name])
+    parser.add_argument('--max-length', type=float)
+    parser.add_argument('--max-width', type=float)
+    args = parser.parse_args(argv)
+
+    try:
+        solution = solve(_parse_stock(args.stock), args.side_height, args.unit_length, args.gable_unit_length,
+                         args.holes_per_base, args.roof_pitch_factor, args.max_length, args.max_width)
+    except (KeyError, ValueError, argparse.ArgumentTypeError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    if solution.best is None:
+        print("no feasible tent")
+        return 1
+    print(f"{'length':>8}{'width':>8}{'area':>10}")
+    for p in solution.front:
+        mark = '  ← max area' if p is solution.best else ''
+        print(f"{p['length']:>8}{p['width']:>8}{p['area']:>10}{mark}")
+    if solution.capped:
+        print(f"⚠️ search limit reached ({MAX_UNITS} units / {MAX_BAYS} bays): the stock may build a larger tent, "
+              f"add more components or --max-length / --max-width", file=sys.stderr)
+    print(f"({solution.evaluations} evaluations)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+"""
+篷房参数扫描与优化
+枚举构造参数的网格 (每个参数给定范围与步长或候选值)，分块交给进程池批量计算，
+每块只保留 Pareto 前沿或前 k 名，结果边算边返回；内存占用与网格大小无关。
+
+用法:
+    python tent_sweep.py --length 10:50:1 --width 10:40:1 --unit-length 3,5 \
+        --gable-unit-length 3,5 --objective main_comp_total --objective area:max
+
+也可在 Streamlit 侧边栏的“优化”模式中使用 (见 web_app.py)。
+"""
+import argparse
+import math
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from tent_core import BATCH_INPUTS, INPUT_DEFAULTS, TentCalculator
+
+DEFAULT_CHUNK_SIZE = 65536
+# 默认目标: 在面积尽量大的前提下，主要构件、承重与膨胀螺丝数量尽量少
+DEFAULT_OBJECTIVES = (('area', 'max'), ('main_comp_total', 'min'),
+                      ('bearing_count', 'min'), ('expansion_screw', 'min'))
+
+
+class ParamGrid:
+    """
+    构造参数网格。每个参数可以是:
+        标量                固定值
+        (start, stop, step) 闭区间范围 (三元组)
+        列表                候选值
+    """
+
+    def __init__(self, **axes):
+        unknown = [k for k in axes if k not in BATCH_INPUTS]
+        if unknown:
+            raise KeyError(f"unknown parameters: {', '.join(unknown)}")
+        missing = [k for k in BATCH_INPUTS if k not in axes]
+        if missing:
+            raise KeyError(f"missing parameters: {', '.join(missing)}")
+        self.axes = {k: _axis_values(k, axes[k]) for k in BATCH_INPUTS}
+        self.shape = tuple(len(v) for v in self.axes.values())
+        self.size = math.prod(self.shape)
+
+    def columns(self, start, stop):
+        """网格中 [start, stop) 号点的列式参数 (按行优先展开，最后一个参数变化最快)"""
+        import numpy as np
+
+        flat = np.arange(start, min(stop, self.size), dtype=np.int64)
+        index = np.unravel_index(flat, self.shape)
+        cols = {k: np.asarray(v)[i] for (k, v), i in zip(self.axes.items(), index)}
+        cols['grid_index'] = flat
+        return cols
+
+
+def _axis_values(name, spec):
+    if isinstance(spec, (int, float)):
+        return (spec,)
+    if isinstance(spec, tuple) and len(spec) == 3:
+        start, stop, step = spec
+        if step <= 0 or stop < start:
+            raise ValueError(f"{name}: invalid range {spec!r}")
+        # 用 start + i*step 生成，避免累加误差；末端留 1e-9 余量以包含 stop
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        return tuple(round(start + i * step, 10) for i in range(count))
+    spec = tuple(spec)
+    if not spec:
+        raise ValueError(f"{name}: no values")
+    return spec
+
+
+def parse_objectives(objectives):
+    """把 ['main_comp_total', 'area:max'] 或 [(名称, 'min'/'max')] 规范为元组列表"""
+    parsed = []
+    for obj in objectives:
+        if isinstance(obj, str):
+            name, _, sense = obj.partition(':')
+            obj = (name, sense or 'min')
+        name, sense = obj
+        if sense not in ('min', 'max'):
+            raise ValueError(f"objective {name}: sense must be 'min' or 'max'")
+        parsed.append((name, sense))
+    if not parsed:
+        raise ValueError("at least one objective is required")
+    return tuple(parsed)
+
+
+# --- 归约 / Reductions ---
+
+def _score_matrix(np, cols, objectives):
+    """目标矩阵 (全部转为越小越好)"""
+    return np.column_stack([
+        -np.asarray(cols[n], dtype=np.float64) if s == 'max' else np.asarray(cols[n], dtype=np.float64)
+        for n, s in objectives
+    ])
+
+
+def _take(cols, idx):
+    return {k: v[idx] for k, v in cols.items()}
+
+
+def _concat(np, parts):
+    parts = [p for p in parts if p is not None]
+    if not parts:
+        return None
+    return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+
+def _dominated(np, by, points):
+    """points 中每个点是否被 by 中某个点严格支配 (所有目标不差且至少一个更好)"""
+    le = (by[:, None, :] <= points[None, :, :]).all(axis=2)
+    lt = (by[:, None, :] < points[None, :, :]).any(axis=2)
+    return (le & lt).any(axis=0)
+
+
+def pareto_front(cols, objectives, block=1024):
+    """
+    Pareto 前沿 (非支配解)。目标值完全相同的点只保留网格序号最小的一个。
+    按目标字典序排序后，后面的点不可能严格支配前面的点，因此只需分块与已有前沿比较。
+    """
+    import numpy as np
+
+    if cols is None or len(cols['grid_index']) == 0:
+        return cols
+    scores = _score_matrix(np, cols, objectives)
+    # 按目标字典序排序，同分时网格序号小者在前
+    keys = (cols['grid_index'],) + tuple(scores[:, j] for j in range(scores.shape[1] - 1, -1, -1))
+    order = np.lexsort(keys)
+    scores = scores[order]
+    first = np.ones(len(scores), dtype=bool)
+    first[1:] = (scores[1:] != scores[:-1]).any(axis=1)
+    scores = scores[first]
+    order = order[first]
+
+    front = np.empty((0, scores.shape[1]))
+    kept = []
+    for s in range(0, len(scores), block):
+        idx = np.arange(s, min(s + block, len(scores)))
+        # 先剔除被已有前沿支配的点，块内两两比较只在剩余点之间进行
+        if len(front):
+            idx = idx[~_dominated(np, front, scores[idx])]
+        cand = scores[idx]
+        idx = idx[~_dominated(np, cand, cand)]
+        front = np.vstack([front, scores[idx]])
+        kept.append(idx)
+    return _take(cols, order[np.concatenate(kept)])
+
+
+def top_k(cols, objectives, k):
+    """按目标字典序取前 k 名，同分时网格序号小者优先"""
+    import numpy as np
+
+    if cols is None or len(cols['grid_index']) == 0:
+        return cols
+    scores = _score_matrix(np, cols, objectives)
+    keys = (cols['grid_index'],) + tuple(scores[:, j] for j in range(scores.shape[1] - 1, -1, -1))
+    return _take(cols, np.lexsort(keys)[:k])
+
+
+def _apply_limits(np, cols, limits):
+    if not limits:
+        return cols
+    mask = np.ones(len(cols['grid_index']), dtype=bool)
+    for name, (low, high) in limits.items():
+        values = cols[name]
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+    return _take(cols, mask)
+
+
+def evaluate_chunk(grid, start, stop, objectives, k=None, limits=None, arithmetic='float', charts=None):
+    """
+    计算网格的一块并归约 (进程池任务)
+    :param k: None 表示保留 Pareto 前沿，否则保留前 k 名
+    :param limits: {列名: (下限, 上限)} 过滤条件，None 表示不限
+    :param arithmetic: 'float' 或 'exact' (定点运算，见 TentCalculator)
+    :param charts: 空的 tent_charts.Aggregates；给出时返回 (归约结果, 本块的聚合)
+    """
+    import numpy as np
+
+    params = grid.columns(start, stop)
+    results = TentCalculator.calculate_batch(params, arithmetic)
+    cols = dict(params)
+    cols.update(results)
+    cols = _apply_limits(np, cols, limits)
+    best = pareto_front(cols, objectives) if k is None else top_k(cols, objectives, k)
+    return best if charts is None else (best, charts.aggregate(cols))
+
+
+class SweepUpdate:
+    """扫描进度: 已完成点数、总点数、当前最优结果 (列式字典) 与已合并的图表聚合"""
+
+    __slots__ = ('done', 'total', 'best', 'charts')
+
+    def __init__(self, done, total, best, charts=None):
+        self.done = done
+        self.total = total
+        self.best = best
+        self.charts = charts
+
+    @property
+    def fraction(self):
+        return self.done / self.total if self.total else 1.0
+
+
+def sweep(grid, objectives=DEFAULT_OBJECTIVES, k=None, limits=None,
+          workers=None, chunk_size=DEFAULT_CHUNK_SIZE, arithmetic='float', charts=None):
+    """
+    执行扫描，每完成一块产出一次 SweepUpdate。
+    :param workers: 进程数，默认 CPU 核数；1 表示在当前进程内计算
+    :param charts: 空的 tent_charts.Aggregates (如 Aggregates.for_grid(grid))；给出时每块在工作进程内聚合全部方案，
+                   只把聚合结果传回，合并后放在 SweepUpdate.charts 中
+    """
+    import numpy as np
+
+    objectives = parse_objectives(objectives)
+    reduce = (lambda c: pareto_front(c, objectives)) if k is None else (lambda c: top_k(c, objectives, k))
+    starts = range(0, grid.size, chunk_size)
+    best = None
+    merged = charts.empty() if charts is not None else None
+    done = 0
+
+    def collect(part):
+        nonlocal best
+        if charts is not None:
+            part, aggregates = part
+            merged.merge(aggregates)
+        best = reduce(_concat(np, [best, part]))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(starts) <= 1:
+        for s in starts:
+            collect(evaluate_chunk(grid, s, s + chunk_size, objectives, k, limits, arithmetic, charts))
+            done = min(s + chunk_size, grid.size)
+            yield SweepUpdate(done, grid.size, best, merged)
+        return
+
+    import multiprocessing
+
+    # 同时在途的块数受限，避免一次性提交全部任务占满内存
+    max_pending = workers * 2
+    pending = {}
+    next_start = iter(starts)
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        def submit():
+            s = next(next_start, None)
+            if s is not None:
+                fut = pool.submit(evaluate_chunk, grid, s, s + chunk_size, objectives, k, limits, arithmetic, charts)
+                pending[fut] = min(s + chunk_size, grid.size) - s
+
+        for _ in range(max_pending):
+            submit()
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                done += pending.pop(fut)
+                collect(fut.result())
+                submit()
+            yield SweepUpdate(done, grid.size, best, merged)
+
+
+def run(grid, **kwargs):
+    """执行扫描并只返回最终结果"""
+    update = None
+    for update in sweep(grid, **kwargs):
+        pass
+    return update.best if update is not None else None
+
+
+# --- 命令行 / Command line ---
+
+def _parse_axis(text):
+    """'10:50:1' -> 范围，'3,5' -> 候选值，'4' -> 固定值"""
+    if ':' in text:
+        start, stop, step = (float(x) for x in text.split(':'))
+        return (start, stop, step)
+    values = [float(x) for x in text.split(',')]
+    return values[0] if len(values) == 1 else values
+
+
+def main(argv=None):
+    import csv
+
+    parser = argparse.ArgumentParser(description="篷房参数扫描 / Tent design-space sweep")
+    for name in BATCH_INPUTS:
+        parser.add_argument('--' + name.replace('_', '-'), default=f"{INPUT_DEFAULTS[name]:g}",
+                            help="固定值、'起:止:步长' 范围或逗号分隔的候选值")
+    parser.add_argument('--objective', action='append',
+                        help="目标列，'名称' 表示越小越好，'名称:max' 表示越大越好 (可重复)")
+    parser.add_argument('--top-k', type=int, help="只保留前 k 名 (默认输出 Pareto 前沿)")
+    parser.add_argument('--workers', type=int, help="进程数 (默认 CPU 核数)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--exact', action='store_true', help="使用整数毫米定点运算")
+    args = parser.parse_args(argv)
+
+    grid = ParamGrid(**{n: _parse_axis(getattr(args, n)) for n in BATCH_INPUTS})
+    objectives = parse_objectives(args.objective or DEFAULT_OBJECTIVES)
+    best = None
+    arithmetic = 'exact' if args.exact else 'float'
+    for update in sweep(grid, objectives, k=args.top_k, workers=args.workers, chunk_size=args.chunk_size,
+                        arithmetic=arithmetic):
+        print(f"\r{update.done}/{update.total} ({update.fraction:.0%})", end='', file=sys.stderr)
+        best = update.best
+    print(file=sys.stderr)
+
+    writer = csv.writer(sys.stdout, lineterminator='\n')
+    columns = list(BATCH_INPUTS) + [n for n, _ in objectives if n not in BATCH_INPUTS]
+    writer.writerow(columns)
+    if best is not None:
+        for i in range(len(best['grid_index'])):
+            writer.writerow([best[c][i].item() for c in columns])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
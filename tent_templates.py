@@ -0,0 +1,203 @@
+"""
+按语言预编译的明细表与文本报告模板
+明细表的分组、条目名称、单位、说明以及图表标签在同一种语言下都是固定的，只有数值随参数变化。
+模板在某种语言第一次用到时由 TRANSLATIONS 生成一次并缓存，之后每次重跑只需按固定顺序取出数值；
+TRANSLATIONS 中新增一种语言，明细表、图表与配件计算报告都自动可用，运行时没有额外开销。
+"""
+from functools import lru_cache
+
+from tent_core import TRANSLATIONS
+
+# 语言代码 (命令行与文本报告使用) -> TRANSLATIONS 中的语言名
+LANG_CODES = {'zh': '中文', 'en': 'English'}
+
+# 明细行: (分组, 条目名称键, 结果键, 单位键, 说明键)；单位键为 None 的是是/否标志
+DETAIL_ROWS = (
+    # Sec 1: Basic
+    ('sec_basic', 'num_units', 'num_units', 'unit_sets', 'desc_num_units'),
+    ('sec_basic', 'tent_area', 'area', 'unit_area', 'desc_area'),
+    ('sec_basic', 'perimeter', 'perimeter', 'unit_m', 'desc_perimeter'),
+    # Sec 2: Structure
+    ('sec_struct', 'gable_post', 'gable_post', 'unit_pcs', 'desc_gable_post'),
+    ('sec_struct', 'gable_mid_post', 'has_mid_post', None, 'desc_gable_mid'),
+    ('sec_struct', 'upright_support', 'upright_support', 'unit_pcs', 'desc_upright'),
+    # Sec 3: Connections & Anchoring
+    ('sec_conn', 'roof_beam', 'roof_beam', 'unit_sets', 'desc_roof_beam'),
+    ('sec_conn', 'ridge_conn', 'ridge_conn', 'unit_pcs', 'desc_ridge_conn'),
+    ('sec_conn', 'eave_conn', 'eave_conn', 'unit_pcs', 'desc_eave_conn'),
+    ('sec_conn', 'bearing_count', 'bearing_count', 'unit_pcs', 'desc_bearing'),
+    ('sec_conn', 'expansion_screw', 'expansion_screw', 'unit_pcs', 'desc_expansion_screw'),
+    ('sec_conn', 'drilling_steel', 'drilling_steel', 'unit_pcs', 'desc_drilling_steel'),
+    # Sec 4: Cover & Decoration
+    ('sec_cover', 'roof_canvas', 'roof_canvas', 'unit_area', 'desc_roof_canvas'),
+    ('sec_cover', 'roof_liner', 'roof_liner', 'unit_area', 'desc_roof_liner'),
+    ('sec_cover', 'roof_cover', 'roof_cover', 'unit_area', 'desc_roof_cover'),
+    ('sec_cover', 'glass_wall_m', 'glass_wall_m', 'unit_m', 'desc_glass_m'),
+    ('sec_cover', 'glass_wall_sqm', 'glass_wall_sqm', 'unit_area', 'desc_glass_sqm'),
+    ('sec_cover', 'basic_lighting', 'basic_lighting', 'unit_pcs', 'desc_basic_lighting'),
+    ('sec_cover', 'roof_stretcher', 'roof_stretcher', 'unit_pcs', 'desc_roof_stretcher'),
+)
+# 两张单顶图表的条目: (条目名称键, 结果键)
+AREA_CHART_ITEMS = (('tent_area', 'area'), ('roof_canvas', 'roof_canvas'), ('roof_liner', 'roof_liner'),
+                    ('roof_cover', 'roof_cover'), ('glass_wall_sqm', 'glass_wall_sqm'))
+COUNT_CHART_ITEMS = tuple((k, k) for k in ('upright_support', 'gable_post', 'roof_beam', 'ridge_conn', 'eave_conn',
+                                           'expansion_screw', 'drilling_steel', 'basic_lighting', 'roof_stretcher'))
+FLAG_VALUES = ("❌ NO", "✅ YES")
+
+# 配件计算报告的行: (结果键, 名称键, 单位键, 说明键)
+ACCESSORY_ROWS = (
+    ('roof_canvas', 'acc_roof_canvas', 'acc_unit_area', 'acc_desc_roof_canvas'),
+    ('roof_liner', 'acc_roof_liner', 'acc_unit_area', 'acc_desc_roof_liner'),
+    ('side_canvas', 'acc_side_canvas', 'acc_unit_area', 'acc_desc_side_canvas'),
+    ('side_liner', 'acc_side_liner', 'acc_unit_area', 'acc_desc_side_liner'),
+    ('lighting', 'acc_lighting', 'acc_unit_sets', 'acc_desc_lighting'),
+    ('anchoring', 'acc_anchoring', 'acc_unit_pcs', 'acc_desc_anchoring'),
+    ('flooring', 'acc_flooring', 'acc_unit_area', 'acc_desc_flooring'),
+    ('glass_wall', 'acc_glass_wall', 'acc_unit_area', 'acc_desc_glass_wall'),
+)
+
+# 主体结构文本报告的行: (结果键, 名称键)，顺序同命令行 --rules core 的输出列
+CORE_REPORT_ROWS = (
+    ('num_units', 'num_units'), ('area', 'tent_area'), ('perimeter', 'perimeter'),
+    ('upright_support', 'upright_support'), ('gable_post', 'gable_post'), ('has_mid_post', 'gable_mid_post'),
+    ('roof_beam', 'roof_beam'), ('ridge_conn', 'ridge_conn'), ('eave_conn', 'eave_conn'),
+    ('bearing_count', 'bearing_count'), ('main_comp_total', 'main_comp_total'),
+    ('expansion_screw', 'expansion_screw'), ('drilling_steel', 'drilling_steel'), ('roof_canvas', 'roof_canvas'),
+    ('roof_liner', 'roof_liner'), ('glass_wall_m', 'glass_wall_m'), ('glass_wall_sqm', 'glass_wall_sqm'),
+    ('roof_cover', 'roof_cover'), ('basic_lighting', 'basic_lighting'), ('roof_stretcher', 'roof_stretcher'),
+)
+
+
+def language(lang):
+    """
+    规范化语言: TRANSLATIONS 中的语言名原样返回，'zh' / 'en' 换成语言名；
+    其他代码与原文本报告一样按英文处理
+    """
+    if lang in TRANSLATIONS:
+        return lang
+    return LANG_CODES.get(lang, LANG_CODES['en'])
+
+
+def _literal(text):
+    # 翻译文本放进格式串前转义花括号
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+class DetailTemplate:
+    """一种语言的明细表模板: 各列的固定内容、数值格式串与图表标签"""
+
+    __slots__ = ('lang', 't', 'items', 'sections', 'labels', 'units', 'descriptions', 'columns', 'value_formats',
+                 'flag_row', 'area_items', 'area_labels', 'count_items', 'count_labels')
+
+    def __init__(self, lang):
+        t = TRANSLATIONS[lang]
+        self.lang = lang
+        self.t = t
+        self.items = tuple(key for _, _, key, _, _ in DETAIL_ROWS)
+        self.sections = tuple(t[section] for section, _, _, _, _ in DETAIL_ROWS)
+        self.labels = tuple(t[item] for _, item, _, _, _ in DETAIL_ROWS)
+        self.units = tuple(t[unit] if unit else '' for _, _, _, unit, _ in DETAIL_ROWS)
+        self.descriptions = tuple(t[desc] for _, _, _, _, desc in DETAIL_ROWS)
+        # 界面表格的列名与每行数值的显示格式 ("{} ㎡")；是/否标志单独显示
+        self.columns = ("Category", t['col_item'], t['col_value'], t['col_desc'])
+        self.value_formats = tuple('{} ' + _literal(unit) for unit in self.units)
+        self.flag_row = self.items.index('has_mid_post')
+        self.area_items = tuple(key for _, key in AREA_CHART_ITEMS)
+        self.area_labels = tuple(t[item] for item, _ in AREA_CHART_ITEMS)
+        self.count_items = tuple(key for _, key in COUNT_CHART_ITEMS)
+        self.count_labels = tuple(t[item] for item, _ in COUNT_CHART_ITEMS)
+
+    def values(self, res, items=None):
+        """按模板顺序取出数值"""
+        return [res[k] for k in items or self.items]
+
+    def detail(self, res, quote=None):
+        """
+        带类型的明细列 (数值与单位分开，见 tent_export.DETAIL_FIELDS)
+        :param quote: tent_pricing.Quote，给出时附加单价、金额两列与报价合计行
+        """
+        t = self.t
+        columns = {
+            'section': list(self.sections),
+            'item': list(self.items),
+            'label': list(self.labels),
+            'value': self.values(res),
+            'unit': list(self.units),
+            'description': list(self.descriptions),
+        }
+        if quote is not None:
+            lines = [quote.lines.get(k) for k in self.items]
+            columns['unit_price'] = [line[2] if line else None for line in lines]
+            columns['amount'] = [line[3] if line else None for line in lines]
+            for name, value in (('section', t['sec_quote']), ('item', 'quote_total'), ('label', t['quote_total']),
+                                ('value', quote.total), ('unit', quote.currency), ('description', ''),
+                                ('unit_price', None), ('amount', quote.total)):
+                columns[name].append(value)
+        return columns
+
+    def table(self, pd, detail):
+        """界面表格: 固定列直接取自模板，只有数值列随结果格式化"""
+        values = detail['value']
+        shown = [fmt.format(v) for fmt, v in zip(self.value_formats, values)]
+        shown[self.flag_row] = FLAG_VALUES[bool(values[self.flag_row])]
+        if len(values) > len(self.items):
+            # 报价合计行
+            shown.append(f"{values[-1]:,.2f} {detail['unit'][-1]}")
+        category, item, value, desc = self.columns
+        data = {category: detail['section'], item: detail['label'], value: shown, desc: detail['description']}
+        if 'amount' in detail:
+            currency = detail['unit'][-1]
+            data[f"{self.t['col_unit_price']} ({currency})"] = detail['unit_price']
+            data[f"{self.t['col_amount']} ({currency})"] = detail['amount']
+        return pd.DataFrame(data)
+
+
+class ReportTemplate:
+    """配件计算文本报告: 整份报告预编译为一个格式串，输出时只填入尺寸与各项数值"""
+
+    __slots__ = ('lang', 'items', 'format_string')
+
+    def __init__(self, lang):
+        t = TRANSLATIONS[lang]
+        self.lang = lang
+        self.items = tuple(key for key, _, _, _ in ACCESSORY_ROWS)
+        lines = ['', t['acc_title'], '=' * 40]
+        for i, (_, label, unit, desc) in enumerate(ACCESSORY_ROWS):
+            lines.append(f"{i + 1}. {_literal(t[label])}: {{{i}}}{_literal(t[unit])} {_literal(t[desc])}")
+        self.format_string = '\n'.join(lines + [''])
+
+    def format(self, width, length, results):
+        return self.format_string.format(*[results[k] for k in self.items], width=width, length=length)
+
+
+class CoreReportTemplate(ReportTemplate):
+    """主体结构文本报告 (tent_cli.py --rules core)，同样整份预编译为一个格式串"""
+
+    __slots__ = ()
+
+    def __init__(self, lang):
+        t = TRANSLATIONS[lang]
+        self.lang = lang
+        self.items = tuple(key for key, _ in CORE_REPORT_ROWS)
+        lines = ['', t['core_title'], '=' * 40]
+        for i, (_, label) in enumerate(CORE_REPORT_ROWS):
+            lines.append(f"{i + 1}. {_literal(t[label])}: {{{i}}}")
+        self.format_string = '\n'.join(lines) + '\n'
+
+
+@lru_cache(maxsize=None)
+def detail_template(lang):
+    """某种语言的明细表模板 (每种语言只生成一次)"""
+    return DetailTemplate(language(lang))
+
+
+@lru_cache(maxsize=None)
+def report_template(lang):
+    """某种语言的配件计算报告模板 (lang 可为 'zh' / 'en' 或语言名)"""
+    return ReportTemplate(language(lang))
+
+
+@lru_cache(maxsize=None)
+def core_report_template(lang):
+    """某种语言的主体结构报告模板 (lang 可为 'zh' / 'en' 或语言名)"""
+    return CoreReportTemplate(language(lang))
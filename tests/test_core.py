@@ -0,0 +1,95 @@
+"""
+核心计算的回归测试: 导入不加载界面依赖，逐个计算与公式引擎之前的手写实现 (bench.py 中的参照实现) 一致，
+批量计算与逐个计算逐元素一致 (类型与 round(x, 2) 的舍入方向都要相同)
+"""
+import random
+import subprocess
+import sys
+
+import pytest
+
+import bench
+from tent_core import BATCH_INPUTS, AccessoryCalculator, TentCalculator
+
+SEED = 20240601
+
+
+def _core_params(rng):
+    # 0.1 米步长的尺寸覆盖浮点误差与 2.675 这类舍入边界
+    return (rng.randint(10, 800) / 10, rng.randint(10, 500) / 10, rng.choice([2.5, 3.0, 3.5, 4.0]),
+            rng.choice([3.0, 5.0, rng.randint(5, 60) / 10]), rng.choice([3.0, 5.0, rng.randint(5, 60) / 10]),
+            rng.randint(1, 8), rng.choice([1.1, 1.15, 1.2, rng.randint(100, 130) / 100]))
+
+
+def _accessory_params(rng):
+    return (rng.choice([rng.randint(1, 80), rng.randint(10, 800) / 10]), rng.randint(1, 50),
+            rng.choice([3, 2.5, rng.randint(20, 60) / 10]), rng.choice([3, 5, 2.5]))
+
+
+def _same(a, b):
+    return type(a) is type(b) and a == b
+
+
+def test_import_does_not_load_ui_libraries():
+    code = ("import sys, tent_core; "
+            "print(','.join(m for m in ('streamlit', 'pandas', 'altair') if m in sys.modules))")
+    out = subprocess.run([sys.executable, '-c', code], cwd=bench.HERE, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ''
+
+
+def test_scalar_matches_reference():
+    rng = random.Random(SEED)
+    for _ in range(2000):
+        params = _core_params(rng)
+        expected = bench._ReferenceCore(*params).calculate_all()
+        calc = TentCalculator(*params)
+        results = dict(calc.calculate_all())
+        assert list(results) == list(expected)
+        assert all(_same(results[k], expected[k]) for k in expected), params
+        ref = bench._ReferenceCore(*params)
+        assert (calc.num_units, calc.area, calc.perimeter) == (ref.num_units, ref.area, ref.perimeter)
+
+
+def test_accessory_matches_reference():
+    rng = random.Random(SEED)
+    for _ in range(2000):
+        params = _accessory_params(rng)
+        expected = bench._ReferenceAccessory(*params).calculate_values()
+        results = AccessoryCalculator(*params).calculate_values()
+        assert list(results) == list(expected)
+        assert all(_same(results[k], expected[k]) for k in expected), params
+
+
+@pytest.mark.parametrize('arithmetic', ['float', 'exact'])
+def test_batch_matches_scalar(arithmetic):
+    rng = random.Random(SEED)
+    specs = [_core_params(rng) for _ in range(2000)]
+    batch = TentCalculator.calculate_batch({k: [s[i] for s in specs] for i, k in enumerate(BATCH_INPUTS)},
+                                           arithmetic)
+    for row, params in enumerate(specs):
+        calc = TentCalculator(*params, arithmetic=arithmetic)
+        expected = dict(calc.calculate_all(), num_units=calc.num_units, area=calc.area, perimeter=calc.perimeter)
+        for name, value in expected.items():
+            assert batch[name][row].item() == value, (name, params)
+
+
+def test_accessory_batch_matches_scalar():
+    rng = random.Random(SEED)
+    specs = [_accessory_params(rng) for _ in range(2000)]
+    names = ('length', 'width', 'side_height', 'unit_length')
+    batch = AccessoryCalculator.calculate_batch({k: [s[i] for s in specs] for i, k in enumerate(names)})
+    for row, params in enumerate(specs):
+        for name, value in AccessoryCalculator(*params).calculate_values().items():
+            assert batch[name][row].item() == value, (name, params)
+
+
+def test_update_matches_fresh_calculation():
+    rng = random.Random(SEED)
+    for _ in range(500):
+        params = _core_params(rng)
+        calc = TentCalculator(*params)
+        changed = _core_params(rng)
+        changes = {k: changed[i] for i, k in enumerate(BATCH_INPUTS) if rng.random() < 0.3}
+        calc.update(**changes)
+        fresh = TentCalculator(**dict(zip(BATCH_INPUTS, params), **changes))
+        assert dict(calc.calculate_all()) == dict(fresh.calculate_all())
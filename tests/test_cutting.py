@@ -0,0 +1,60 @@
+"""下料: 启发式与分支定界的方案合法，分支定界的根数与穷举得到的最少根数一致"""
+import random
+from collections import Counter
+
+import tent_cutting
+
+SEED = 20240601
+
+
+def _brute_force(pieces, stock):
+    """穷举每段放进哪一根 (已开的根或新开一根)，返回最少根数"""
+    best = [len(pieces)]
+
+    def place(i, free):
+        if len(free) >= best[0]:
+            return
+        if i == len(pieces):
+            best[0] = len(free)
+            return
+        for k in range(len(free)):
+            if free[k] >= pieces[i]:
+                free[k] -= pieces[i]
+                place(i + 1, free)
+                free[k] += pieces[i]
+        place(i + 1, free + [stock - pieces[i]])
+
+    place(0, [])
+    return best[0]
+
+
+def _valid(bins, pieces, stock):
+    return all(sum(b) <= stock for b in bins) and Counter(p for b in bins for p in b) == Counter(pieces)
+
+
+def test_exact_matches_brute_force():
+    rng = random.Random(SEED)
+    stock = 6000
+    for _ in range(300):
+        pieces = [rng.choice([rng.randint(500, 6000), rng.choice([1500, 2000, 3000, 4500])])
+                  for _ in range(rng.randint(1, 9))]
+        bins, optimal = tent_cutting.exact(pieces, stock)
+        assert optimal
+        assert _valid(bins, pieces, stock)
+        assert len(bins) == _brute_force(sorted(pieces, reverse=True), stock), pieces
+
+
+def test_best_fit_decreasing_is_valid():
+    rng = random.Random(SEED)
+    stock = 50000
+    for _ in range(200):
+        pieces = [rng.randint(100, stock) for _ in range(rng.randint(1, 60))]
+        bins = tent_cutting.best_fit_decreasing(pieces, stock)
+        assert _valid(bins, pieces, stock)
+        assert len(bins) >= -(-sum(pieces) // stock)
+
+
+def test_plan_covers_net_material():
+    plan = tent_cutting.plan(25, 20, 3, 5, 5, 4, 1.15)
+    for material in plan.materials.values():
+        assert material.purchased >= material.net
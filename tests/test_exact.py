@@ -0,0 +1,54 @@
+"""
+定点运算 (arithmetic='exact') 与十进制参照实现对比: 尺寸按毫米、系数按 1/10000 精确计算，
+单元数量整除、面积只在最后四舍六入五成双一次
+"""
+import random
+from decimal import ROUND_HALF_EVEN, Decimal
+
+from tent_core import TentCalculator
+
+SEED = 20240601
+CENT = Decimal('0.01')
+
+
+def _reference(length, width, side_height, unit_length, gable_unit_length, holes_per_base, roof_pitch_factor):
+    L, W, H, U, G, P = (Decimal(str(v)) for v in (length, width, side_height, unit_length, gable_unit_length,
+                                                  roof_pitch_factor))
+    n = int(L // U)
+    g = int(W // G)
+    perimeter = (L + W) * 2
+    upright = (n + 1) * 2
+    gable_post = max(0, (g - 1) * 2)
+    bearing = upright + gable_post
+    canvas = (L * W * P).quantize(CENT, ROUND_HALF_EVEN)
+    glass_sqm = (perimeter * H).quantize(CENT, ROUND_HALF_EVEN)
+    return {
+        'upright_support': upright, 'gable_post': gable_post, 'has_mid_post': g % 2 == 0 and g > 0,
+        'roof_beam': n + 1, 'ridge_conn': n + 1, 'eave_conn': (n + 1) * 2, 'bearing_count': bearing,
+        'main_comp_total': bearing + n + 1, 'expansion_screw': bearing * holes_per_base,
+        'drilling_steel': bearing * holes_per_base, 'roof_canvas': float(canvas), 'roof_liner': float(canvas),
+        'glass_wall_m': float(perimeter.quantize(CENT, ROUND_HALF_EVEN)), 'glass_wall_sqm': float(glass_sqm),
+        'roof_cover': float(canvas * 2 + glass_sqm), 'basic_lighting': max(0, (n - 1) * 2), 'roof_stretcher': n * 2,
+    }
+
+
+def test_exact_matches_decimal_reference():
+    rng = random.Random(SEED)
+    for _ in range(5000):
+        params = (rng.randint(3, 600) / 10, rng.randint(3, 400) / 10, rng.choice([2.5, 3.0, 3.5]),
+                  rng.choice([0.3, 0.9, 1.1, 3.0, 5.0]), rng.choice([0.3, 0.7, 3.0, 5.0]), rng.randint(1, 8),
+                  rng.choice([1.1, 1.15, 1.2, 1.05]))
+        results = dict(TentCalculator(*params, arithmetic='exact').calculate_all())
+        assert results == _reference(*params), params
+
+
+def test_exact_keeps_units_lost_to_float_error():
+    # 3.3 / 1.1 在浮点下是 2.9999999999999996
+    assert TentCalculator(3.3, 10, 3, 1.1, 5, 4, 1.15).num_units == 2
+    assert TentCalculator(3.3, 10, 3, 1.1, 5, 4, 1.15, arithmetic='exact').num_units == 3
+
+
+def test_exact_parses_strings_exactly():
+    calc = TentCalculator('4.2', '10', '3', '0.7', '5', 4, '1.15', arithmetic='exact')
+    assert calc.num_units == 6
+    assert calc.calculate_all()['roof_canvas'] == 48.3
@@ -0,0 +1,31 @@
+"""项目清单: 非整数的数量与孔数按行报错，不悄悄截断"""
+import pytest
+
+import tent_project
+from tent_cli import CORE_SPEC_FIELDS, CoreSpec, parse_spec
+from tent_core import INPUT_DEFAULTS, spec_key
+
+
+def test_defaults_fill_optional_inputs():
+    (tent,) = tent_project.parse_tents([{'length': '20', 'width': '10'}])
+    assert tent.params == spec_key(**{**INPUT_DEFAULTS, 'length': 20, 'width': 10})
+    assert tent.quantity == 1
+
+
+@pytest.mark.parametrize('quantity', ['1.5', '-1', 'inf', 'nan', 'x'])
+def test_bad_quantity_is_rejected(quantity):
+    with pytest.raises(ValueError, match='row 2'):
+        tent_project.parse_tents([{'length': 20, 'width': 10}, {'length': 20, 'width': 10, 'quantity': quantity}])
+
+
+def test_integral_quantity_is_accepted():
+    tents = tent_project.parse_tents([{'length': 20, 'width': 10, 'quantity': '2.0'},
+                                      {'length': 20, 'width': 10, 'quantity': 0}])
+    assert [t.quantity for t in tents] == [2]
+
+
+def test_core_spec_rejects_fractional_holes():
+    with pytest.raises(ValueError, match='holes_per_base'):
+        CoreSpec(parse_spec({'length': '20', 'width': '10', 'holes_per_base': '4.5'}, CORE_SPEC_FIELDS))
+    spec = CoreSpec(parse_spec({'length': '20', 'width': '10', 'holes_per_base': '4.0'}, CORE_SPEC_FIELDS))
+    assert spec.holes_per_base == 4
@@ -0,0 +1,18 @@
+"""反向求解: 前沿上的方案按定点运算验证库存，停在搜索上限时给出提示"""
+import tent_solver
+from tent_core import TentCalculator
+
+
+def test_front_is_checked_with_exact_arithmetic():
+    # 3.3 米 / 1.1 米: 浮点下只有 2 个单元，求解器与采用该尺寸后的重算都是 3 个
+    best = tent_solver.solve({'roof_beam': 4}, unit_length=1.1, max_width=5).best
+    assert (best['length'], best['num_units']) == (3.3, 3)
+    calc = TentCalculator(best['length'], best['width'], 3.0, 1.1, 5.0, 4, 1.15, arithmetic='exact')
+    expected = dict(calc.calculate_all())
+    assert {k: best['results'][k] for k in expected} == expected
+
+
+def test_search_limit_is_reported():
+    assert tent_solver.solve({'expansion_screw': 10 ** 6}).capped
+    assert not tent_solver.solve({'expansion_screw': 10 ** 6}, max_length=100, max_width=100).capped
+    assert not tent_solver.solve({'area': 1000}).capped
@@ -1,277 +1,553 @@
 import sys
 import os
 import subprocess
-import math
+from types import SimpleNamespace
 
-# 尝试导入依赖库，如果失败则提示安装
-try:
+from tent_cache import shared_cache
+from tent_catalog import calculate as catalog_calculate, default_catalog
+from tent_core import TRANSLATIONS, BATCH_INPUTS, INPUT_DEFAULTS, TentCalculator, spec_key
+import tent_metrics
+from tent_metrics import span
+from tent_pricing import default_price_list
+from tent_templates import detail_template
+import tent_export
+
+
+def _import_ui_libs():
+    """按需导入界面依赖，仅在 UI 路径上加载；失败则提示安装"""
+    try:
+        import streamlit as st
+        import pandas as pd
+        import altair as alt
+    except ImportError as e:
+        print(f"\n❌ 错误: 缺少必要的库 ({e})")
+        print("请运行以下命令安装:")
+        print(f"{sys.executable} -m pip install 'streamlit>=1.65' numpy pandas altair")
+        sys.exit(1)
+    return st, pd, alt
+
+
+def _result_cache():
+    """进程级数值结果缓存 (与语言无关)，容量由环境变量 TENT_CACHE_SIZE 配置 (0 = 禁用)"""
+    return shared_cache('web_app.results')
+
+
+def _view_cache():
+    """进程级本地化视图缓存，按 (参数, 语言) 保存明细表、图表与 CSV"""
+    return shared_cache('web_app.views')
+
+
+def _fragments_enabled():
+    """环境变量 TENT_FRAGMENTS=0 时关闭局部刷新，各面板随整页重跑 (用于对比测试)"""
+    return os.environ.get('TENT_FRAGMENTS', '1') != '0'
+
+
+def _debug_configured():
+    """部署时由环境变量 TENT_DEBUG=1 开启调试 (运维配置，不受页面访客控制)"""
+    return os.environ.get('TENT_DEBUG', '0') not in ('', '0')
+
+
+def _debug_enabled(st):
+    """调试面板: 环境变量 TENT_DEBUG=1 或页面地址带 ?debug=1 时显示"""
+    if _debug_configured():
+        return True
+    return st.query_params.get('debug') == '1'
+
+
+def _panel(st, func):
+    """把面板函数包装为 Streamlit fragment，使其只在自身控件变化时单独重跑"""
+    name = 'panel:' + func.__name__.strip('_').replace('_panel', '')
+
+    def timed(*args, **kwargs):
+        # fragment 单独重跑时不经过 main()，在这里按当前会话重新判断是否计时
+        with tent_metrics.scoped(_debug_enabled(st)), span(name):
+            return func(*args, **kwargs)
+
+    fragment = getattr(st, 'fragment', None)
+    if fragment is None or not _fragments_enabled():
+        return timed
+    return fragment(timed)
+
+
+def _is_open(container):
+    """标签页/展开面板是否处于打开状态；未启用状态跟踪 (open 为 None) 时视为打开"""
+    return getattr(container, 'open', None) is not False
+
+
+def _calculate(params, arithmetic='float'):
+    """
+    计算一组参数的数值结果 (与语言无关)。
+    标准目录尺寸直接查内存映射的预计算表 (tent_catalog.py)，其余实时计算。
+    :param arithmetic: 'exact' 时不查表，按定点运算实时计算 (与 tent_solver 验证库存时的运算一致)
+    :return: (基础参数 num_units/area/perimeter, calculate_all 结果)
+    """
+    if arithmetic == 'exact':
+        calc = TentCalculator(*params, arithmetic='exact')
+        res = {'num_units': calc.num_units, 'area': calc.area, 'perimeter': calc.perimeter}
+        res.update(calc.calculate_all())
+    else:
+        res = catalog_calculate(*params, catalog=default_catalog())
+    return SimpleNamespace(num_units=res['num_units'], area=res['area'], perimeter=res['perimeter']), res
+
+
+class _View:
+    """
+    一组参数在某种语言下的界面数据。
+    明细表、图表和 CSV 都在首次被某个面板用到时才生成，之后复用；
+    切换语言只会新建一个 _View 重新贴标签，不会重新计算数值。
+    """
+
+    def __init__(self, pd, alt, lang, params, calc, res):
+        self.pd = pd
+        self.alt = alt
+        # 固定的标签、单位与说明都取自预编译的语言模板 (见 tent_templates.py)
+        self.template = detail_template(lang)
+        self.t = self.template.t
+        self.params = params
+        self.calc = calc
+        self.res = res
+        self._built = {}
+
+    def _memo(self, name, build):
+        value = self._built.get(name)
+        if value is None:
+            with span(name):
+                value = self._built[name] = build()
+        return value
+
+    def table(self):
+        return self._memo('table', self._build_table)
+
+    def area_chart(self):
+        return self._memo('area_chart', self._build_area_chart)
+
+    def count_chart(self):
+        return self._memo('count_chart', self._build_count_chart)
+
+    def detail(self):
+        """明细的带类型列 (数值与单位分开)，界面表格与导出共用"""
+        return self._memo('detail', self._build_detail)
+
+    def export(self, fmt):
+        """明细导出文件 (csv / parquet / arrow / xlsx，见 tent_export.py)"""
+        return self._memo('export:' + fmt, lambda: self._build_export(fmt))
+
+    def csv(self):
+        return self.export('csv')
+
+    def quote(self):
+        """按价格表报价 (见 tent_pricing.py)；未配置价格表时为 None"""
+        prices = default_price_list()
+        if prices is None:
+            return None
+        return self._memo('quote', lambda: prices.quote(self.res, self.params[3]))
+
+    def cutting_csv(self):
+        """裁剪清单 CSV (卷材/型材下料，见 tent_cutting.py)"""
+        import tent_cutting
+
+        return self._memo('cutting_csv', lambda: tent_cutting.plan(*self.params).to_csv(self.t))
+
+    def _build_detail(self):
+        return self.template.detail(self.res, self.quote())
+
+    def _build_table(self):
+        return self.template.table(self.pd, self.detail())
+
+    def _build_export(self, fmt):
+        columns = self.detail()
+        fields = list(tent_export.DETAIL_FIELDS)
+        if 'amount' in columns:
+            fields += tent_export.PRICE_FIELDS
+        return tent_export.to_bytes(fmt, fields, [columns])
+
+    def _build_area_chart(self):
+        t, alt, template = self.t, self.alt, self.template
+        area_df = self.pd.DataFrame({'Type': template.area_labels,
+                                     'Val': template.values(self.res, template.area_items)})
+
+        base_a = alt.Chart(area_df).encode(x=alt.X('Type', axis=alt.Axis(title=None, labelAngle=0)))
+        bars_a = base_a.mark_bar().encode(
+            y=alt.Y('Val', axis=alt.Axis(title=t['unit_area'])),
+            color=alt.Color('Type', legend=None),
+            tooltip=['Type', 'Val']
+        )
+        text_a = base_a.mark_text(dy=-10).encode(y='Val', text='Val')
+        return (bars_a + text_a).properties(height=350)
+
+    def _build_count_chart(self):
+        t, alt, template = self.t, self.alt, self.template
+        cnt_df = self.pd.DataFrame({'Type': template.count_labels,
+                                    'Val': template.values(self.res, template.count_items)})
+
+        base_c = alt.Chart(cnt_df).encode(x=alt.X('Type', axis=alt.Axis(title=None, labelAngle=-45)))
+        bars_c = base_c.mark_bar().encode(
+            y=alt.Y('Val', axis=alt.Axis(title=t['unit_pcs'])),
+            color=alt.Color('Type', legend=None),
+            tooltip=['Type', 'Val']
+        )
+        text_c = base_c.mark_text(dy=-10).encode(y='Val', text='Val')
+        return (bars_c + text_c).properties(height=350)
+
+
+# --- 输出面板 / Output panels ---
+# 每个面板作为独立的 fragment 渲染；面板内的控件 (标签页、展开面板) 只重跑该面板。
+
+def _overview_panel(view):
+    st, _, _ = _import_ui_libs()
+    t, calc, res = view.t, view.calc, view.res
+    st.subheader(t['overview'])
+    row1 = st.columns(3)
+    with row1[0]:
+        st.metric(t['roof_cover'], f"{res['roof_cover']} {t['unit_area']}")
+    with row1[1]:
+        st.metric(t['num_units'], f"{calc.num_units} {t['unit_sets']}")
+    with row1[2]:
+        st.metric(t['main_comp_total'], f"{res['main_comp_total']} {t['unit_pcs']}")
+
+    row2 = st.columns(3)
+    with row2[0]:
+        st.metric(t['roof_canvas'], f"{res['roof_canvas']} {t['unit_area']}")
+    with row2[1]:
+        st.metric(t['roof_liner'], f"{res['roof_liner']} {t['unit_area']}")
+    with row2[2]:
+        st.metric(t['tent_area'], f"{calc.area} {t['unit_area']}")
+
+
+def _details_panel(view):
+    st, _, _ = _import_ui_libs()
+    st.subheader(view.t['details'])
+    st.dataframe(view.table(), use_container_width=True, hide_index=True)
+
+
+def _charts_panel(view):
+    st, _, _ = _import_ui_libs()
+    t = view.t
+    st.subheader(t['visualization'])
+
+    # on_change="rerun" 开启标签页状态跟踪，只生成当前打开的那张图
+    tab1, tab2 = st.tabs([t['area_tab'], t['count_tab']], key='chart_tabs', on_change='rerun')
+
+    with tab1:
+        if _is_open(tab1):
+            st.altair_chart(view.area_chart(), use_container_width=True)
+
+    with tab2:
+        if _is_open(tab2):
+            st.altair_chart(view.count_chart(), use_container_width=True)
+
+
+def _export_format(st, t, key):
+    """导出格式选择 (只列出当前环境可用的格式)"""
+    return st.selectbox(t['export_format'], tent_export.available_formats(), format_func=str.upper, key=key)
+
+
+def _export_panel(view):
+    st, _, _ = _import_ui_libs()
+    t = view.t
+    # 导出文件只在展开导出面板后才生成；数值与单位分列 (见 tent_export.py)
+    with st.expander(t['export'], key='export_panel', on_change='rerun') as panel:
+        if _is_open(panel):
+            fmt = _export_format(st, t, 'export_format')
+            st.download_button(
+                label=t['download_btn'],
+                data=view.export(fmt),
+                file_name=f'tent_core_calc.{tent_export.EXTENSIONS[fmt]}',
+                mime=tent_export.MIME_TYPES[fmt],
+                on_click='ignore',
+            )
+            st.download_button(
+                label=t['cut_download'],
+                data=view.cutting_csv(),
+                file_name='tent_cutting_list.csv',
+                mime='text/csv',
+                on_click='ignore',
+            )
+
+
+# --- 优化模式 / Optimize mode ---
+UNIT_CHOICES = [2.5, 3.0, 4.0, 5.0, 6.0]
+OPT_OBJECTIVES = ['area', 'main_comp_total', 'bearing_count', 'expansion_screw',
+                  'upright_support', 'gable_post', 'roof_cover']
+
+
+def _sweep_workers():
+    """扫描进程数: 环境变量 TENT_SWEEP_WORKERS，默认 CPU 核数"""
+    workers = os.environ.get('TENT_SWEEP_WORKERS')
+    return int(workers) if workers else None
+
+
+def _optimize_page(st, pd, alt, t, lang):
+    """优化模式: 在场地范围内扫描尺寸与单元组合 (见 tent_sweep.py)，全部方案的分布见 tent_charts.py"""
+    import tent_charts
+    import tent_sweep
+
+    def label(key):
+        return t['tent_area'] if key == 'area' else t[key]
+
+    with st.sidebar:
+        st.markdown("---")
+        st.subheader(t['settings'])
+        min_length = st.number_input(t['opt_min_length'], min_value=1.0, value=10.0, step=1.0, key='opt_min_length')
+        site_length = st.number_input(t['opt_site_length'], min_value=1.0, value=40.0, step=1.0, key='opt_site_length')
+        min_width = st.number_input(t['opt_min_width'], min_value=1.0, value=10.0, step=1.0, key='opt_min_width')
+        site_width = st.number_input(t['opt_site_width'], min_value=1.0, value=30.0, step=1.0, key='opt_site_width')
+        step = st.number_input(t['opt_step'], min_value=0.1, value=1.0, step=0.5, key='opt_step')
+        side_height = st.number_input(t['side_height'], min_value=1.0, value=INPUT_DEFAULTS['side_height'], step=0.5, key='opt_side_height')
+
+        st.markdown("---")
+        with st.expander(t['adv_settings'], expanded=True):
+            unit_choices = st.multiselect(t['opt_unit_choices'], UNIT_CHOICES, default=[3.0, 5.0], key='opt_unit_choices')
+            gable_choices = st.multiselect(t['opt_gable_choices'], UNIT_CHOICES, default=[3.0, 5.0], key='opt_gable_choices')
+            holes_per_base = st.number_input(t['holes_per_base'], min_value=1, value=INPUT_DEFAULTS['holes_per_base'], step=1, key='opt_holes_per_base')
+            roof_pitch_factor = st.number_input(t['roof_pitch_factor'], min_value=1.0, value=INPUT_DEFAULTS['roof_pitch_factor'], step=0.01, help="Range: 1.1 - 1.2", key='opt_roof_pitch_factor')
+
+        objectives = st.multiselect(t['opt_objectives'], OPT_OBJECTIVES, default=OPT_OBJECTIVES[:4], format_func=label, key='opt_objectives')
+        top_k = st.number_input(t['opt_top_k'], min_value=0, value=0, step=1, key='opt_top_k')
+        run = st.button(t['opt_run'], type='primary', use_container_width=True)
+
+    st.title(t['opt_title'])
+    st.caption(t['opt_note'])
+    st.markdown("---")
+
+    ready = unit_choices and gable_choices and objectives and min_length <= site_length and min_width <= site_width
+    if run and ready:
+        grid = tent_sweep.ParamGrid(
+            length=(min_length, site_length, step),
+            width=(min_width, site_width, step),
+            side_height=side_height,
+            unit_length=sorted(unit_choices),
+            gable_unit_length=sorted(gable_choices),
+            holes_per_base=holes_per_base,
+            roof_pitch_factor=roof_pitch_factor,
+        )
+        senses = [(k, 'max' if k == 'area' else 'min') for k in objectives]
+        # 块大小按网格缩放，让进度条至少更新几十次
+        chunk_size = min(tent_sweep.DEFAULT_CHUNK_SIZE, max(1024, grid.size // 50))
+        bar = st.progress(0.0)
+        best = charts = None
+        for update in tent_sweep.sweep(grid, senses, k=top_k or None, workers=_sweep_workers(),
+                                       chunk_size=chunk_size, charts=tent_charts.Aggregates.for_grid(grid)):
+            bar.progress(update.fraction, text=t['opt_progress'].format(done=update.done, total=update.total))
+            best, charts = update.best, update.charts
+        # 图表规格按网格缓存 (同一网格再次扫描或切换语言时不重新生成)
+        st.session_state['opt_result'] = (objectives, best, charts, ('sweep',) + tuple(grid.axes.items()))
+
+    stored = st.session_state.get('opt_result')
+    if stored is None:
+        return
+    objectives, best, charts, key = stored
+    st.subheader(t['opt_result'])
+    if best is None or len(best['grid_index']) == 0:
+        st.info(t['opt_empty'])
+        return
+    columns = ['length', 'width', 'unit_length', 'gable_unit_length'] + [k for k in objectives]
+    df = pd.DataFrame({label(k) if k in objectives else t[k]: best[k] for k in columns})
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+    # 全部方案的分布: 只发送聚合后的数据，图表大小与网格大小无关
+    with st.expander(t['opt_charts'], key='opt_charts', on_change='rerun') as panel:
+        if not _is_open(panel):
+            return
+        st.caption(t['opt_charts_note'].format(rows=charts.rows))
+        stat = st.radio(t['chart_stat'], tent_charts.HEATMAP_STATS, format_func=lambda s: t['chart_' + s],
+                        horizontal=True, key='opt_chart_stat')
+        with span('opt_charts'):
+            heatmap, fasteners = tent_charts.chart_specs(alt, pd, charts, t, key, lang, stat)
+        st.vega_lite_chart(heatmap, use_container_width=True)
+        st.vega_lite_chart(fasteners, use_container_width=True)
+
+
+# --- 反向求解 / Reverse solver ---
+SOLVER_STOCK = ('upright_support', 'gable_post', 'roof_beam', 'expansion_screw', 'roof_canvas', 'glass_wall_sqm')
+
+
+def _apply_size(length, width):
+    # 按钮回调在下一次重跑前执行，此时可以改写已实例化控件的值
     import streamlit as st
-    import pandas as pd
-    import altair as alt
-    from streamlit.runtime.scriptrunner import get_script_run_ctx
-except ImportError as e:
-    print(f"\n❌ 错误: 缺少必要的库 ({e})")
-    print("请运行以下命令安装:")
-    print(f"{sys.executable} -m pip install streamlit pandas altair")
-    sys.exit(1)
-
-# --- 翻译字典 / Translation Dictionary ---
-TRANSLATIONS = {
-    '中文': {
-        'page_title': "篷房核心计算系统",
-        'main_title': "⛺ 篷房核心计算系统",
-        'settings': "基础参数",
-        'adv_settings': "高级参数",
-        'lang_select': "语言选择 / Language",
-        'length': "篷房长度 (米)",
-        'width': "篷房宽度/跨度 (米)",
-        'side_height': "边高 (米)",
-        'unit_length': "单元长度 (米)",
-        'gable_unit_length': "山墙单元/间隔 (米)",
-        'holes_per_base': "基座孔位数量 (个)",
-        'roof_pitch_factor': "三角形角度系数",
-        
-        'calc_note': "依据“篷房核心计算公式”标准进行计算。",
-        'overview': "📊 核心指标概览",
-        'details': "📝 详细组件清单",
-        'visualization': "📈 数据可视化",
-        'export': "💾 导出数据",
-        'download_btn': "下载计算结果 (CSV)",
-        'area_tab': "面积与覆盖",
-        'count_tab': "结构组件数量",
-        'col_item': "组件名称",
-        'col_value': "数值",
-        'col_desc': "计算规则/说明",
-        'unit_area': "㎡",
-        'unit_pcs': "件",
-        'unit_sets': "组",
-        'unit_m': "米",
-        'unit_kmh': "km/h",
-        'unit_kn': "kN/㎡",
-        
-        # Sections
-        'sec_basic': "1. 基础参数关系",
-        'sec_struct': "2. 结构性组件关系",
-        'sec_conn': "3. 连接件与辅助组件",
-        'sec_cover': "4. 覆盖物与装饰组件",
-        'sec_specs': "技术规格",
-
-        # Items
-        'num_units': "单元数量",
-        'tent_area': "篷房面积",
-        'perimeter': "周长",
-        
-        'gable_post': "山墙侧柱",
-        'gable_mid_post': "山墙中柱 (说明)",
-        'upright_support': "边墙承重柱",
-        
-        'roof_beam': "斜梁",
-        'ridge_conn': "屋脊连接角",
-        'eave_conn': "屋檐连接角",
-        'expansion_screw': "膨胀螺丝",
-        'drilling_steel': "钢钎",
-        'bearing_count': "承重数量",
-        'main_comp_total': "主要构件总数",
-        
-        'roof_canvas': "顶棚面积",
-        'roof_liner': "顶幔面积",
-        'roof_cover': "总覆盖面积",
-        'glass_wall_m': "玻璃墙 (米)",
-        'glass_wall_sqm': "玻璃墙 (平方)",
-        'basic_lighting': "基础照明",
-        'roof_stretcher': "顶棚紧固器",
-
-        # Descriptions (Formulas)
-        'desc_num_units': "长度 / 单元长度",
-        'desc_area': "长度 × 宽度",
-        'desc_perimeter': "(长度 + 宽度) × 2",
-        
-        'desc_gable_post': "(宽度 / 山墙间隔 - 1) × 2",
-        'desc_gable_mid': "奇数间隔无中柱，偶数有中柱",
-        'desc_upright': "(单元数量 + 1) × 2",
-        
-        'desc_roof_beam': "单元数量 + 1 (组/对)",
-        'desc_ridge_conn': "单元数量 + 1",
-        'desc_eave_conn': "(单元数量 + 1) × 2",
-        'desc_bearing': "(边墙单元数+1)×2 + 山墙柱数",
-        'desc_expansion_screw': "(边墙柱数 + 山墙侧柱数) × 基座孔数",
-        'desc_drilling_steel': "(边墙柱数 + 山墙侧柱数) × 基座孔数",
-        
-        'desc_roof_canvas': "篷房面积 × 角度系数",
-        'desc_roof_liner': "同顶棚面积",
-        'desc_roof_cover': "顶棚面积 + 顶幔面积 + 玻璃墙面积",
-        'desc_glass_m': "周长",
-        'desc_glass_sqm': "周长 × 边高",
-        'desc_basic_lighting': "(单元数量 - 1) × 2",
-        'desc_roof_stretcher': "单元数量 × 2",
-    },
-    'English': {
-        'page_title': "Tent Core Calculator",
-        'main_title': "⛺ Tent Core Calculator",
-        'settings': "Basic Parameters",
-        'adv_settings': "Advanced Parameters",
-        'lang_select': "Language",
-        'length': "Length (m)",
-        'width': "Width / Span (m)",
-        'side_height': "Side Height (m)",
-        'unit_length': "Unit Length (m)",
-        'gable_unit_length': "Gable Unit/Bay (m)",
-        'holes_per_base': "Holes per Base Plate",
-        'roof_pitch_factor': "Angle ratio of triangle",
-        
-        'calc_note': "Calculated based on Core Tent Formulas.",
-        'overview': "📊 Key Metrics",
-        'details': "📝 Detailed List",
-        'visualization': "📈 Visualization",
-        'export': "💾 Export Data",
-        'download_btn': "Download Results (CSV)",
-        'area_tab': "Area & Cover",
-        'count_tab': "Structural Count",
-        'col_item': "Component",
-        'col_value': "Value",
-        'col_desc': "Formula / Rule",
-        'unit_area': "㎡",
-        'unit_pcs': "pcs",
-        'unit_sets': "sets",
-        'unit_m': "m",
-        'unit_kmh': "km/h",
-        'unit_kn': "kN/㎡",
-
-        # Sections
-        'sec_basic': "1. Basic Parameters",
-        'sec_struct': "2. Structural Components",
-        'sec_conn': "3. Connections & Aux",
-        'sec_cover': "4. Cover & Decoration",
-        'sec_specs': "Tech Specs",
-
-        # Items
-        'num_units': "Quantities of tent units",
-        'tent_area': "Tent Area",
-        'perimeter': "Perimeter",
-        
-        'gable_post': "Gable support side",
-        'gable_mid_post': "Middle gable support (Note)",
-        'upright_support': "Side pillars",
-        
-        'roof_beam': "Main frame / Beam",
-        'ridge_conn': "Ridge connector",
-        'eave_conn': "Eave connector",
-        'expansion_screw': "Expansion screw",
-        'drilling_steel': "Drilling steel",
-        'bearing_count': "Bearing Count",
-        'main_comp_total': "Total main components",
-        
-        'roof_canvas': "Roof canvas area",
-        'roof_liner': "Roof liner area",
-        'roof_cover': "Total cover area",
-        'glass_wall_m': "Glass wall (Length)",
-        'glass_wall_sqm': "Glass wall (Area)",
-        'basic_lighting': "Basic lighting",
-        'roof_stretcher': "Roof stretching spare parts",
-
-        # Descriptions
-        'desc_num_units': "Length / Unit Length",
-        'desc_area': "Length × Width",
-        'desc_perimeter': "(Length + Width) × 2",
-        
-        'desc_gable_post': "(Width / Gable Bay - 1) × 2",
-        'desc_gable_mid': "No mid post for odd bays",
-        'desc_upright': "(Units + 1) × 2",
-        
-        'desc_roof_beam': "Units + 1 (Sets/Pairs)",
-        'desc_ridge_conn': "Units + 1",
-        'desc_eave_conn': "(Units + 1) × 2",
-        'desc_bearing': "(Side Units + 1)×2 + Gable Cols",
-        'desc_expansion_screw': "(Side pillars + Gable support side) × Holes",
-        'desc_drilling_steel': "(Side pillars + Gable support side) × Holes",
-        
-        'desc_roof_canvas': "Area × Angle ratio of triangle",
-        'desc_roof_liner': "Same as roof canvas",
-        'desc_roof_cover': "Roof canvas + roof liner + glass wall area",
-        'desc_glass_m': "Perimeter",
-        'desc_glass_sqm': "Perimeter × Height",
-        'desc_basic_lighting': "(Units - 1) × 2",
-        'desc_roof_stretcher': "Units × 2",
-    }
-}
-
-class TentCalculator:
-    def __init__(self, length, width, side_height, unit_length, gable_unit_length, holes_per_base, roof_pitch_factor):
-        self.length = float(length)
-        self.width = float(width)
-        self.side_height = float(side_height)
-        self.unit_length = float(unit_length)
-        self.gable_unit_length = float(gable_unit_length)
-        self.holes_per_base = int(holes_per_base)
-        self.roof_pitch_factor = float(roof_pitch_factor)
-        
-        # --- 1. Basic Parameters ---
-        self.num_units = 0
-        if self.unit_length > 0:
-            self.num_units = int(self.length / self.unit_length)
-        
-        self.area = self.length * self.width
-        self.perimeter = (self.length + self.width) * 2
 
-    def calculate_all(self):
-        results = {}
-        
-        # --- 2. Structural Components ---
-        # Upright Support: (Units + 1) * 2
-        results['upright_support'] = (self.num_units + 1) * 2
-        
-        # Gable Columns: (Width / Gable_Unit - 1) * 2
-        # Note: If Width=20, Bay=5, Cols = (4-1)*2 = 6.
-        gable_bays = 0
-        if self.gable_unit_length > 0:
-            gable_bays = int(self.width / self.gable_unit_length)
-        
-        # Formula: (Width / Unit_Width - 1) * 2
-        # We use max(0, ...) to avoid negatives if width < unit
-        results['gable_post'] = max(0, (gable_bays - 1) * 2)
-        
-        # Middle Post Logic (Information only)
-        # "Odd bays no middle post, Even bays have middle post"
-        has_mid_post = (gable_bays % 2 == 0) and (gable_bays > 0)
-        results['has_mid_post'] = has_mid_post
-        
-        # --- 3. Connections & Aux ---
-        # Roof Beam / Main Frame: Units + 1
-        results['roof_beam'] = self.num_units + 1
-        
-        # Ridge Connection: Units + 1
-        results['ridge_conn'] = self.num_units + 1
-        
-        # Eave Connection: (Units + 1) * 2
-        results['eave_conn'] = (self.num_units + 1) * 2
-        
-        # Bearing Count (Total Columns): (Side Units + 1)*2 + Gable Cols
-        # Matches the sum of uprights + gable posts
-        results['bearing_count'] = results['upright_support'] + results['gable_post']
-        results['main_comp_total'] = results['upright_support'] + results['gable_post'] + results['roof_beam']
-        
-        # Expansion elements: separate counts for expansion screw and drilling steel
-        results['expansion_screw'] = results['bearing_count'] * self.holes_per_base
-        results['drilling_steel'] = results['bearing_count'] * self.holes_per_base
-        
-        # --- 4. Cover & Decoration ---
-        results['roof_canvas'] = round(self.area * self.roof_pitch_factor, 2)
-        results['roof_liner'] = results['roof_canvas']
-        results['glass_wall_m'] = round(self.perimeter, 2)
-        results['glass_wall_sqm'] = round(self.perimeter * self.side_height, 2)
-        results['roof_cover'] = round(results['roof_canvas'] + results['roof_liner'] + results['glass_wall_sqm'], 2)
-        results['basic_lighting'] = max(0, (self.num_units - 1) * 2)
-        results['roof_stretcher'] = self.num_units * 2
+    st.session_state['length'] = st.session_state['_calc_length'] = float(length)
+    st.session_state['width'] = st.session_state['_calc_width'] = float(width)
+    # 计算模式随后按定点运算重算这一尺寸，显示的物料清单就是求解器按库存验证过的那一份
+    st.session_state['_solver_size'] = (float(length), float(width))
+
+
+def _solver_panel(st, pd, t, side_height, unit_length, gable_unit_length, holes_per_base, roof_pitch_factor):
+    """侧边栏: 按现有库存反求最大可搭建尺寸 (见 tent_solver.py)，展开时随输入实时计算"""
+    import tent_solver
+
+    with st.expander(t['solve_title'], key='solver_panel', on_change='rerun') as panel:
+        if not _is_open(panel):
+            return
+        st.caption(t['solve_note'])
+        stock = {}
+        for name in SOLVER_STOCK:
+            value = st.number_input(t[name], min_value=0.0, value=0.0, step=1.0, key='solve_' + name)
+            if value > 0:
+                stock[name] = value
+        if not stock:
+            return
+        with span('solve'):
+            solution = tent_solver.solve(stock, side_height, unit_length, gable_unit_length, holes_per_base,
+                                         roof_pitch_factor)
+        best = solution.best
+        if best is None:
+            st.warning(t['solve_none'])
+            return
+        st.success(t['solve_best'].format(length=best['length'], width=best['width'], area=best['area']))
+        if solution.capped:
+            st.warning(t['solve_capped'].format(units=tent_solver.MAX_UNITS, bays=tent_solver.MAX_BAYS))
+        st.button(t['solve_apply'], key='solve_apply', on_click=_apply_size, args=(best['length'], best['width']))
+        if len(solution.front) > 1:
+            st.caption(t['solve_front'])
+            front = pd.DataFrame([[p['length'], p['width'], p['area']] for p in solution.front],
+                                 columns=[t['length'], t['width'], t['tent_area']])
+            st.dataframe(front, use_container_width=True, hide_index=True)
+
+
+# --- 项目模式 / Project mode ---
+PROJECT_COLUMNS = ['name', 'quantity'] + list(BATCH_INPUTS)
+PROJECT_EXAMPLE = [
+    {'name': 'Main hall', 'quantity': 1, 'length': 50.0, 'width': 30.0, 'side_height': 4.0, 'unit_length': 5.0,
+     'gable_unit_length': 5.0, 'holes_per_base': 4, 'roof_pitch_factor': 1.15},
+    {'name': 'VIP', 'quantity': 10, 'length': 15.0, 'width': 10.0, 'side_height': 3.0, 'unit_length': 5.0,
+     'gable_unit_length': 5.0, 'holes_per_base': 4, 'roof_pitch_factor': 1.15},
+]
+
+
+def _project_page(st, pd, t):
+    """项目模式: 编辑或上传篷房清单，汇总物料清单 (见 tent_project.py)"""
+    import tent_project
+
+    # 编辑器的基础数据只在上传新文件时替换；替换后换一个编辑器 key，丢弃旧的编辑记录
+    if 'proj_base' not in st.session_state:
+        st.session_state['proj_base'] = pd.DataFrame(PROJECT_EXAMPLE, columns=PROJECT_COLUMNS)
+        st.session_state['proj_version'] = 0
+    with st.sidebar:
+        st.markdown("---")
+        upload = st.file_uploader(t['proj_upload'], type=['csv'], key='proj_upload')
+        if upload is not None and st.session_state.get('proj_file') != upload.file_id:
+            uploaded = pd.read_csv(upload, encoding='utf-8-sig')
+            st.session_state['proj_base'] = uploaded.reindex(columns=PROJECT_COLUMNS)
+            st.session_state['proj_file'] = upload.file_id
+            st.session_state['proj_version'] += 1
+
+    st.title(t['proj_title'])
+    st.caption(t['proj_note'])
+    st.markdown("---")
+
+    st.subheader(t['proj_tents'])
+    labels = {'name': t['col_name'], 'quantity': t['col_quantity']}
+    edited = st.data_editor(
+        st.session_state['proj_base'],
+        num_rows='dynamic',
+        use_container_width=True,
+        hide_index=True,
+        column_config={c: labels.get(c, t.get(c, c)) for c in PROJECT_COLUMNS},
+        key=f"proj_editor_{st.session_state['proj_version']}",
+    )
+    # 空行 (刚添加还未填写) 不参与计算
+    edited = edited.dropna(how='all', subset=list(BATCH_INPUTS))
+
+    try:
+        with span('project'):
+            project = tent_project.evaluate(edited)
+    except ValueError as e:
+        st.error(str(e))
+        return
+    st.caption(t['proj_stats'].format(tents=project.total_tents, unique=project.unique, computed=project.computed))
+
+    st.subheader(t['proj_bom'])
+    bom = tent_project.bom_columns(project, t)
+    bom_df = pd.DataFrame({t['col_item']: bom['label'], t['col_value']: bom['value'], t['col_unit']: bom['unit']})
+    st.dataframe(bom_df, use_container_width=True, hide_index=True)
+    fmt = _export_format(st, t, 'proj_export_format')
+    ext, mime = tent_export.EXTENSIONS[fmt], tent_export.MIME_TYPES[fmt]
+    st.download_button(
+        label=t['proj_download'],
+        data=tent_export.to_bytes(fmt, tent_project.BOM_EXPORT_FIELDS, [bom]),
+        file_name=f'tent_project_bom.{ext}',
+        mime=mime,
+        on_click='ignore',
+    )
+    # 逐顶明细可能很大，点击下载时才分块写出
+    st.download_button(
+        label=t['proj_download_detail'],
+        data=lambda: tent_export.to_bytes(fmt, tent_project.per_tent_fields(), tent_project.per_tent_chunks(project)),
+        file_name=f'tent_project_tents.{ext}',
+        mime=mime,
+        on_click='ignore',
+    )
+    # 整个项目合并下料 (余料可跨篷房复用)；大项目下料较慢，点击下载时才计算
+    import tent_cutting
+
+    tents = project.tents
+    st.download_button(
+        label=t['cut_download'],
+        data=lambda: tent_cutting.plan_tents(tents).to_csv(t),
+        file_name='tent_project_cutting.csv',
+        mime='text/csv',
+        on_click='ignore',
+    )
+
+    with st.expander(t['proj_per_tent'], key='proj_per_tent', on_change='rerun') as panel:
+        if _is_open(panel):
+            fields = [name for name, _ in tent_project.BOM_FIELDS]
+            detail = pd.DataFrame([
+                [tent.name, tent.quantity] + [row[f] for f in fields] for tent, row in project.per_tent()
+            ], columns=[t['col_name'], t['col_quantity']] + [tent_project.bom_label(t, f) for f in fields])
+            st.dataframe(detail, use_container_width=True, hide_index=True)
+
+
+def _debug_panel(st, pd, t):
+    """侧边栏调试面板: 各阶段耗时分位数与缓存命中率"""
+    with st.sidebar, st.expander(t['debug_title'], expanded=True):
+        st.caption(t['debug_stages'])
+        stages = tent_metrics.snapshot()
+        if stages:
+            st.dataframe(pd.DataFrame.from_dict(stages, orient='index'), use_container_width=True)
+        st.caption(t['debug_caches'])
+        caches = {'results': _result_cache().stats(), 'views': _view_cache().stats()}
+        st.dataframe(pd.DataFrame.from_dict(caches, orient='index'), use_container_width=True)
+        # 清空的是进程级统计，会影响所有会话；只有 TENT_DEBUG 开启时提供，?debug=1 的访客只能查看
+        if _debug_configured() and st.button(t['debug_reset'], key='debug_reset'):
+            tent_metrics.reset()
 
-        return results
 
 def main():
+    st, pd, alt = _import_ui_libs()
     st.set_page_config(
         page_title="Tent Core Calculator",
         page_icon="⛺",
         layout="wide"
     )
+    # ?debug=1 只为当前会话开启统计，其他会话的 span 仍为空操作
+    debug = _debug_enabled(st)
+
+    # 整次重跑的耗时记为 rerun，各阶段耗时见 _render 中的 span
+    with tent_metrics.scoped(debug), span('rerun'):
+        t = _render(st, pd, alt)
+    if debug:
+        _debug_panel(st, pd, t)
+    tent_metrics.maybe_dump()
+
+
+# 计算模式的参数默认值取 tent_core.INPUT_DEFAULTS。控件值另存一份在 '_calc_' 前缀的普通键中：
+# 切换到优化/项目模式时这些控件不会渲染，Streamlit 会删除它们的控件状态，回到计算模式时从副本恢复
+
+
+def _calc_input(st, label, key, **kwargs):
+    """计算模式的参数输入框: 控件状态被清除后从 '_calc_' 副本恢复，每次渲染后同步副本"""
+    state = st.session_state
+    if key not in state:
+        state[key] = state.get('_calc_' + key, INPUT_DEFAULTS[key])
+    value = st.number_input(label, key=key, **kwargs)
+    state['_calc_' + key] = value
+    return value
 
+
+def _render(st, pd, alt):
+    """渲染整页，返回当前语言的翻译字典"""
     # --- Sidebar ---
     with st.sidebar:
         st.header("⚙️ Settings")
@@ -279,153 +555,74 @@ def main():
         # Language
         lang_choice = st.radio("Language / 语言", ["中文", "English"], horizontal=True)
         t = TRANSLATIONS[lang_choice]
-        
+        mode = st.radio(t['mode_select'], ['calc', 'optimize', 'project'], format_func=lambda m: t['mode_' + m], horizontal=True, key='mode')
+
+    if mode == 'optimize':
+        _optimize_page(st, pd, alt, t, lang_choice)
+        return t
+    if mode == 'project':
+        _project_page(st, pd, t)
+        return t
+
+    with span('widgets'), st.sidebar:
         st.markdown("---")
         st.subheader(t['settings'])
         
-        length = st.number_input(t['length'], min_value=1.0, value=25.0, step=1.0)
-        width = st.number_input(t['width'], min_value=1.0, value=20.0, step=1.0)
-        side_height = st.number_input(t['side_height'], min_value=1.0, value=3.0, step=0.5)
+        # 参数控件使用固定 key: 标签随语言变化时控件身份不变，切换语言不会把数值重置为默认值
+        length = _calc_input(st, t['length'], 'length', min_value=1.0, step=1.0)
+        width = _calc_input(st, t['width'], 'width', min_value=1.0, step=1.0)
+        side_height = _calc_input(st, t['side_height'], 'side_height', min_value=1.0, step=0.5)
         
         st.markdown("---")
         with st.expander(t['adv_settings'], expanded=True):
-            unit_length = st.number_input(t['unit_length'], min_value=1.0, value=5.0, step=0.5, help="Standard: 5m (BT), 3m (PT)")
-            gable_unit_length = st.number_input(t['gable_unit_length'], min_value=1.0, value=5.0, step=0.5)
-            holes_per_base = st.number_input(t['holes_per_base'], min_value=1, value=4, step=1)
-            roof_pitch_factor = st.number_input(t['roof_pitch_factor'], min_value=1.0, value=1.15, step=0.01, help="Range: 1.1 - 1.2")
+            unit_length = _calc_input(st, t['unit_length'], 'unit_length', min_value=1.0, step=0.5, help="Standard: 5m (BT), 3m (PT)")
+            gable_unit_length = _calc_input(st, t['gable_unit_length'], 'gable_unit_length', min_value=1.0, step=0.5)
+            holes_per_base = _calc_input(st, t['holes_per_base'], 'holes_per_base', min_value=1, step=1)
+            roof_pitch_factor = _calc_input(st, t['roof_pitch_factor'], 'roof_pitch_factor', min_value=1.0, step=0.01, help="Range: 1.1 - 1.2")
         
         st.info(t['calc_note'])
 
+    with st.sidebar:
+        _solver_panel(st, pd, t, side_height, unit_length, gable_unit_length, holes_per_base, roof_pitch_factor)
+
     # --- Main Content ---
     st.title(t['main_title'])
     st.markdown("---")
 
-    # Calculation
-    calc = TentCalculator(length, width, side_height, unit_length, gable_unit_length, holes_per_base, roof_pitch_factor)
-    res = calc.calculate_all()
+    # Calculation: 数值结果只按参数缓存，切换语言只重新贴标签
+    params = spec_key(length, width, side_height, unit_length, gable_unit_length, holes_per_base, roof_pitch_factor)
+    # 采用了反求的尺寸 (且长宽未再修改) 时与求解器一样按定点运算，否则查表/浮点计算
+    arithmetic = 'exact' if st.session_state.get('_solver_size') == (length, width) else 'float'
+    calc, res = _result_cache().get_or_create((params, arithmetic), lambda: _calculate(params, arithmetic))
+    view = _view_cache().get_or_create(
+        (params, arithmetic, lang_choice),
+        lambda: _View(pd, alt, lang_choice, params, calc, res)
+    )
 
     # --- 1. KPI Overview (Top Level) ---
-    st.subheader(t['overview'])
-    row1 = st.columns(3)
-    with row1[0]:
-        st.metric(t['roof_cover'], f"{res['roof_cover']} {t['unit_area']}")
-    with row1[1]:
-        st.metric(t['num_units'], f"{calc.num_units} {t['unit_sets']}")
-    with row1[2]:
-        st.metric(t['main_comp_total'], f"{res['main_comp_total']} {t['unit_pcs']}")
-
-    row2 = st.columns(3)
-    with row2[0]:
-        st.metric(t['roof_canvas'], f"{res['roof_canvas']} {t['unit_area']}")
-    with row2[1]:
-        st.metric(t['roof_liner'], f"{res['roof_liner']} {t['unit_area']}")
-    with row2[2]:
-        st.metric(t['tent_area'], f"{calc.area} {t['unit_area']}")
+    _panel(st, _overview_panel)(view)
 
     st.markdown("---")
 
     # --- 2. Detailed Table (Grouped) ---
-    st.subheader(t['details'])
-    
-    def create_row(section, item_key, value, unit, desc_key):
-        return {
-            "Category": section,
-            t['col_item']: t[item_key],
-            t['col_value']: f"{value} {unit}",
-            t['col_desc']: t[desc_key]
-        }
-
-    rows = []
-    
-    # Sec 1: Basic
-    rows.append(create_row(t['sec_basic'], 'num_units', calc.num_units, t['unit_sets'], 'desc_num_units'))
-    rows.append(create_row(t['sec_basic'], 'tent_area', calc.area, t['unit_area'], 'desc_area'))
-    rows.append(create_row(t['sec_basic'], 'perimeter', calc.perimeter, t['unit_m'], 'desc_perimeter'))
-    
-    # Sec 2: Structure
-    mid_post_status = "✅ YES" if res['has_mid_post'] else "❌ NO"
-    rows.append(create_row(t['sec_struct'], 'gable_post', res['gable_post'], t['unit_pcs'], 'desc_gable_post'))
-    # Special row for mid post info
-    rows.append({
-        "Category": t['sec_struct'],
-        t['col_item']: t['gable_mid_post'],
-        t['col_value']: mid_post_status,
-        t['col_desc']: t['desc_gable_mid']
-    })
-    rows.append(create_row(t['sec_struct'], 'upright_support', res['upright_support'], t['unit_pcs'], 'desc_upright'))
-    
-    # Sec 3: Connections & Anchoring
-    rows.append(create_row(t['sec_conn'], 'roof_beam', res['roof_beam'], t['unit_sets'], 'desc_roof_beam'))
-    rows.append(create_row(t['sec_conn'], 'ridge_conn', res['ridge_conn'], t['unit_pcs'], 'desc_ridge_conn'))
-    rows.append(create_row(t['sec_conn'], 'eave_conn', res['eave_conn'], t['unit_pcs'], 'desc_eave_conn'))
-    rows.append(create_row(t['sec_conn'], 'bearing_count', res['bearing_count'], t['unit_pcs'], 'desc_bearing'))
-    rows.append(create_row(t['sec_conn'], 'expansion_screw', res['expansion_screw'], t['unit_pcs'], 'desc_expansion_screw'))
-    rows.append(create_row(t['sec_conn'], 'drilling_steel', res['drilling_steel'], t['unit_pcs'], 'desc_drilling_steel'))
-    
-    # Sec 4: Cover & Decoration
-    rows.append(create_row(t['sec_cover'], 'roof_canvas', res['roof_canvas'], t['unit_area'], 'desc_roof_canvas'))
-    rows.append(create_row(t['sec_cover'], 'roof_liner', res['roof_liner'], t['unit_area'], 'desc_roof_liner'))
-    rows.append(create_row(t['sec_cover'], 'roof_cover', res['roof_cover'], t['unit_area'], 'desc_roof_cover'))
-    rows.append(create_row(t['sec_cover'], 'glass_wall_m', res['glass_wall_m'], t['unit_m'], 'desc_glass_m'))
-    rows.append(create_row(t['sec_cover'], 'glass_wall_sqm', res['glass_wall_sqm'], t['unit_area'], 'desc_glass_sqm'))
-    rows.append(create_row(t['sec_cover'], 'basic_lighting', res['basic_lighting'], t['unit_pcs'], 'desc_basic_lighting'))
-    rows.append(create_row(t['sec_cover'], 'roof_stretcher', res['roof_stretcher'], t['unit_pcs'], 'desc_roof_stretcher'))
-
-    df = pd.DataFrame(rows)
-    st.dataframe(df, use_container_width=True, hide_index=True)
+    _panel(st, _details_panel)(view)
 
     # --- 3. Visualization ---
-    st.subheader(t['visualization'])
-    
-    tab1, tab2 = st.tabs([t['area_tab'], t['count_tab']])
-    
-    with tab1:
-        area_data = [
-            {'Type': t['tent_area'], 'Val': calc.area},
-            {'Type': t['roof_canvas'], 'Val': res['roof_canvas']},
-            {'Type': t['roof_liner'], 'Val': res['roof_liner']},
-            {'Type': t['roof_cover'], 'Val': res['roof_cover']},
-            {'Type': t['glass_wall_sqm'], 'Val': res['glass_wall_sqm']}
-        ]
-        area_df = pd.DataFrame(area_data)
-        
-        base_a = alt.Chart(area_df).encode(x=alt.X('Type', axis=alt.Axis(title=None, labelAngle=0)))
-        bars_a = base_a.mark_bar().encode(
-            y=alt.Y('Val', axis=alt.Axis(title=t['unit_area'])),
-            color=alt.Color('Type', legend=None),
-            tooltip=['Type', 'Val']
-        )
-        text_a = base_a.mark_text(dy=-10).encode(y='Val', text='Val')
-        st.altair_chart((bars_a + text_a).properties(height=350), use_container_width=True)
-        
-    with tab2:
-        cnt_items = ['upright_support', 'gable_post', 'roof_beam', 'ridge_conn', 'eave_conn',
-                     'expansion_screw', 'drilling_steel', 'basic_lighting', 'roof_stretcher']
-        cnt_data = [{'Type': t[k], 'Val': res[k]} for k in cnt_items]
-        cnt_df = pd.DataFrame(cnt_data)
-        
-        base_c = alt.Chart(cnt_df).encode(x=alt.X('Type', axis=alt.Axis(title=None, labelAngle=-45)))
-        bars_c = base_c.mark_bar().encode(
-            y=alt.Y('Val', axis=alt.Axis(title=t['unit_pcs'])),
-            color=alt.Color('Type', legend=None),
-            tooltip=['Type', 'Val']
-        )
-        text_c = base_c.mark_text(dy=-10).encode(y='Val', text='Val')
-        st.altair_chart((bars_c + text_c).properties(height=350), use_container_width=True)
+    _panel(st, _charts_panel)(view)
 
     # --- 4. Export ---
     st.markdown("---")
-    csv = df.to_csv(index=False).encode('utf-8-sig')
-    st.download_button(
-        label=t['download_btn'],
-        data=csv,
-        file_name='tent_core_calc.csv',
-        mime='text/csv',
-    )
+    _panel(st, _export_panel)(view)
+    return t
 
 if __name__ == "__main__":
+    st, _, _ = _import_ui_libs()
     try:
-        if st.runtime.exists():
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        # 在脚本运行线程中 (streamlit run 或 AppTest) 直接渲染；
+        # 并发的 AppTest 会话会互相重置 Runtime 单例，因此不能只看 runtime.exists()
+        if st.runtime.exists() or get_script_run_ctx(suppress_warning=True) is not None:
             main()
         else:
             script_path = os.path.abspath(__file__)